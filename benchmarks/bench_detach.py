@@ -0,0 +1,117 @@
+"""
+Measures the cost of starting detached `alarm --log` jobs.
+
+For each job this records the time until `alarm --log` returns (time-to-detach), the time until
+the target script actually starts, and the resident memory of the background monitor while the
+script runs. Slack and GPU collection are turned off so only alarm itself is measured.
+
+Runs the installed `alarm` entry point, as a sweep script would.
+
+    python benchmarks/bench_detach.py --jobs 20
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_TARGET_SCRIPT = """
+import sys, time
+with open(sys.argv[1], "w") as f:
+    f.write(repr(time.time()))
+time.sleep(float(sys.argv[2]))
+"""
+
+
+def _read_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _wait_for_file(path, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            return True
+        time.sleep(0.002)
+    return False
+
+
+def _wait_for_exit(pid, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return
+        time.sleep(0.02)
+
+
+def _run_job(work_dir, index, hold_seconds):
+    script_path = os.path.join(work_dir, "target.py")
+    started_path = os.path.join(work_dir, f"started_{index}")
+    command = [
+        shutil.which("alarm") or "alarm",
+        "--log", "--log-dir", os.path.join(work_dir, "logs"),
+        "--destination", "off", "--no-gpu-info",
+        script_path, started_path, str(hold_seconds),
+    ]
+
+    launched = time.time()
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    detach_seconds = time.time() - launched
+
+    match = re.search(r"PID: (\d+)", result.stdout)
+    monitor_pid = int(match.group(1)) if match else None
+    if not _wait_for_file(started_path, timeout=30):
+        raise RuntimeError(f"Target script did not start for job {index}")
+    with open(started_path, "r", encoding="utf-8") as f:
+        child_start_seconds = float(f.read()) - launched
+
+    monitor_rss_kb = _read_rss_kb(monitor_pid) if monitor_pid else None
+    if monitor_pid:
+        _wait_for_exit(monitor_pid, timeout=hold_seconds + 30)
+    return detach_seconds, child_start_seconds, monitor_rss_kb
+
+
+def _summary(label, values, unit, scale=1.0):
+    values = [value * scale for value in values if value is not None]
+    if not values:
+        sys.stdout.write(f"{label:<22} n/a\n")
+        return
+    sys.stdout.write(
+        f"{label:<22} median {statistics.median(values):8.1f} {unit}   "
+        f"min {min(values):8.1f} {unit}   max {max(values):8.1f} {unit}\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--hold", type=float, default=0.5, help="Seconds each target script stays alive.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="researchflow_detach_") as work_dir:
+        with open(os.path.join(work_dir, "target.py"), "w", encoding="utf-8") as f:
+            f.write(_TARGET_SCRIPT)
+
+        results = [_run_job(work_dir, index, args.hold) for index in range(args.jobs)]
+
+    sys.stdout.write(f"{args.jobs} detached jobs\n")
+    _summary("time to detach", [r[0] for r in results], "ms", 1000)
+    _summary("time to script start", [r[1] for r in results], "ms", 1000)
+    _summary("monitor RSS", [r[2] for r in results], "MB", 1 / 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures `alarm --history` queries against a large run registry.
+
+Fills a temporary database with synthetic runs spread over a year, several scripts, hosts and
+learning rates, then times typical queries: the latest runs, one script's failures this week,
+and the same query filtered by an argument value.
+
+    python benchmarks/bench_history.py --runs 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from researchflow.core.registry import RunRecord, RunRegistry
+
+_SCRIPTS = ["train.py", "eval.py", "pretrain.py", "finetune.py", "sweep_probe.py"]
+_HOSTS = [f"gpu-{index}" for index in range(8)]
+_LEARNING_RATES = [1e-3, 3e-4, 1e-4, 3e-5]
+
+
+def _synthetic_runs(count):
+    rng = random.Random(0)
+    now = datetime.now()
+    for _ in range(count):
+        start_time = now - timedelta(seconds=rng.uniform(0, 365 * 86400))
+        exit_code = 0 if rng.random() < 0.8 else 1
+        lr = rng.choice(_LEARNING_RATES)
+        script_path = f"/exp/{rng.choice(_SCRIPTS)}"
+        yield RunRecord(
+            script_path=script_path,
+            command=f"alarm --log {script_path} --lr {lr}",
+            start_time=start_time,
+            end_time=start_time + timedelta(seconds=rng.uniform(10, 36000)),
+            exit_code=exit_code,
+            status="Success" if exit_code == 0 else "Failure",
+            host=rng.choice(_HOSTS),
+            script_args=("--lr", str(lr)),
+            parsed_args={"lr": lr, "seed": rng.randrange(5), "epochs": 10},
+            metrics={"loss": rng.random()},
+        )
+
+
+def _time_query(registry, repeats, **filters):
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        records = registry.query_runs(**filters)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations), len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="researchflow_history_") as work_dir:
+        registry = RunRegistry(os.path.join(work_dir, "runs.db"))
+        started = time.perf_counter()
+        registry.record_runs(list(_synthetic_runs(args.runs)))
+        sys.stdout.write(f"{args.runs} runs inserted in {time.perf_counter() - started:.1f} s\n")
+
+        week_ago = datetime.now() - timedelta(days=7)
+        queries = [
+            ("latest 20", {}),
+            ("train.py failed, 7d", {"script": "train.py", "status": "Failure", "since": week_ago}),
+            ("... and lr=3e-4", {"script": "train.py", "status": "Failure", "since": week_ago, "arg_filters": [("lr", "3e-4")]}),
+            ("all lr=3e-4 (scan)", {"arg_filters": [("lr", "3e-4")], "limit": 0}),
+        ]
+        for label, filters in queries:
+            median_seconds, count = _time_query(registry, args.repeats, **filters)
+            sys.stdout.write(f"{label:<22} median {median_seconds * 1000:8.2f} ms   {count} rows\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Measures how fast alarm can forward a chatty child's output.
+
+Compares the previous per-line thread readers (text pipes, bufsize=1, flush per line)
+with the selector-based OutputPump. Both write to os.devnull so the terminal is not the bottleneck. The child writing straight to
+os.devnull and a bare os.read loop on the pipe give the ceiling for this machine. On Linux the
+--raw splice/sendfile passthrough is measured too. "alarm CPU" is the user+sys time spent in this process.
+
+    python benchmarks/bench_output_pump.py --lines 2000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+from researchflow.alarm.capture import BoundedOutputCapture
+from researchflow.alarm.markers import ParsedArgsMarkerParser
+from researchflow.alarm.passthrough import SplicePassthrough, is_raw_passthrough_supported
+from researchflow.alarm.pump import OutputPump
+
+_CHILD_SCRIPT = """
+import sys
+line = "step {} | loss 0.123456 | acc 0.987654 | lr 0.000300\\n"
+write = sys.stdout.write
+for index in range(int(sys.argv[1])):
+    write(line.format(index))
+"""
+
+
+def _spawn(num_lines, **popen_kwargs):
+    return subprocess.Popen(
+        [sys.executable, "-c", _CHILD_SCRIPT, str(num_lines)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **popen_kwargs,
+    )
+
+
+def _run_child_only(num_lines):
+    with open(os.devnull, "w") as devnull:
+        subprocess.run([sys.executable, "-c", _CHILD_SCRIPT, str(num_lines)], stdout=devnull, check=True)
+
+
+def _run_bare_read(num_lines):
+    process = _spawn(num_lines, bufsize=0)
+    while os.read(process.stdout.fileno(), 64 * 1024):
+        pass
+    process.wait()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def _run_legacy_threads(num_lines):
+    process = _spawn(num_lines, text=True, encoding="utf-8", errors="replace", bufsize=1)
+    capture = BoundedOutputCapture()
+    parser = ParsedArgsMarkerParser()
+
+    def stream(pipe, sink):
+        for line in pipe:
+            sink.write(line)
+            sink.flush()
+            encoded_line = line.encode("utf-8", errors="replace")
+            capture.write(encoded_line)
+            parser.feed(encoded_line)
+
+    with open(os.devnull, "w") as devnull:
+        threads = [
+            threading.Thread(target=stream, args=(process.stdout, devnull), daemon=True),
+            threading.Thread(target=stream, args=(process.stderr, devnull), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        process.wait()
+        for thread in threads:
+            thread.join()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def _run_output_pump(num_lines):
+    process = _spawn(num_lines, bufsize=0)
+    capture = BoundedOutputCapture()
+    parser = ParsedArgsMarkerParser()
+    with open(os.devnull, "wb") as devnull:
+        pump = OutputPump(process)
+        pump.add_stream(process.stdout, devnull, [capture.write, parser.feed])
+        pump.add_stream(process.stderr, devnull, [capture.write])
+        pump.run()
+        process.wait()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def _run_splice_passthrough(num_lines):
+    process = _spawn(num_lines, bufsize=0)
+    capture = BoundedOutputCapture()
+    parser = ParsedArgsMarkerParser()
+    with open(os.devnull, "wb") as devnull:
+        passthrough = SplicePassthrough(process)
+        passthrough.add_raw_stream(process.stdout, devnull, capture=capture, marker_parser=parser)
+        passthrough.add_raw_stream(process.stderr, devnull, capture=BoundedOutputCapture())
+        passthrough.run()
+        process.wait()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _measure(label, func, num_lines, line_bytes):
+    started = time.perf_counter()
+    cpu_started = _cpu_seconds()
+    func(num_lines)
+    elapsed = time.perf_counter() - started
+    alarm_cpu = _cpu_seconds() - cpu_started
+    total_mb = num_lines * line_bytes / (1024 * 1024)
+    sys.stdout.write(
+        f"{label:<18} {elapsed:8.3f}s {num_lines / elapsed:14,.0f} lines/s {total_mb / elapsed:10.1f} MB/s"
+        f"   alarm CPU {alarm_cpu:6.3f}s\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    line_bytes = len("step {} | loss 0.123456 | acc 0.987654 | lr 0.000300\n".format(args.lines // 2))
+    sys.stdout.write(f"{args.lines:,} lines of ~{line_bytes} bytes\n")
+    _measure("child -> devnull", _run_child_only, args.lines, line_bytes)
+    _measure("bare os.read pipe", _run_bare_read, args.lines, line_bytes)
+    _measure("legacy threads", _run_legacy_threads, args.lines, line_bytes)
+    _measure("output pump", _run_output_pump, args.lines, line_bytes)
+    if is_raw_passthrough_supported():
+        _measure("raw splice", _run_splice_passthrough, args.lines, line_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Measures the CPU cost of the process tree resource sampler.
+
+Starts a child with --workers subprocesses (like DataLoader workers) that each hold some memory
+and mostly sleep, samples the tree with the default adaptive interval for --seconds, and
+reports the sampler's own CPU time as a share of one core.
+
+    python benchmarks/bench_resource_sampler.py --workers 16 --seconds 30
+"""
+import argparse
+import subprocess
+import sys
+
+from researchflow.core.process_utils import wait_with_rusage
+from researchflow.core.resources import ProcessTreeSampler, format_resource_usage, is_resource_sampling_supported
+
+_TREE_SCRIPT = """
+import subprocess
+import sys
+worker = "import time; data = bytearray(32 * 1024 * 1024); time.sleep(float(__import__('sys').argv[1]))"
+workers = [subprocess.Popen([sys.executable, "-c", worker, sys.argv[2]]) for _ in range(int(sys.argv[1]))]
+for process in workers:
+    process.wait()
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if not is_resource_sampling_supported():
+        sys.stderr.write("This benchmark needs /proc.\n")
+        sys.exit(1)
+
+    process = subprocess.Popen([sys.executable, "-c", _TREE_SCRIPT, str(args.workers), str(args.seconds)])
+    sampler = ProcessTreeSampler(process.pid).start()
+    _, rusage = wait_with_rusage(process)
+    usage = sampler.stop(rusage)
+
+    sys.stdout.write(f"{format_resource_usage(usage)}\n")
+    sys.stdout.write(
+        f"{usage.sample_count} samples, sampler CPU {usage.sampler_cpu_seconds * 1000:.1f} ms "
+        f"= {usage.sampler_cpu_seconds / usage.wall_seconds * 100:.3f}% of one core\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
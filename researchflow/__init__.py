@@ -0,0 +1,19 @@
+# Loaded on first use, so `import researchflow.core.utils` in a training script stays cheap.
+_LAZY_EXPORTS = {
+    "alarm_context": "researchflow.alarm.context",
+    "notify_on_exit": "researchflow.alarm.context",
+    "AlarmContext": "researchflow.alarm.context",
+    "notify_async": "researchflow.core.async_notify",
+    "report_arguments": "researchflow.core.utils",
+    "report_metrics": "researchflow.core.utils",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'researchflow' has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,194 @@
+import errno
+import os
+import sys
+import tempfile
+from collections import deque
+from typing import Deque, Optional
+
+from researchflow.core.utils import decode_utf8_bytes, format_byte_size
+from .constants import DEFAULT_CAPTURE_HEAD_BYTES, DEFAULT_CAPTURE_TAIL_BYTES
+
+_MAX_TAIL_CHUNKS = 1024
+
+
+class BoundedOutputCapture:
+    """
+    Keeps the first `head_bytes` and the last `tail_bytes` of a stream in memory.
+    Everything in between is only counted, or written to a temp file when spilling is enabled,
+    so memory stays constant no matter how much the child prints.
+    """
+
+    def __init__(
+        self,
+        head_bytes: int = DEFAULT_CAPTURE_HEAD_BYTES,
+        tail_bytes: int = DEFAULT_CAPTURE_TAIL_BYTES,
+        spill_to_file: bool = False,
+        spill_prefix: str = "researchflow_output_",
+    ):
+        self.head_bytes = max(0, head_bytes)
+        self.tail_bytes = max(0, tail_bytes)
+        self.total_bytes = 0
+        self.spill_path: Optional[str] = None
+        self._head = bytearray()
+        self._tail: Deque[bytes] = deque()
+        self._tail_size = 0
+        self._spill_file = None
+
+        if spill_to_file:
+            try:
+                self._spill_file = tempfile.NamedTemporaryFile(
+                    mode="wb",
+                    prefix=spill_prefix,
+                    suffix=".log",
+                    delete=False,
+                )
+                self.spill_path = self._spill_file.name
+            except OSError as e:
+                sys.stderr.write(f"[AlarmHandler] Could not create capture spill file: {e}\n")
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self.total_bytes += len(data)
+
+        if self._spill_file is not None:
+            try:
+                self._spill_file.write(data)
+            except OSError as e:
+                sys.stderr.write(f"[AlarmHandler] Disabling capture spill file after write error: {e}\n")
+                self._close_spill_file()
+                self._discard_spill_file()
+
+        head_room = self.head_bytes - len(self._head)
+        if head_room > 0:
+            self._head += data[:head_room]
+            data = data[head_room:]
+            if not data:
+                return
+        self._append_tail(bytes(data))
+
+    def skip(self, num_bytes: int, source_fd: Optional[int] = None, source_offset: int = 0) -> None:
+        """
+        Counts `num_bytes` of output that were never read into memory. When spilling, they are
+        copied into the spill file from `source_fd` at `source_offset` so the file stays complete.
+        """
+        if num_bytes <= 0:
+            return
+        self.total_bytes += num_bytes
+        if self._spill_file is not None:
+            if source_fd is None:
+                sys.stderr.write("[AlarmHandler] Disabling capture spill file: skipped output cannot be copied.\n")
+                self._close_spill_file()
+                self._discard_spill_file()
+            else:
+                self._spill_range(source_fd, source_offset, num_bytes)
+        self._tail.clear()
+        self._tail_size = 0
+
+    def _spill_range(self, source_fd: int, offset: int, count: int) -> None:
+        try:
+            self._spill_file.flush()
+            spill_fd = self._spill_file.fileno()
+            use_sendfile = hasattr(os, "sendfile")
+            while count > 0:
+                try:
+                    if use_sendfile:
+                        copied = os.sendfile(spill_fd, source_fd, offset, count)
+                    else:
+                        copied = os.write(spill_fd, os.pread(source_fd, min(count, 1024 * 1024), offset))
+                except OSError as e:
+                    if use_sendfile and e.errno in (errno.EINVAL, errno.ENOSYS):
+                        use_sendfile = False
+                        continue
+                    raise
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+        except OSError as e:
+            sys.stderr.write(f"[AlarmHandler] Disabling capture spill file after write error: {e}\n")
+            self._close_spill_file()
+            self._discard_spill_file()
+
+    def _append_tail(self, data: bytes) -> None:
+        if self.tail_bytes <= 0:
+            return
+        if len(data) >= self.tail_bytes:
+            self._tail.clear()
+            self._tail.append(data[-self.tail_bytes:])
+            self._tail_size = self.tail_bytes
+            return
+
+        self._tail.append(data)
+        self._tail_size += len(data)
+        while self._tail_size - len(self._tail[0]) >= self.tail_bytes:
+            self._tail_size -= len(self._tail.popleft())
+
+        if len(self._tail) > _MAX_TAIL_CHUNKS:
+            joined = b"".join(self._tail)[-self.tail_bytes:]
+            self._tail.clear()
+            self._tail.append(joined)
+            self._tail_size = len(joined)
+
+    @property
+    def head_room(self) -> int:
+        return max(0, self.head_bytes - len(self._head))
+
+    @property
+    def head(self) -> bytes:
+        return bytes(self._head)
+
+    @property
+    def tail(self) -> bytes:
+        if not self._tail:
+            return b""
+        return b"".join(self._tail)[-self.tail_bytes:]
+
+    @property
+    def omitted_bytes(self) -> int:
+        return max(0, self.total_bytes - len(self._head) - min(self._tail_size, self.tail_bytes))
+
+    @property
+    def truncated(self) -> bool:
+        return self.omitted_bytes > 0
+
+    def get_text(self) -> str:
+        if not self.truncated:
+            return decode_utf8_bytes(self.head + self.tail)
+        return decode_utf8_bytes(self.head, trim_trailing=True) + decode_utf8_bytes(self.tail, trim_leading=True)
+
+    def render_excerpt(self) -> str:
+        if not self.truncated:
+            return decode_utf8_bytes(self.head + self.tail)
+
+        parts = [
+            decode_utf8_bytes(self.head, trim_trailing=True),
+            f"\n... [{format_byte_size(self.omitted_bytes)} omitted of {format_byte_size(self.total_bytes)}] ...\n",
+            decode_utf8_bytes(self.tail, trim_leading=True),
+        ]
+        if self.spill_path:
+            parts.append(f"\n[Full output saved to: {self.spill_path}]")
+        return "".join(parts)
+
+    def _close_spill_file(self) -> None:
+        if self._spill_file is None:
+            return
+        try:
+            self._spill_file.close()
+        except OSError:
+            pass
+        self._spill_file = None
+
+    def _discard_spill_file(self) -> None:
+        # An incomplete spill file must not be advertised as the full output.
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+    def close(self) -> None:
+        self._close_spill_file()
+        if not self.truncated:
+            self._discard_spill_file()
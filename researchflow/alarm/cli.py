@@ -12,7 +12,17 @@ from researchflow.core.slack_setup import (
     run_interactive_slack_setup,
     setup_dm_by_name,
 )
+from researchflow.core.utils import parse_byte_size, parse_duration_seconds
+from .constants import (
+    DEFAULT_CAPTURE_HEAD_BYTES,
+    DEFAULT_IDLE_GPU_THRESHOLD_PERCENT,
+    DEFAULT_LOG_KEEP,
+    LOG_COMPRESSION_CHOICES,
+)
 from .handler import execute_script_with_alarm
+from .history import HISTORY_STATUS_CHOICES, parse_arg_filter, parse_since, show_history
+from .jobqueue import QUEUE_NOTIFY_CHOICES, load_job_queue, run_job_queue
+from .sweep import load_sweep_spec, run_sweep
 
 def _mask_secret(value):
     if not value:
@@ -41,9 +51,169 @@ def main():
         action="store_true",
         help="With --log, keep alarm in the foreground and wait for the target script. Useful for shell concurrency control.",
     )
+    parser.add_argument(
+        "--tee",
+        action="store_true",
+        help="Requires --log. Stay in the foreground and stream output to the terminal as well as the log file. "
+             "If the terminal falls behind, terminal output is skipped; the log file keeps everything.",
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Linux only. Pass child output to the terminal (and to the log file with --log --wait) with kernel-side "
+             "splice/sendfile copies, sampling only small windows for the report.",
+    )
+    parser.add_argument(
+        "--inprocess",
+        action="store_true",
+        help="Run the script inside the alarm process with runpy instead of starting a second interpreter. "
+             "Saves startup time for short scripts. Not used with --queue or --sweep.",
+    )
+    parser.add_argument(
+        "--compact-log",
+        action="store_true",
+        help="With --log, keep only the final state of carriage-return progress lines and collapse repeated lines "
+             "in the log file. Child output is routed through alarm to do this.",
+    )
+    parser.add_argument(
+        "--compact-excerpt",
+        action="store_true",
+        help="Apply the same progress-line and repeated-line compaction to the output excerpt sent to Slack.",
+    )
+    parser.add_argument(
+        "--capture-kb",
+        type=int,
+        default=DEFAULT_CAPTURE_HEAD_BYTES // 1024,
+        metavar="KB",
+        help="Keep only the first and last KB of foreground stdout/stderr in memory for the report. Defaults to 64.",
+    )
+    parser.add_argument(
+        "--capture-spill",
+        action="store_true",
+        help="Also save the full foreground stderr to a temp file when it exceeds the in-memory capture window.",
+    )
+    parser.add_argument(
+        "--log-max-size",
+        type=parse_byte_size,
+        default=0,
+        metavar="SIZE",
+        help="With --log, rotate the log file when it reaches SIZE (e.g. 500M, 2G). Rotated segments are compressed "
+             "in the background.",
+    )
+    parser.add_argument(
+        "--log-keep",
+        type=int,
+        default=DEFAULT_LOG_KEEP,
+        metavar="N",
+        help=f"Number of rotated log segments to keep with --log-max-size. Defaults to {DEFAULT_LOG_KEEP}.",
+    )
+    parser.add_argument(
+        "--log-compress",
+        choices=list(LOG_COMPRESSION_CHOICES),
+        default="auto",
+        help="Compression for rotated log segments. 'auto' uses zstd when the zstandard package is installed, else gzip.",
+    )
     parser.add_argument("--config", help="Path to a ResearchFlow JSON config file.")
     parser.add_argument("--log-dir", help="Directory for --log output. Defaults to <script_dir>/logs.")
     parser.add_argument("--set-log-dir", metavar="PATH", help="Save a default log directory to ResearchFlow config and exit.")
+    parser.add_argument(
+        "--gpus",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Wait until N GPUs are free, lease the least-loaded ones so other alarm runs on this host skip them, "
+             "and set CUDA_VISIBLE_DEVICES for the script.",
+    )
+    parser.add_argument(
+        "--min-free-mib",
+        type=int,
+        default=0,
+        metavar="MIB",
+        help="With --gpus, only use GPUs with at least MIB MiB of free memory.",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="FILE",
+        help="Run every job in FILE from this alarm process, each with its own log file. FILE has one command line "
+             "per line (e.g. 'train.py --lr 0.1'), or is a JSON list of command strings or {\"script\", \"args\"} objects.",
+    )
+    parser.add_argument(
+        "--sweep",
+        metavar="SPEC",
+        help="Run the script once per point of the JSON sweep SPEC, e.g. {\"grid\": {\"lr\": [0.1, 0.01], \"seed\": [0, 1]}}, "
+             "and send one report with a results table.",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        metavar="N",
+        help="With --queue or --sweep, run at most N jobs at a time. Defaults to 1, or to \"parallel\" in the sweep spec.",
+    )
+    parser.add_argument(
+        "--queue-notify",
+        choices=list(QUEUE_NOTIFY_CHOICES),
+        default=None,
+        help="With --queue or --sweep, send one Slack notification per job, one roll-up when all jobs finish, or both. "
+             "Defaults to 'each' for --queue and 'summary' for --sweep.",
+    )
+    parser.add_argument(
+        "--digest",
+        type=parse_duration_seconds,
+        default=0,
+        metavar="WINDOW",
+        help="Merge Slack notifications from your alarm runs on this host that finish within WINDOW (e.g. 60s, 5m) "
+             "into one summary message.",
+    )
+    parser.add_argument(
+        "--idle-alert",
+        type=parse_duration_seconds,
+        default=0,
+        metavar="DURATION",
+        help="Send a Slack alert while the script is still running if its GPUs stay below --idle-threshold "
+             "utilization for DURATION (e.g. 15m). Repeats at most hourly while the GPUs stay idle.",
+    )
+    parser.add_argument(
+        "--idle-threshold",
+        type=float,
+        default=DEFAULT_IDLE_GPU_THRESHOLD_PERCENT,
+        metavar="PCT",
+        help=f"GPU utilization percentage below which --idle-alert counts a GPU as idle. Defaults to {DEFAULT_IDLE_GPU_THRESHOLD_PERCENT:g}.",
+    )
+    parser.add_argument(
+        "--stall-timeout",
+        type=parse_duration_seconds,
+        default=0,
+        metavar="DURATION",
+        help="Send one Slack alert with the last output lines if the script writes no output for DURATION (e.g. 30m). "
+             "Includes a py-spy stack dump when py-spy is installed.",
+    )
+    parser.add_argument(
+        "--stall-kill",
+        action="store_true",
+        help="With --stall-timeout, stop the script after the alert. Python prints every thread's traceback before it exits.",
+    )
+    parser.add_argument(
+        "--history",
+        nargs="?",
+        const="",
+        metavar="SCRIPT",
+        help="List recorded alarm runs, newest first, optionally only those of SCRIPT (a path or a file name like train.py). "
+             "Combine with --since, --status, --host, --where and --limit.",
+    )
+    parser.add_argument("--since", type=parse_since, metavar="WHEN", help="With --history, only runs started in the last WHEN (e.g. 12h, 7d) or since an ISO date.")
+    parser.add_argument("--status", choices=list(HISTORY_STATUS_CHOICES), help="With --history, only successful or failed runs.")
+    parser.add_argument("--host", help="With --history, only runs on this host.")
+    parser.add_argument(
+        "--where",
+        type=parse_arg_filter,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="With --history, only runs whose argument NAME was VALUE, from report_arguments or the command line. Repeatable.",
+    )
+    parser.add_argument("--limit", type=int, default=20, metavar="N", help="With --history, show at most N runs (0 for all). Defaults to 20.")
+    parser.add_argument("--history-db", metavar="PATH", help="Run history database. Defaults to ~/.local/share/researchflow/runs.db; 'off' disables it.")
     parser.add_argument(
         "--configure-slack",
         action="store_true",
@@ -103,6 +273,9 @@ def main():
     if args.channel and args.dm:
         sys.stderr.write("[AlarmCLI] Use either --channel or --dm, not both.\n")
         sys.exit(1)
+    if args.tee and not args.log:
+        sys.stderr.write("[AlarmCLI] --tee requires --log.\n")
+        sys.exit(1)
     if args.channel and destination is None:
         destination = "channel"
     if args.dm and destination is None:
@@ -183,6 +356,7 @@ def main():
         slack_webhook_url=args.webhook_url,
         slack_team_id=args.team_id,
         log_dir=args.log_dir,
+        history_db=args.history_db,
         include_gpu=args.include_gpu,
         mention_user=args.mention_user,
     )
@@ -197,14 +371,91 @@ def main():
         if not args.script_to_run:
             sys.exit(0)
 
+    if args.history is not None:
+        sys.exit(
+            show_history(
+                notification_config.history_db,
+                script=args.history or None,
+                since=args.since,
+                status=args.status,
+                host=args.host,
+                arg_filters=args.where,
+                limit=args.limit,
+            )
+        )
+
+    if args.inprocess and (args.queue or args.sweep):
+        sys.stderr.write("[AlarmCLI] --inprocess runs one script at a time; ignoring it for --queue/--sweep.\n")
+
+    if args.queue:
+        try:
+            jobs = load_job_queue(args.queue)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"[AlarmCLI] Could not read job queue {args.queue}: {e}\n")
+            sys.exit(1)
+        sys.exit(
+            run_job_queue(
+                jobs,
+                max_parallel=args.parallel or 1,
+                notification_config=notification_config,
+                notify=args.queue_notify or "each",
+                queue_name=Path(args.queue).name,
+                capture_head_bytes=args.capture_kb * 1024,
+                capture_tail_bytes=args.capture_kb * 1024,
+                compact_log=args.compact_log,
+                compact_excerpt=args.compact_excerpt,
+                log_max_bytes=args.log_max_size,
+                log_keep=args.log_keep,
+                log_compression=args.log_compress,
+                gpu_count=args.gpus,
+                min_free_gpu_mib=args.min_free_mib,
+                digest_seconds=args.digest,
+                idle_alert_seconds=args.idle_alert,
+                idle_threshold_percent=args.idle_threshold,
+                stall_timeout_seconds=args.stall_timeout,
+                stall_kill=args.stall_kill,
+            )
+        )
+
     if not args.script_to_run:
         parser.print_help(sys.stderr)
         sys.exit(1)
 
+    if args.sweep:
+        try:
+            sweep_spec = load_sweep_spec(args.sweep)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"[AlarmCLI] Could not read sweep spec {args.sweep}: {e}\n")
+            sys.exit(1)
+        sys.exit(
+            run_sweep(
+                args.script_to_run,
+                sweep_spec,
+                fixed_args=args.script_arguments,
+                max_parallel=args.parallel,
+                notification_config=notification_config,
+                notify=args.queue_notify or "summary",
+                capture_head_bytes=args.capture_kb * 1024,
+                capture_tail_bytes=args.capture_kb * 1024,
+                compact_log=args.compact_log,
+                compact_excerpt=args.compact_excerpt,
+                log_max_bytes=args.log_max_size,
+                log_keep=args.log_keep,
+                log_compression=args.log_compress,
+                gpu_count=args.gpus,
+                min_free_gpu_mib=args.min_free_mib,
+                digest_seconds=args.digest,
+                idle_alert_seconds=args.idle_alert,
+                idle_threshold_percent=args.idle_threshold,
+                stall_timeout_seconds=args.stall_timeout,
+                stall_kill=args.stall_kill,
+            )
+        )
+
     target_script_path = args.script_to_run
     target_script_args = args.script_arguments
     enable_logging = args.log
-    detach_logging = not args.wait
+    detach_logging = not (args.wait or args.tee)
     
     alarm_command_args_for_display = [target_script_path] + target_script_args
 
@@ -215,6 +466,24 @@ def main():
         enable_logging=enable_logging,
         detach_logging=detach_logging,
         notification_config=notification_config,
+        capture_head_bytes=args.capture_kb * 1024,
+        capture_tail_bytes=args.capture_kb * 1024,
+        spill_capture=args.capture_spill,
+        raw_passthrough=args.raw,
+        compact_log=args.compact_log,
+        compact_excerpt=args.compact_excerpt,
+        log_max_bytes=args.log_max_size,
+        log_keep=args.log_keep,
+        log_compression=args.log_compress,
+        tee_output=args.tee,
+        gpu_count=args.gpus,
+        min_free_gpu_mib=args.min_free_mib,
+        digest_seconds=args.digest,
+        idle_alert_seconds=args.idle_alert,
+        idle_threshold_percent=args.idle_threshold,
+        stall_timeout_seconds=args.stall_timeout,
+        stall_kill=args.stall_kill,
+        inprocess=args.inprocess,
     )
     sys.exit(return_code)
 
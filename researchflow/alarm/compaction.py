@@ -0,0 +1,105 @@
+from typing import Callable, List
+
+from .constants import DEFAULT_COMPACTION_MAX_LINE_BYTES
+
+
+class OutputCompactor:
+    """
+    Streaming filter that keeps only the final state of carriage-return progress lines
+    and collapses identical consecutive lines into a single "(repeated N more times)" note.
+    Complete lines are emitted as soon as they differ from the previous one.
+    """
+
+    def __init__(self, max_line_bytes: int = DEFAULT_COMPACTION_MAX_LINE_BYTES):
+        self.max_line_bytes = max_line_bytes
+        self.lines_in = 0
+        self.lines_out = 0
+        self._pending = bytearray()
+        self._last_line: bytes = b""
+        self._has_last_line = False
+        self._repeat_count = 0
+
+    @staticmethod
+    def _final_state(line: bytes) -> bytes:
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        carriage_return_index = line.rfind(b"\r")
+        if carriage_return_index >= 0:
+            line = line[carriage_return_index + 1:]
+        return line
+
+    def _repeat_note(self) -> bytes:
+        if not self._repeat_count:
+            return b""
+        note = f"(repeated {self._repeat_count} more times)\n".encode("utf-8")
+        self._repeat_count = 0
+        self.lines_out += 1
+        return note
+
+    def _accept_line(self, line: bytes, output: List[bytes]) -> None:
+        self.lines_in += 1
+        line = self._final_state(line)
+        if self._has_last_line and line == self._last_line:
+            self._repeat_count += 1
+            return
+        output.append(self._repeat_note())
+        output.append(line + b"\n")
+        self.lines_out += 1
+        self._last_line = line
+        self._has_last_line = True
+
+    def feed(self, data: bytes) -> bytes:
+        if not data:
+            return b""
+        self._pending += data
+        output: List[bytes] = []
+
+        start = 0
+        while True:
+            newline_index = self._pending.find(b"\n", start)
+            if newline_index < 0:
+                break
+            self._accept_line(bytes(self._pending[start:newline_index]), output)
+            start = newline_index + 1
+        if start:
+            del self._pending[:start]
+
+        carriage_return_index = self._pending.rfind(b"\r", 0, max(0, len(self._pending) - 1))
+        if carriage_return_index >= 0:
+            del self._pending[:carriage_return_index + 1]
+        if len(self._pending) > self.max_line_bytes:
+            self._accept_line(bytes(self._pending), output)
+            self._pending.clear()
+
+        return b"".join(output)
+
+    def flush(self) -> bytes:
+        output = [self._repeat_note()]
+        if self._pending:
+            output.append(self._final_state(bytes(self._pending)))
+            self.lines_out += 1
+            self._pending.clear()
+        self._has_last_line = False
+        return b"".join(output)
+
+
+class CompactingWriter:
+    def __init__(self, write: Callable[[bytes], object], max_line_bytes: int = DEFAULT_COMPACTION_MAX_LINE_BYTES):
+        self._write = write
+        self.compactor = OutputCompactor(max_line_bytes)
+
+    def write(self, data: bytes) -> None:
+        compacted = self.compactor.feed(data)
+        if compacted:
+            self._write(compacted)
+
+    def flush(self) -> None:
+        remaining = self.compactor.flush()
+        if remaining:
+            self._write(remaining)
+
+
+def compact_text(text: str) -> str:
+    compactor = OutputCompactor()
+    data = compactor.feed(text.encode("utf-8", errors="replace")) + compactor.flush()
+    return data.decode("utf-8", errors="replace")
@@ -1,2 +1,31 @@
 PARSED_ARGS_START_MARKER = "####PARSED_ARGS_JSON_START####"
-PARSED_ARGS_END_MARKER = "####PARSED_ARGS_END_MARKER"
\ No newline at end of file
+PARSED_ARGS_END_MARKER = "####PARSED_ARGS_END_MARKER"
+METRICS_MARKER = "####RESEARCHFLOW_METRICS####"
+DEFAULT_METRICS_SCAN_LINES = 200
+
+DEFAULT_CAPTURE_HEAD_BYTES = 64 * 1024
+DEFAULT_CAPTURE_TAIL_BYTES = 64 * 1024
+DEFAULT_MAX_PARSED_ARGS_BYTES = 1024 * 1024
+
+DEFAULT_PUMP_READ_SIZE = 64 * 1024
+DEFAULT_PUMP_BATCH_BYTES = 64 * 1024
+DEFAULT_PUMP_FLUSH_INTERVAL = 0.05
+DEFAULT_PUMP_EXIT_GRACE_SECONDS = 2.0
+DEFAULT_TEE_TERMINAL_BACKLOG_BYTES = 4 * 1024 * 1024
+DEFAULT_LOG_WRITE_BUFFER_BYTES = 1024 * 1024
+
+DEFAULT_RAW_SPOOL_BYTES = 16 * 1024 * 1024
+DEFAULT_RAW_MARKER_SCAN_BYTES = 1024 * 1024
+DEFAULT_RAW_PIPE_BYTES = 1024 * 1024
+DEFAULT_RAW_MIN_WAKEUP_INTERVAL = 0.01
+
+DEFAULT_COMPACTION_MAX_LINE_BYTES = 1024 * 1024
+
+DEFAULT_LOG_KEEP = 5
+LOG_COMPRESSION_CHOICES = ("auto", "gzip", "zstd", "none")
+
+DEFAULT_IDLE_GPU_THRESHOLD_PERCENT = 5.0
+DEFAULT_IDLE_ALERT_LOG_LINES = 20
+
+DEFAULT_STALL_ALERT_LOG_LINES = 20
+DEFAULT_STALL_KILL_GRACE_SECONDS = 10.0
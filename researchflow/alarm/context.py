@@ -0,0 +1,217 @@
+import argparse
+import atexit
+import functools
+import os
+import shlex
+import signal
+import sqlite3
+import sys
+import threading
+import traceback
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
+
+from researchflow.core import utils
+from researchflow.core.config import ResearchFlowConfig, load_config
+from researchflow.core.gpu import collect_gpu_info, format_gpu_info_for_text
+from researchflow.core.registry import RunRecord, RunRegistry, gpu_snapshot_from_infos
+from researchflow.core.slack_sender import AlarmSlackSender
+from researchflow.core.utils import format_script_duration, get_hostname, get_kst_timestamp_string
+
+# Signals that end a scheduled job without a Python exception. SIGINT already raises KeyboardInterrupt.
+_NOTIFY_SIGNAL_NAMES = ("SIGTERM", "SIGHUP")
+
+
+def _exit_code_for(error: Optional[BaseException]) -> int:
+    if error is None:
+        return 0
+    if isinstance(error, SystemExit):
+        if error.code is None:
+            return 0
+        return error.code if isinstance(error.code, int) else 1
+    if isinstance(error, KeyboardInterrupt):
+        return -signal.SIGINT
+    return 1
+
+
+class AlarmContext:
+    """
+    Sends the same Slack report as `alarm script.py` for a block of code, without a wrapper
+    process. Use it through `alarm_context(...)` or `notify_on_exit`.
+
+    The block is timed and an exception ending it is reported with its traceback, then re-raised.
+    `report_arguments` and `report_metrics` calls made inside the block are included. While the
+    block runs, SIGTERM/SIGHUP (main thread only) and interpreter exit also send the report, so a
+    job stopped by its scheduler still notifies.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        args: Optional[Union[argparse.Namespace, Dict[str, Any]]] = None,
+        config: Optional[ResearchFlowConfig] = None,
+        **config_overrides: Any,
+    ):
+        self.script_path = os.path.abspath(sys.argv[0]) if sys.argv and sys.argv[0] else "<python>"
+        self.name = name or os.path.basename(self.script_path)
+        self.parsed_args: Optional[Dict[str, Any]] = None
+        self.metrics: Optional[Dict[str, Any]] = None
+        self._config = config
+        self._config_overrides = config_overrides
+        self.start_time: Optional[datetime] = None
+        self.status: Optional[str] = None
+        self.exit_code: Optional[int] = None
+        self._finish_lock = threading.Lock()
+        self._previous_signal_handlers: Dict[int, Any] = {}
+        if args is not None:
+            self._on_report("arguments", vars(args) if isinstance(args, argparse.Namespace) else dict(args))
+
+    def __enter__(self) -> "AlarmContext":
+        if self._config is None:
+            self._config = load_config(**self._config_overrides)
+        self.start_time = datetime.now()
+        utils._report_listeners.append(self._on_report)
+        atexit.register(self._on_interpreter_exit)
+        if threading.current_thread() is threading.main_thread():
+            for signal_name in _NOTIFY_SIGNAL_NAMES:
+                signum = getattr(signal, signal_name, None)
+                # An ignored signal (SIGHUP under nohup) does not stop the process, so it is not reported.
+                if signum is not None and signal.getsignal(signum) != signal.SIG_IGN:
+                    self._previous_signal_handlers[signum] = signal.signal(signum, self._on_signal)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> bool:
+        self._remove_hooks()
+        exit_code = _exit_code_for(exc_value)
+        error_text = None
+        if exit_code != 0:
+            error_text = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback)).strip()
+        self._finish(exit_code, error_text)
+        return False
+
+    def report_arguments(self, args: Union[argparse.Namespace, Dict[str, Any]]) -> None:
+        utils.report_arguments(args)
+
+    def report_metrics(self, metrics: Dict[str, Any]) -> None:
+        utils.report_metrics(metrics)
+
+    def _on_report(self, kind: str, values: Dict[str, Any]) -> None:
+        if kind == "arguments":
+            self.parsed_args = dict(values)
+        else:
+            self.metrics = dict(values)
+
+    def _remove_hooks(self) -> None:
+        if self._on_report in utils._report_listeners:
+            utils._report_listeners.remove(self._on_report)
+        atexit.unregister(self._on_interpreter_exit)
+        for signum, previous_handler in self._previous_signal_handlers.items():
+            signal.signal(signum, previous_handler if previous_handler is not None else signal.SIG_DFL)
+        self._previous_signal_handlers = {}
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        previous_handler = self._previous_signal_handlers.get(signum)
+        self._remove_hooks()
+        stack_text = "".join(traceback.format_stack(frame)).rstrip() if frame is not None else ""
+        self._finish(-signum, f"Stopped by {signal.Signals(signum).name}.\n{stack_text}".strip())
+        # Then behave as if we had never been installed.
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        else:
+            os.kill(os.getpid(), signum)
+
+    def _on_interpreter_exit(self) -> None:
+        self._remove_hooks()
+        self._finish(1, "The interpreter exited before the block finished.")
+
+    def _finish(self, exit_code: int, error_text: Optional[str]) -> None:
+        with self._finish_lock:
+            if self.status is not None:
+                return
+            self.exit_code = exit_code
+            self.status = "Success" if exit_code == 0 else "Failure"
+        end_time = datetime.now()
+        config = self._config
+        executed_command = shlex.join([os.path.basename(sys.executable)] + sys.argv)
+
+        gpu_infos: Optional[list] = None
+        gpu_info_text: Optional[str] = None
+        if config.include_gpu:
+            gpu_infos = collect_gpu_info()
+            gpu_info_text = format_gpu_info_for_text(gpu_infos)
+
+        if config.history_db:
+            try:
+                RunRegistry(config.history_db).record_run(
+                    RunRecord(
+                        script_path=self.script_path,
+                        command=executed_command,
+                        start_time=self.start_time,
+                        end_time=end_time,
+                        exit_code=exit_code,
+                        status=self.status,
+                        host=get_hostname(),
+                        script_args=tuple(sys.argv[1:]),
+                        parsed_args=self.parsed_args,
+                        metrics=self.metrics,
+                        gpu_snapshot=gpu_snapshot_from_infos(gpu_infos) if gpu_infos else None,
+                    )
+                )
+            except (sqlite3.Error, OSError) as e:
+                sys.stderr.write(f"[researchflow.alarm_context] Could not record run in history database {config.history_db}: {e}\n")
+
+        if config.slack_destination == "off":
+            return
+        AlarmSlackSender(config=config).send_alarm_notification(
+            script_name=self.name,
+            status=self.status,
+            duration_str=format_script_duration(self.start_time, end_time),
+            exit_code=exit_code,
+            hostname=get_hostname(),
+            start_time_str=get_kst_timestamp_string(self.start_time),
+            end_time_str=get_kst_timestamp_string(end_time),
+            script_path_str=self.script_path,
+            executed_command_str=executed_command,
+            parsed_args_dict=self.parsed_args,
+            metrics_dict=self.metrics,
+            error_output_str=error_text,
+            gpu_info_text=gpu_info_text,
+        )
+
+
+def alarm_context(
+    name: Optional[str] = None,
+    args: Optional[Union[argparse.Namespace, Dict[str, Any]]] = None,
+    config: Optional[ResearchFlowConfig] = None,
+    **config_overrides: Any,
+) -> AlarmContext:
+    """
+    Reports a block of code to Slack like `alarm` reports a script:
+
+        with researchflow.alarm_context(args=args):
+            train(args)
+
+    `name` defaults to the script file name. `config` defaults to `load_config(**config_overrides)`.
+    """
+    return AlarmContext(name=name, args=args, config=config, **config_overrides)
+
+
+def notify_on_exit(func: Optional[Callable] = None, **context_options: Any) -> Callable:
+    """
+    Decorator form of `alarm_context`, with or without options:
+
+        @researchflow.notify_on_exit
+        def main(): ...
+
+        @researchflow.notify_on_exit(name="nightly-eval", slack_channel="C0123")
+        def main(): ...
+    """
+    if func is None:
+        return lambda decorated: notify_on_exit(decorated, **context_options)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with alarm_context(**context_options):
+            return func(*args, **kwargs)
+
+    return wrapper
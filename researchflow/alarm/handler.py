@@ -1,58 +1,93 @@
 import sys
+import sqlite3
 import subprocess
 from datetime import datetime, timezone, timedelta
 import os
 import json
-import re
-import threading
 import io
 import time
 import traceback
-import socket
-from typing import List, Optional, Any, Dict
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Any, Dict, Sequence, Union
 
 from researchflow.core.config import ResearchFlowConfig, load_config
-from researchflow.core.gpu import collect_gpu_info, format_gpu_info_for_text
+from researchflow.core.gpu import GpuInfo, collect_gpu_info, format_gpu_info_for_text
+from researchflow.core.gpu_lease import GpuLease, GpuLeaseError, acquire_gpu_lease
+from researchflow.core.gpu_timeline import (
+    GpuReading,
+    GpuTimelineSampler,
+    GpuUsage,
+    IdleGpuWatch,
+    format_gpu_usage,
+    is_gpu_sampling_supported,
+)
+from researchflow.core.process_utils import fork_daemon, wait_with_rusage
+from researchflow.core.registry import RunRecord, RunRegistry, gpu_snapshot_from_infos
+from researchflow.core.resources import ProcessTreeSampler, ResourceUsage, format_resource_usage
+from researchflow.core.logtail import read_last_lines, read_last_lines_from_segments
 from researchflow.core.utils import (
     get_kst_timestamp_string,
     format_script_duration,
+    format_byte_size,
+    get_hostname,
 )
 from researchflow.core.slack_sender import AlarmSlackSender
-from .constants import PARSED_ARGS_START_MARKER, PARSED_ARGS_END_MARKER
+from .capture import BoundedOutputCapture
+from .inprocess import InProcessScript
+from .compaction import CompactingWriter, compact_text
+from .constants import (
+    DEFAULT_CAPTURE_HEAD_BYTES,
+    DEFAULT_CAPTURE_TAIL_BYTES,
+    DEFAULT_IDLE_ALERT_LOG_LINES,
+    DEFAULT_IDLE_GPU_THRESHOLD_PERCENT,
+    DEFAULT_LOG_KEEP,
+    DEFAULT_LOG_WRITE_BUFFER_BYTES,
+    DEFAULT_METRICS_SCAN_LINES,
+    DEFAULT_STALL_ALERT_LOG_LINES,
+    DEFAULT_TEE_TERMINAL_BACKLOG_BYTES,
+)
+from .logfile import RotatingLogWriter
+from .markers import LogFileMarkerWatcher, ParsedArgsMarkerParser, find_last_metrics
+from .passthrough import SplicePassthrough, is_raw_passthrough_supported
+from .pump import OutputPump
+from .stall import LogFileActivity, OutputStallWatch, dump_python_stacks, kill_stalled_process
 
+INTERNAL_MONITOR_ENV_KEY = "_ALARM_INTERNAL_MONITOR"
 INTERNAL_LOG_FILE_PATH_ENV_KEY = "_ALARM_LOG_FILE_PATH"
 
 
-def _stream_and_buffer_output(pipe: Optional[io.TextIOWrapper], stream: io.TextIOBase, buffer_list: list):
-    if pipe is None:
-        return
-    try:
-        for line in pipe:
-            stream.write(line)
-            stream.flush()
-            buffer_list.append(line)
-    except ValueError:
-        pass
-    except Exception as e:
-        sys.stderr.write(f"\n[AlarmHandler] Error streaming output: {e}\n")
+@dataclass(frozen=True)
+class AlarmRunResult:
+    exit_code: int
+    status: str
+    start_time: datetime
+    end_time: datetime
+    parsed_args: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    log_file_path: Optional[str] = None
+    resources: Optional[Dict[str, Any]] = None
+    gpu_usage: Optional[List[Dict[str, Any]]] = None
 
-def _read_log_file_content(log_file_path: str) -> str:
-    try:
-        with open(log_file_path, 'r', encoding='utf-8', errors='replace') as f:
-            return f.read()
-    except Exception as e:
-        sys.stderr.write(f"\n[AlarmHandler] Error reading log file {log_file_path}: {e}\n")
-        return ""
 
-def _get_last_n_lines_from_file(file_path: str, n_lines: int = 50) -> str:
+def _get_last_n_lines_from_file(file_path: str, n_lines: int = 50, segment_paths: Optional[Sequence[str]] = None) -> str:
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-        return "".join(lines[-n_lines:])
+        if segment_paths:
+            return read_last_lines_from_segments(list(segment_paths) + [file_path], n_lines)
+        return read_last_lines(file_path, n_lines)
     except Exception:
         return f"Could not read last lines from log file: {file_path}"
 
 
+def _flush_log_sink(log_file_handle: Optional[Any]) -> None:
+    """Writes out log output alarm still holds in its buffer, so a tail read from disk is current."""
+    if log_file_handle is None:
+        return
+    try:
+        log_file_handle.flush()
+    except (OSError, ValueError):
+        pass
+
+
 def _get_kst_log_timestamp() -> str:
     kst = timezone(timedelta(hours=9))
     return datetime.now(tz=kst).strftime("%Y%m%d_%H%M%S_%f_KST")
@@ -69,6 +104,135 @@ def _resolve_log_file_path(target_script_full_path: str, log_dir: Optional[str]
     return os.path.join(base_log_dir, log_file_name)
 
 
+def _record_run_history(history_db: str, record: RunRecord) -> None:
+    try:
+        RunRegistry(history_db).record_run(record)
+    except (sqlite3.Error, OSError) as e:
+        sys.stderr.write(f"[AlarmHandler] Could not record run in history database {history_db}: {e}\n")
+
+
+def _send_idle_gpu_alert(
+        notification_config: ResearchFlowConfig,
+        target_script_full_path: str,
+        pid: int,
+        start_time: datetime,
+        log_file_full_path: Optional[str],
+        threshold_percent: float,
+        idle_seconds: float,
+        readings: List[GpuReading],
+        log_file_handle: Optional[Any] = None,
+    ) -> None:
+    now = datetime.now()
+    idle_duration_str = format_script_duration(now - timedelta(seconds=idle_seconds), now)
+    sys.stderr.write(f"[AlarmHandler] GPUs below {threshold_percent:g}% utilization for {idle_duration_str}.\n")
+    if notification_config.slack_destination == "off":
+        return
+    _flush_log_sink(log_file_handle)
+    try:
+        AlarmSlackSender(config=notification_config).send_idle_gpu_alert(
+            script_name=os.path.basename(target_script_full_path),
+            hostname=get_hostname(),
+            pid=pid,
+            idle_duration_str=idle_duration_str,
+            running_for_str=format_script_duration(start_time, now),
+            threshold_percent=threshold_percent,
+            gpu_lines=[
+                f"GPU {reading.index}: util {reading.utilization_percent:.0f}%, "
+                f"VRAM {reading.memory_used_mib / 1024:.1f}/{reading.memory_total_mib / 1024:.0f} GiB"
+                for reading in readings
+            ],
+            log_file_path_str=log_file_full_path,
+            log_tail_str=_get_last_n_lines_from_file(log_file_full_path, DEFAULT_IDLE_ALERT_LOG_LINES) if log_file_full_path else None,
+        )
+    except Exception as e:
+        sys.stderr.write(f"[AlarmHandler] Could not send idle GPU alert: {e}\n")
+
+
+def _get_capture_tail(stdout_capture: BoundedOutputCapture, stderr_capture: BoundedOutputCapture, n_lines: int) -> str:
+    parts = []
+    for label, capture in (("stdout", stdout_capture), ("stderr", stderr_capture)):
+        lines = capture.get_text().splitlines()[-n_lines:]
+        if lines:
+            parts.append(f"--- {label} ---\n" + "\n".join(lines))
+    return "\n".join(parts)
+
+
+def _handle_output_stall(
+        notification_config: ResearchFlowConfig,
+        target_script_full_path: str,
+        process: subprocess.Popen,
+        start_time: datetime,
+        silent_seconds: float,
+        log_tail_str: Optional[str],
+        log_file_full_path: Optional[str],
+        kill: bool,
+        get_descendant_pids: Callable[[], Any],
+        exited: Any,
+    ) -> None:
+    now = datetime.now()
+    silent_duration_str = format_script_duration(now - timedelta(seconds=silent_seconds), now)
+    action = "Stopping it." if kill else "Still waiting for it."
+    sys.stderr.write(f"\n[AlarmHandler] Script has written no output for {silent_duration_str}. {action}\n")
+
+    stack_dump = dump_python_stacks(process.pid)
+    if stack_dump:
+        sys.stderr.write(f"[AlarmHandler] py-spy dump of PID {process.pid}:\n{stack_dump}\n")
+    if notification_config.slack_destination != "off":
+        try:
+            AlarmSlackSender(config=notification_config).send_stall_alert(
+                script_name=os.path.basename(target_script_full_path),
+                hostname=get_hostname(),
+                pid=process.pid,
+                silent_duration_str=silent_duration_str,
+                running_for_str=format_script_duration(start_time, now),
+                killing=kill,
+                log_file_path_str=log_file_full_path,
+                log_tail_str=log_tail_str,
+                stack_dump_str=stack_dump,
+            )
+        except Exception as e:
+            sys.stderr.write(f"[AlarmHandler] Could not send output stall alert: {e}\n")
+
+    if kill:
+        kill_stalled_process(process, get_descendant_pids(), exited=exited)
+
+
+def _mark_as_monitor_environment(env: Dict[str, str], log_file_full_path: str) -> None:
+    env[INTERNAL_MONITOR_ENV_KEY] = "1"
+    env[INTERNAL_LOG_FILE_PATH_ENV_KEY] = log_file_full_path
+
+
+def _spawn_detached_monitor(
+        log_file_full_path: str,
+        notification_config: ResearchFlowConfig,
+        monitor_kwargs: Dict[str, Any],
+    ) -> int:
+    """
+    Starts `python -m researchflow.alarm.monitor` and hands it the resolved config and run options
+    on stdin, for platforms without os.fork.
+    """
+    new_env = os.environ.copy()
+    _mark_as_monitor_environment(new_env, log_file_full_path)
+
+    popen_kwargs: Dict[str, Any] = {
+        "env": new_env,
+        "stdin": subprocess.PIPE,
+        "stdout": subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL,
+    }
+    if os.name == 'nt':
+        DETACHED_PROCESS = 0x00000008
+        popen_kwargs['creationflags'] = DETACHED_PROCESS
+    else:
+        popen_kwargs['start_new_session'] = True
+
+    process = subprocess.Popen([sys.executable, "-m", "researchflow.alarm.monitor"], **popen_kwargs)
+    monitor_spec = {"config": asdict(notification_config), "kwargs": monitor_kwargs}
+    with process.stdin:
+        process.stdin.write(json.dumps(monitor_spec).encode("utf-8"))
+    return process.pid
+
+
 def execute_script_with_alarm(
         target_script_path: str,
         target_script_args: List[str],
@@ -76,6 +240,25 @@ def execute_script_with_alarm(
         enable_logging: bool = False,
         detach_logging: bool = True,
         notification_config: Optional[ResearchFlowConfig] = None,
+        capture_head_bytes: int = DEFAULT_CAPTURE_HEAD_BYTES,
+        capture_tail_bytes: int = DEFAULT_CAPTURE_TAIL_BYTES,
+        spill_capture: bool = False,
+        raw_passthrough: bool = False,
+        compact_log: bool = False,
+        compact_excerpt: bool = False,
+        log_max_bytes: int = 0,
+        log_keep: int = DEFAULT_LOG_KEEP,
+        log_compression: str = "auto",
+        tee_output: bool = False,
+        gpu_count: int = 0,
+        min_free_gpu_mib: int = 0,
+        on_run_finished: Optional[Callable[[AlarmRunResult], None]] = None,
+        digest_seconds: float = 0,
+        idle_alert_seconds: float = 0,
+        idle_threshold_percent: float = DEFAULT_IDLE_GPU_THRESHOLD_PERCENT,
+        stall_timeout_seconds: float = 0,
+        stall_kill: bool = False,
+        inprocess: bool = False,
     ) -> int:
 
     notification_config = notification_config or load_config()
@@ -88,32 +271,46 @@ def execute_script_with_alarm(
         sys.stderr.write(f"[AlarmHandler] Error resolving script path '{target_script_path}': {e}\n")
         return 1
 
-    if enable_logging and detach_logging and os.environ.get("_ALARM_INTERNAL_MONITOR") is None:
+    if enable_logging and detach_logging and os.environ.get(INTERNAL_MONITOR_ENV_KEY) is None:
         log_file_full_path = _resolve_log_file_path(target_script_full_path, notification_config.log_dir)
+        monitor_kwargs: Dict[str, Any] = {
+            "target_script_path": target_script_full_path,
+            "target_script_args": list(target_script_args),
+            "alarm_command_args_for_display": list(alarm_command_args_for_display),
+            "enable_logging": True,
+            "detach_logging": True,
+            "capture_head_bytes": capture_head_bytes,
+            "capture_tail_bytes": capture_tail_bytes,
+            "spill_capture": spill_capture,
+            "raw_passthrough": raw_passthrough,
+            "compact_log": compact_log,
+            "compact_excerpt": compact_excerpt,
+            "log_max_bytes": log_max_bytes,
+            "log_keep": log_keep,
+            "log_compression": log_compression,
+            "tee_output": tee_output,
+            "gpu_count": gpu_count,
+            "min_free_gpu_mib": min_free_gpu_mib,
+            "digest_seconds": digest_seconds,
+            "idle_alert_seconds": idle_alert_seconds,
+            "idle_threshold_percent": idle_threshold_percent,
+            "stall_timeout_seconds": stall_timeout_seconds,
+            "stall_kill": stall_kill,
+            "inprocess": inprocess,
+        }
+
+        if hasattr(os, "fork"):
+            def _run_monitor() -> int:
+                _mark_as_monitor_environment(os.environ, log_file_full_path)
+                return execute_script_with_alarm(notification_config=notification_config, **monitor_kwargs)
+
+            monitor_pid = fork_daemon(_run_monitor)
+        else:
+            monitor_pid = _spawn_detached_monitor(log_file_full_path, notification_config, monitor_kwargs)
 
-        new_env = os.environ.copy()
-        new_env["_ALARM_INTERNAL_MONITOR"] = "1"
-        new_env[INTERNAL_LOG_FILE_PATH_ENV_KEY] = log_file_full_path
-        
-        command_to_rerun = [sys.executable] + sys.argv
-        
-        popen_kwargs: Dict[str, Any] = {"env": new_env}
-
-        if os.name == 'posix':
-            popen_kwargs['start_new_session'] = True
-        elif os.name == 'nt':
-            DETACHED_PROCESS = 0x00000008
-            popen_kwargs['creationflags'] = DETACHED_PROCESS
-        
-        popen_kwargs['stdout'] = subprocess.DEVNULL
-        popen_kwargs['stderr'] = subprocess.DEVNULL
-        popen_kwargs['stdin'] = subprocess.DEVNULL
-
-        process = subprocess.Popen(command_to_rerun, **popen_kwargs)
-        
-        sys.stdout.write(f"[AlarmHandler] Process started in background (PID: {process.pid}).\n")
+        sys.stdout.write(f"[AlarmHandler] Process started in background (PID: {monitor_pid}).\n")
         sys.stdout.write(f"[AlarmHandler] Logging stdout/stderr to: {log_file_full_path}\n")
-        
+
         return 0
     
     if notification_config.slack_destination == "off":
@@ -128,7 +325,7 @@ def execute_script_with_alarm(
     command = [sys.executable, target_script_full_path] + target_script_args
     
     start_time = datetime.now()
-    process: Optional[subprocess.Popen] = None
+    process: Optional[Union[subprocess.Popen, InProcessScript]] = None
     return_code = 1 
     status = "Failure"
     parsed_args_dict: Optional[Dict[str, Any]] = None
@@ -140,16 +337,43 @@ def execute_script_with_alarm(
         executed_command_display = f"alarm --log {' '.join(alarm_command_args_for_display)}"
         if not detach_logging:
             executed_command_display = f"alarm --log --wait {' '.join(alarm_command_args_for_display)}"
+    if enable_logging and tee_output and not detach_logging:
+        executed_command_display = executed_command_display.replace("alarm --log --wait ", "alarm --log --tee ", 1)
+    if raw_passthrough:
+        executed_command_display = executed_command_display.replace("alarm ", "alarm --raw ", 1)
+    if inprocess:
+        executed_command_display = executed_command_display.replace("alarm ", "alarm --inprocess ", 1)
+    if gpu_count > 0:
+        gpu_flags = f"--gpus {gpu_count}" + (f" --min-free-mib {min_free_gpu_mib}" if min_free_gpu_mib else "")
+        executed_command_display = executed_command_display.replace("alarm ", f"alarm {gpu_flags} ", 1)
+
+    # --tee and --raw keep the terminal attached, so with a foreground --log the child output goes
+    # through alarm to both the terminal and the log file. A detached --log monitor has no terminal
+    # to feed. In tee mode the terminal side may drop output when it falls behind; the log never does.
+    # --compact-log and --log-max-size also route output through alarm, because the child cannot
+    # compact or rotate its own log file. So does --inprocess, whose output always goes through pipes.
+    rotate_log = log_max_bytes > 0
+    echo_to_terminal = not enable_logging or ((raw_passthrough or tee_output) and not detach_logging)
+    throttle_terminal = enable_logging and echo_to_terminal
+    stream_log_through_alarm = enable_logging and (echo_to_terminal or compact_log or rotate_log or inprocess)
+    use_splice = (
+        raw_passthrough
+        and not inprocess
+        and echo_to_terminal
+        and not (compact_log or rotate_log)
+        and is_raw_passthrough_supported()
+    )
+    if raw_passthrough and echo_to_terminal and not use_splice:
+        if inprocess:
+            sys.stderr.write("[AlarmHandler] --raw has no child pipes to splice with --inprocess. Using the buffered output pump instead.\n")
+        elif compact_log or rotate_log:
+            sys.stderr.write("[AlarmHandler] --raw cannot compact or rotate the log in the kernel. Using the buffered output pump instead.\n")
+        else:
+            sys.stderr.write("[AlarmHandler] --raw needs Linux os.splice/os.sendfile. Using the buffered output pump instead.\n")
 
-
-    popen_kwargs: Dict[str, Any] = {
-        "text": True,
-        "encoding": 'utf-8',
-        "errors": 'replace',
-        "bufsize": 1
-    }
+    popen_kwargs: Dict[str, Any] = {}
     
-    log_file_handle: Optional[io.TextIOWrapper] = None
+    log_file_handle: Optional[Any] = None
 
     if enable_logging:
         log_file_full_path = os.environ.get(INTERNAL_LOG_FILE_PATH_ENV_KEY) or _resolve_log_file_path(
@@ -160,11 +384,16 @@ def execute_script_with_alarm(
         sys.stdout.write(f"[AlarmHandler] Logging stdout/stderr to: {log_file_full_path}\n")
         try:
             os.makedirs(os.path.dirname(log_file_full_path), exist_ok=True)
-            log_file_handle = open(log_file_full_path, 'w', encoding='utf-8', errors='replace')
-            popen_kwargs["stdout"] = log_file_handle
-            popen_kwargs["stderr"] = subprocess.STDOUT
+            if rotate_log:
+                log_file_handle = RotatingLogWriter(log_file_full_path, log_max_bytes, log_keep, log_compression)
+            elif stream_log_through_alarm:
+                log_file_handle = open(log_file_full_path, 'w+b', buffering=DEFAULT_LOG_WRITE_BUFFER_BYTES)
+            else:
+                log_file_handle = open(log_file_full_path, 'w', encoding='utf-8', errors='replace')
+                popen_kwargs["stdout"] = log_file_handle
+                popen_kwargs["stderr"] = subprocess.STDOUT
             if os.name == 'posix':
-                popen_kwargs["preexec_fn"] = os.setsid
+                popen_kwargs["start_new_session"] = True
         except Exception as e:
             sys.stderr.write(f"[AlarmHandler] Error opening log file {log_file_full_path}: {e}. Logging disabled.\n")
             enable_logging = False
@@ -172,55 +401,185 @@ def execute_script_with_alarm(
             log_file_full_path = None
 
 
-    if not enable_logging: 
+    if not enable_logging or stream_log_through_alarm:
         popen_kwargs["stdout"] = subprocess.PIPE
         popen_kwargs["stderr"] = subprocess.PIPE
-
-    stdout_buffer: List[str] = []
-    stderr_buffer: List[str] = []
+        popen_kwargs["bufsize"] = 0
+
+    stdout_capture = BoundedOutputCapture(capture_head_bytes, capture_tail_bytes)
+    stderr_capture = BoundedOutputCapture(
+        capture_head_bytes,
+        capture_tail_bytes,
+        spill_to_file=spill_capture and not enable_logging,
+        spill_prefix="researchflow_stderr_",
+    )
+    marker_parser = ParsedArgsMarkerParser()
+    log_marker_watcher: Optional[LogFileMarkerWatcher] = None
+    gpu_lease: Optional[GpuLease] = None
+    resource_sampler: Optional[ProcessTreeSampler] = None
+    resource_usage: Optional[ResourceUsage] = None
+    gpu_sampler: Optional[GpuTimelineSampler] = None
+    gpu_usage: List[GpuUsage] = []
+    stall_watch: Optional[OutputStallWatch] = None
 
     try:
-        process = subprocess.Popen(command, **popen_kwargs)
-
-        stdout_thread: Optional[threading.Thread] = None
-        stderr_thread: Optional[threading.Thread] = None
-
-        if not enable_logging and process.stdout and process.stderr:
-            stdout_thread = threading.Thread(
-                target=_stream_and_buffer_output,
-                args=(process.stdout, sys.stdout, stdout_buffer),
-                daemon=True
+        if gpu_count > 0:
+            gpu_lease = acquire_gpu_lease(gpu_count, min_free_gpu_mib)
+            popen_kwargs["env"] = gpu_lease.apply_to_env(os.environ.copy())
+            sys.stdout.write(f"[AlarmHandler] Leased GPU(s): CUDA_VISIBLE_DEVICES={gpu_lease.cuda_visible_devices}\n")
+            start_time = datetime.now()
+        if stall_kill and inprocess:
+            sys.stderr.write("[AlarmHandler] --stall-kill cannot stop a script running inside alarm. Only the stall alert is sent.\n")
+            stall_kill = False
+        if stall_timeout_seconds > 0 and stall_kill:
+            # A SIGABRT from kill_stalled_process then makes a Python child print every thread's stack.
+            popen_kwargs["env"] = popen_kwargs.get("env") or os.environ.copy()
+            popen_kwargs["env"].setdefault("PYTHONFAULTHANDLER", "1")
+
+        if inprocess:
+            process = InProcessScript(target_script_full_path, target_script_args, env=popen_kwargs.get("env")).start()
+        else:
+            process = subprocess.Popen(command, **popen_kwargs)
+        resource_sampler = ProcessTreeSampler(process.pid, exclude_prior_usage=inprocess).start()
+        if stall_timeout_seconds > 0:
+            def _on_stall(silent_seconds: float, process: subprocess.Popen = process) -> None:
+                if enable_logging and log_file_full_path:
+                    _flush_log_sink(log_file_handle)
+                    log_tail = _get_last_n_lines_from_file(log_file_full_path, DEFAULT_STALL_ALERT_LOG_LINES)
+                else:
+                    log_tail = _get_capture_tail(stdout_capture, stderr_capture, DEFAULT_STALL_ALERT_LOG_LINES)
+                _handle_output_stall(
+                    notification_config,
+                    target_script_full_path,
+                    process,
+                    start_time,
+                    silent_seconds,
+                    log_tail,
+                    log_file_full_path if enable_logging else None,
+                    stall_kill,
+                    lambda: resource_sampler.tree_pids,
+                    stall_watch.stopped,
+                )
+
+            stall_watch = OutputStallWatch(stall_timeout_seconds, _on_stall)
+        idle_gpu_watch: Optional[IdleGpuWatch] = None
+        if idle_alert_seconds > 0:
+            idle_gpu_watch = IdleGpuWatch(
+                idle_threshold_percent,
+                idle_alert_seconds,
+                on_idle=lambda idle_seconds, readings, pid=process.pid: _send_idle_gpu_alert(
+                    notification_config,
+                    target_script_full_path,
+                    pid,
+                    start_time,
+                    log_file_full_path,
+                    idle_threshold_percent,
+                    idle_seconds,
+                    readings,
+                    log_file_handle,
+                ),
             )
-            stderr_thread = threading.Thread(
-                target=_stream_and_buffer_output,
-                args=(process.stderr, sys.stderr, stderr_buffer),
-                daemon=True
+        if (notification_config.include_gpu or idle_gpu_watch) and is_gpu_sampling_supported():
+            gpu_sampler = GpuTimelineSampler(
+                lambda: resource_sampler.tree_pids,
+                assigned_gpu_uuids=[gpu.uuid for gpu in gpu_lease.gpus] if gpu_lease else (),
+                on_sample=idle_gpu_watch.observe if idle_gpu_watch else None,
+            ).start()
+        elif idle_gpu_watch:
+            sys.stderr.write("[AlarmHandler] --idle-alert needs nvidia-smi or pynvml. Idle GPU alerts are off.\n")
+
+        if enable_logging and log_file_full_path and not stream_log_through_alarm:
+            log_marker_watcher = LogFileMarkerWatcher(log_file_full_path, marker_parser)
+            log_marker_watcher.start()
+
+        if use_splice and process.stdout and process.stderr:
+            log_fd = log_file_handle.fileno() if stream_log_through_alarm and log_file_handle else None
+            passthrough = SplicePassthrough(process)
+            passthrough.add_raw_stream(
+                process.stdout,
+                sys.stdout,
+                log_fd=log_fd,
+                capture=None if log_fd is not None else stdout_capture,
+                marker_parser=marker_parser,
             )
-            stdout_thread.start()
-            stderr_thread.start()
-
-        return_code = process.wait()
+            passthrough.add_raw_stream(
+                process.stderr,
+                sys.stderr,
+                log_fd=log_fd,
+                capture=None if log_fd is not None else stderr_capture,
+            )
+            if stall_watch:
+                stall_watch.start(lambda: passthrough.last_activity)
+            passthrough.run()
+        elif process.stdout and process.stderr:
+            compacting_writers: List[CompactingWriter] = []
+
+            def _compacting(write):
+                writer = CompactingWriter(write)
+                compacting_writers.append(writer)
+                return writer.write
+
+            stdout_consumers = [marker_parser.feed]
+            stderr_consumers = []
+            for consumers, capture in ((stdout_consumers, stdout_capture), (stderr_consumers, stderr_capture)):
+                consumers.append(_compacting(capture.write) if compact_excerpt else capture.write)
+                if stream_log_through_alarm and log_file_handle:
+                    consumers.append(_compacting(log_file_handle.write) if compact_log else log_file_handle.write)
+
+            terminal_backlog_bytes = DEFAULT_TEE_TERMINAL_BACKLOG_BYTES if throttle_terminal else 0
+            # In-process, fds 1 and 2 are the pipes being pumped; the terminal is behind saved copies.
+            terminal_stdout, terminal_stderr = (
+                (process.terminal_stdout, process.terminal_stderr) if inprocess else (sys.stdout, sys.stderr)
+            )
+            output_pump = OutputPump(process)
+            output_pump.add_stream(
+                process.stdout,
+                terminal_stdout if echo_to_terminal else None,
+                stdout_consumers,
+                max_sink_backlog_bytes=terminal_backlog_bytes,
+            )
+            output_pump.add_stream(
+                process.stderr,
+                terminal_stderr if echo_to_terminal else None,
+                stderr_consumers,
+                max_sink_backlog_bytes=terminal_backlog_bytes,
+            )
+            if stream_log_through_alarm and log_file_handle:
+                output_pump.add_periodic_flush(log_file_handle.flush)
+            if stall_watch:
+                stall_watch.start(lambda: output_pump.last_activity)
+            if inprocess:
+                process.run_alongside(output_pump.run)
+            else:
+                output_pump.run()
+            for writer in compacting_writers:
+                writer.flush()
+            if output_pump.dropped_sink_bytes:
+                sys.stderr.write(
+                    f"[AlarmHandler] Terminal could not keep up; {format_byte_size(output_pump.dropped_sink_bytes)} "
+                    f"of output was only written to the log file.\n"
+                )
+        elif stall_watch and log_file_full_path:
+            stall_watch.start(LogFileActivity(log_file_full_path))
+
+        return_code, child_rusage = wait_with_rusage(process)
         end_time = datetime.now()
-
-        if stdout_thread: stdout_thread.join(timeout=2.0)
-        if stderr_thread: stderr_thread.join(timeout=2.0)
+        if stall_watch:
+            stall_watch.stop()
+        resource_usage = resource_sampler.stop(child_rusage)
+        if gpu_sampler:
+            gpu_usage = gpu_sampler.stop()
         
-        output_content_for_parsing: str
         if enable_logging and log_file_full_path:
             if log_file_handle: log_file_handle.close() 
-            output_content_for_parsing = _read_log_file_content(log_file_full_path)
+            if log_marker_watcher: log_marker_watcher.stop()
         else:
-            output_content_for_parsing = "".join(stdout_buffer)
-            error_message_for_slack = "".join(stderr_buffer).strip()
+            error_message_for_slack = stderr_capture.render_excerpt().strip()
+            if compact_excerpt and use_splice:
+                error_message_for_slack = compact_text(error_message_for_slack)
 
-        match = re.search(
-            f"{re.escape(PARSED_ARGS_START_MARKER)}(.*?){re.escape(PARSED_ARGS_END_MARKER)}",
-            output_content_for_parsing,
-            re.DOTALL
-        )
-
-        if match:
-            json_string = match.group(1).strip()
+        if marker_parser.json_text is not None:
+            json_string = marker_parser.json_text
             try:
                 parsed_args_dict = json.loads(json_string)
             except json.JSONDecodeError as json_err:
@@ -249,10 +608,25 @@ def execute_script_with_alarm(
         else:
             status = "Failure"
             if enable_logging and log_file_full_path and status == "Failure":
-                error_message_for_slack = f"Script failed. Check log for details: {log_file_full_path}\n--- Last 50 lines ---\n{_get_last_n_lines_from_file(log_file_full_path)}"
+                segment_paths = log_file_handle.segment_paths if isinstance(log_file_handle, RotatingLogWriter) else None
+                last_lines = _get_last_n_lines_from_file(log_file_full_path, segment_paths=segment_paths)
+                if compact_excerpt:
+                    last_lines = compact_text(last_lines)
+                error_message_for_slack = f"Script failed. Check log for details: {log_file_full_path}\n--- Last 50 lines ---\n{last_lines}"
             elif not error_message_for_slack and status == "Failure":
                     error_message_for_slack = f"Script failed with exit code {return_code} and no specific stderr output."
+            if stall_watch and stall_watch.fired and stall_kill:
+                stalled_for_str = format_script_duration(end_time - timedelta(seconds=stall_timeout_seconds), end_time)
+                error_message_for_slack = (
+                    f"[AlarmHandler] Stopped after writing no output for {stalled_for_str}.\n{error_message_for_slack or ''}"
+                ).strip()
             
+    except GpuLeaseError as e:
+        end_time = datetime.now()
+        status = "Failure"
+        error_message_for_slack = f"[AlarmHandler] Could not lease GPUs: {e}"
+        sys.stderr.write(error_message_for_slack + "\n")
+        return_code = 1
     except FileNotFoundError:
         end_time = datetime.now()
         status = "Failure"
@@ -270,34 +644,85 @@ def execute_script_with_alarm(
         if 'end_time' not in locals():
             end_time = datetime.now()
         if process:
-            if process.stdout and not enable_logging: process.stdout.close()
-            if process.stderr and not enable_logging: process.stderr.close()
+            if process.stdout: process.stdout.close()
+            if process.stderr: process.stderr.close()
             if process.poll() is None:
                 sys.stderr.write("[AlarmHandler] Terminating script due to error in alarm tool.\n")
                 process.terminate()
                 time.sleep(0.5)
                 if process.poll() is None:
                     process.kill()
+        if stall_watch:
+            stall_watch.stop()
+        if resource_sampler:
+            resource_usage = resource_sampler.stop()
+        if gpu_sampler:
+            gpu_usage = gpu_sampler.stop()
+        if log_marker_watcher:
+            log_marker_watcher.stop(timeout=0)
+        if gpu_lease:
+            gpu_lease.release()
         if log_file_handle and not log_file_handle.closed:
             log_file_handle.close()
+        stdout_capture.close()
+        stderr_capture.close()
+
+    final_metrics_dict: Optional[Dict[str, Any]] = None
+    if process is not None:
+        if enable_logging and log_file_full_path:
+            segment_paths = log_file_handle.segment_paths if isinstance(log_file_handle, RotatingLogWriter) else None
+            metrics_text = _get_last_n_lines_from_file(log_file_full_path, DEFAULT_METRICS_SCAN_LINES, segment_paths)
+        else:
+            metrics_text = stdout_capture.get_text()
+        final_metrics_dict = find_last_metrics(metrics_text)
+
+    resource_usage_text: Optional[str] = None
+    if resource_usage is not None:
+        resource_usage_text = format_resource_usage(resource_usage)
+        sys.stdout.write(f"[AlarmHandler] Resources: {resource_usage_text}\n")
 
+    gpu_usage_text: Optional[str] = None
+    if gpu_usage:
+        gpu_usage_text = format_gpu_usage(gpu_usage)
+        sys.stdout.write(f"[AlarmHandler] GPU usage:\n{gpu_usage_text}\n")
 
     gpu_info_text: Optional[str] = None
+    gpu_infos: Optional[List[GpuInfo]] = None
     if notification_config.include_gpu:
-        gpu_info_text = format_gpu_info_for_text(collect_gpu_info())
+        gpu_infos = collect_gpu_info()
+        gpu_info_text = format_gpu_info_for_text(gpu_infos)
+    elif gpu_lease:
+        gpu_infos = gpu_lease.gpus
+
+    if notification_config.history_db:
+        _record_run_history(
+            notification_config.history_db,
+            RunRecord(
+                script_path=target_script_full_path,
+                command=executed_command_display,
+                start_time=start_time,
+                end_time=end_time,
+                exit_code=return_code if return_code is not None else 1,
+                status=status,
+                host=get_hostname(),
+                script_args=tuple(target_script_args),
+                parsed_args=parsed_args_dict,
+                metrics=final_metrics_dict,
+                log_path=log_file_full_path if enable_logging else None,
+                gpu_snapshot=gpu_snapshot_from_infos(gpu_infos) if gpu_infos else None,
+                resources=resource_usage.to_dict() if resource_usage else None,
+                gpu_usage=[usage.to_dict() for usage in gpu_usage] or None,
+            ),
+        )
 
     if notification_config.slack_destination != "off":
-        sys.stdout.write("\n[AlarmHandler] Sending Slack notification...\n")
-        
-        hostname = ""
-        try:
-            hostname = os.uname().nodename
-        except AttributeError: 
-            try:
-                hostname = socket.gethostname()
-            except Exception:
-                hostname = "N/A"
+        if digest_seconds > 0:
+            sys.stdout.write(f"\n[AlarmHandler] Adding Slack notification to the {digest_seconds:g}s digest...\n")
+        else:
+            sys.stdout.write("\n[AlarmHandler] Sending Slack notification...\n")
         
+        hostname = get_hostname()
+
         sender = AlarmSlackSender(config=notification_config)
         sender.send_alarm_notification(
             script_name=os.path.basename(target_script_full_path),
@@ -310,11 +735,30 @@ def execute_script_with_alarm(
             script_path_str=target_script_full_path,
             executed_command_str=executed_command_display,
             parsed_args_dict=parsed_args_dict,
+            metrics_dict=final_metrics_dict,
             error_output_str=error_message_for_slack,
             log_file_path_str=log_file_full_path if enable_logging else None,
             gpu_info_text=gpu_info_text,
+            resource_usage_text=resource_usage_text,
+            gpu_usage_text=gpu_usage_text,
+            digest_seconds=digest_seconds,
         )
     else:
         sys.stdout.write("\n[AlarmHandler] Skipping Slack notification.\n")
 
+    if on_run_finished is not None:
+        on_run_finished(
+            AlarmRunResult(
+                exit_code=return_code if return_code is not None else 1,
+                status=status,
+                start_time=start_time,
+                end_time=end_time,
+                parsed_args=parsed_args_dict,
+                metrics=final_metrics_dict,
+                log_file_path=log_file_full_path if enable_logging else None,
+                resources=resource_usage.to_dict() if resource_usage else None,
+                gpu_usage=[usage.to_dict() for usage in gpu_usage] or None,
+            )
+        )
+
     return return_code if return_code is not None else 1
@@ -0,0 +1,88 @@
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence, Tuple
+
+from researchflow.core.registry import RunRecord, RunRegistry
+from researchflow.core.utils import (
+    format_script_duration,
+    format_text_table,
+    get_kst_timestamp_string,
+    parse_duration_seconds,
+)
+
+HISTORY_STATUS_CHOICES = ("success", "failure")
+_MAX_COMMAND_WIDTH = 80
+_MAX_TABLE_METRICS = 3
+
+
+def parse_since(text: str) -> datetime:
+    """Reads a --since value: a duration before now (e.g. 12h, 7d) or an ISO date/time."""
+    try:
+        return datetime.now() - timedelta(seconds=parse_duration_seconds(text))
+    except ValueError:
+        return datetime.fromisoformat(text)
+
+
+def parse_arg_filter(text: str) -> Tuple[str, str]:
+    name, separator, value = text.partition("=")
+    if not separator or not name.strip("-"):
+        raise ValueError(f"Expected NAME=VALUE, got {text!r}")
+    return name, value
+
+
+def _format_metric(value: Any) -> str:
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+
+def format_history_table(records: Sequence[RunRecord]) -> str:
+    rows = [["id", "started", "time", "exit", "host", "command", "metrics"]]
+    for record in records:
+        command = " ".join([record.script_name] + list(record.script_args))
+        if len(command) > _MAX_COMMAND_WIDTH:
+            command = command[:_MAX_COMMAND_WIDTH - 3] + "..."
+        metrics = list((record.metrics or {}).items())[:_MAX_TABLE_METRICS]
+        rows.append([
+            str(record.run_id),
+            get_kst_timestamp_string(record.start_time, "%Y-%m-%d %H:%M"),
+            format_script_duration(record.start_time, record.end_time),
+            str(record.exit_code),
+            record.host,
+            command,
+            " ".join(f"{key}={_format_metric(value)}" for key, value in metrics),
+        ])
+    return format_text_table(rows)
+
+
+def show_history(
+        history_db: Optional[str],
+        script: Optional[str] = None,
+        since: Optional[datetime] = None,
+        status: Optional[str] = None,
+        host: Optional[str] = None,
+        arg_filters: Sequence[Tuple[str, str]] = (),
+        limit: int = 20,
+    ) -> int:
+    """Prints recorded runs matching the filters, newest first."""
+    if not history_db:
+        sys.stderr.write("[AlarmHistory] Run history is turned off (history_db is 'off').\n")
+        return 1
+
+    try:
+        records = RunRegistry(history_db).query_runs(
+            script=script,
+            since=since,
+            status=status.capitalize() if status else None,
+            host=host,
+            arg_filters=arg_filters,
+            limit=limit,
+        )
+    except (sqlite3.Error, OSError, ValueError) as e:
+        sys.stderr.write(f"[AlarmHistory] Could not read run history from {history_db}: {e}\n")
+        return 1
+
+    if not records:
+        sys.stdout.write(f"[AlarmHistory] No matching runs in {history_db}.\n")
+        return 0
+    sys.stdout.write(format_history_table(records) + "\n")
+    return 0
@@ -0,0 +1,152 @@
+import os
+import runpy
+import signal
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _exit_code_from_system_exit(exit_request: SystemExit) -> int:
+    code = exit_request.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    # Like the interpreter: any other exit value is printed to stderr and means failure.
+    sys.stderr.write(f"{code}\n")
+    return 1
+
+
+class InProcessScript:
+    """
+    Runs a Python script with runpy.run_path in this process instead of a child interpreter,
+    for short scripts where interpreter startup and imports dominate. Stands in for the
+    subprocess.Popen of a normal run: file descriptors 1 and 2 are redirected into pipes while
+    the script runs, so `stdout` and `stderr` feed the same output pump, capture and log file,
+    and output from C extensions or subprocesses the script starts is included.
+
+    The script runs on the calling (main) thread so it can install signal handlers. The
+    terminal is still reachable through `terminal_stdout` and `terminal_stderr`.
+    """
+
+    def __init__(self, script_path: str, script_args: List[str], env: Optional[Dict[str, str]] = None):
+        self.script_path = script_path
+        self.script_args = list(script_args)
+        self.env = env
+        self.pid = os.getpid()
+        self.returncode: Optional[int] = None
+        self.stdout: Optional[Any] = None
+        self.stderr: Optional[Any] = None
+        self.terminal_stdout: Optional[Any] = None
+        self.terminal_stderr: Optional[Any] = None
+        self._saved_fds: List[int] = []
+        self._saved_streams: Optional[Tuple[Any, Any]] = None
+        self._finished = threading.Event()
+
+    def start(self) -> "InProcessScript":
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pipes = []
+        for target_fd in (1, 2):
+            read_fd, write_fd = os.pipe()
+            self._saved_fds.append(os.dup(target_fd))
+            os.dup2(write_fd, target_fd)
+            os.close(write_fd)
+            pipes.append(os.fdopen(read_fd, "rb", buffering=0))
+        self.stdout, self.stderr = pipes
+        self.terminal_stdout = os.fdopen(self._saved_fds[0], "wb", buffering=0, closefd=False)
+        self.terminal_stderr = os.fdopen(self._saved_fds[1], "wb", buffering=0, closefd=False)
+
+        # sys.stdout may not write to fd 1 (e.g. under a test runner's capture), so point it there too.
+        self._saved_streams = (sys.stdout, sys.stderr)
+        encoding = getattr(sys.stdout, "encoding", None) or "utf-8"
+        sys.stdout = open(1, "w", encoding=encoding, buffering=1, closefd=False)
+        sys.stderr = open(2, "w", encoding=encoding, errors="backslashreplace", buffering=1, closefd=False)
+        return self
+
+    def _restore_standard_fds(self) -> None:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        if self._saved_streams is not None:
+            sys.stdout, sys.stderr = self._saved_streams
+            self._saved_streams = None
+        # Putting the terminal back closes the pipes' write ends, so the pump sees end of output.
+        for target_fd, saved_fd in zip((1, 2), self._saved_fds):
+            os.dup2(saved_fd, target_fd)
+
+    def _close_saved_fds(self) -> None:
+        # Only after the pump is done: the terminal sinks still write through these.
+        for saved_fd in self._saved_fds:
+            os.close(saved_fd)
+        self._saved_fds = []
+
+    def _print_script_traceback(self, error: BaseException) -> None:
+        """Prints the traceback starting at the script's own frame, like the interpreter would."""
+        tb = error.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != self.script_path:
+            tb = tb.tb_next
+        traceback.print_exception(type(error), error, tb or error.__traceback__)
+
+    def _run_script(self) -> int:
+        saved_argv = sys.argv[:]
+        saved_path = sys.path[:]
+        # Also undoes the script's own changes: the next job in this interpreter starts from alarm's environment.
+        saved_environ = dict(os.environ)
+        sys.argv = [self.script_path] + self.script_args
+        sys.path.insert(0, os.path.dirname(self.script_path))
+        if self.env is not None:
+            os.environ.update(self.env)
+        try:
+            runpy.run_path(self.script_path, run_name="__main__")
+            return 0
+        except SystemExit as exit_request:
+            return _exit_code_from_system_exit(exit_request)
+        except KeyboardInterrupt as error:
+            self._print_script_traceback(error)
+            return -signal.SIGINT
+        except BaseException as error:
+            self._print_script_traceback(error)
+            return 1
+        finally:
+            sys.argv = saved_argv
+            sys.path[:] = saved_path
+            os.environ.clear()
+            os.environ.update(saved_environ)
+
+    def run_alongside(self, pump: Callable[[], None]) -> int:
+        """Runs the script on this thread while `pump` drains its output on another."""
+        pump_thread = threading.Thread(target=pump, name="researchflow-inprocess-pump", daemon=True)
+        pump_thread.start()
+        try:
+            self.returncode = self._run_script()
+        finally:
+            if self.returncode is None:
+                self.returncode = 1
+            self._restore_standard_fds()
+            self._finished.set()
+            pump_thread.join()
+            self._close_saved_fds()
+        return self.returncode
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        self._finished.wait(timeout)
+        return self.returncode
+
+    def close(self) -> None:
+        """Gives fds 1 and 2 back to the terminal if start() ran but run_alongside never did."""
+        if self._saved_fds:
+            self._restore_standard_fds()
+            self._close_saved_fds()
+        if self.returncode is None:
+            self.returncode = 1
+        self._finished.set()
+
+    terminate = close
+    kill = close
@@ -0,0 +1,180 @@
+import json
+import os
+import shlex
+import sys
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from researchflow.core.config import ResearchFlowConfig, load_config
+from researchflow.core.slack_sender import AlarmSlackSender
+from researchflow.core.utils import format_script_duration, get_hostname, get_kst_timestamp_string
+from .handler import AlarmRunResult, execute_script_with_alarm
+
+QUEUE_NOTIFY_CHOICES = ("each", "summary", "both")
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    script_path: str
+    script_args: Tuple[str, ...] = ()
+
+    @property
+    def display(self) -> str:
+        return " ".join([self.script_path] + list(self.script_args))
+
+
+@dataclass(frozen=True)
+class QueuedJobResult:
+    job: QueuedJob
+    exit_code: int
+    start_time: datetime
+    end_time: datetime
+    run_result: Optional[AlarmRunResult] = None
+    # Position of `job` in the list given to run_jobs; equal jobs can appear more than once.
+    job_index: int = 0
+
+
+def _job_from_tokens(tokens: List[str], source: str) -> QueuedJob:
+    if tokens and os.path.basename(tokens[0]).startswith("python") and not tokens[0].endswith(".py"):
+        tokens = tokens[1:]
+    if not tokens:
+        raise ValueError(f"Queue entry has no script: {source}")
+    return QueuedJob(script_path=tokens[0], script_args=tuple(tokens[1:]))
+
+
+def _job_from_json_entry(entry: Any) -> QueuedJob:
+    if isinstance(entry, str):
+        return _job_from_tokens(shlex.split(entry), entry)
+    if isinstance(entry, list):
+        return _job_from_tokens([str(token) for token in entry], json.dumps(entry))
+    if isinstance(entry, dict) and entry.get("script"):
+        return QueuedJob(script_path=str(entry["script"]), script_args=tuple(str(arg) for arg in entry.get("args", [])))
+    raise ValueError(f"Queue entry must be a command string, a list, or an object with 'script': {entry!r}")
+
+
+def load_job_queue(queue_path: str) -> List[QueuedJob]:
+    """
+    Reads jobs from a text file with one command line per line (blank lines and # comments are
+    skipped), or from a JSON list of command strings or {"script": ..., "args": [...]} objects.
+    A leading `python` token is dropped, so existing `python train.py ...` lines work as-is.
+    """
+    with open(queue_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if queue_path.endswith(".json") or content.lstrip().startswith("["):
+        entries = json.loads(content)
+        if not isinstance(entries, list):
+            raise ValueError(f"Queue file must contain a JSON list: {queue_path}")
+        return [_job_from_json_entry(entry) for entry in entries]
+
+    jobs = []
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        jobs.append(_job_from_tokens(shlex.split(stripped), stripped))
+    return jobs
+
+
+def run_jobs(
+        jobs: List[QueuedJob],
+        max_parallel: int,
+        job_config: ResearchFlowConfig,
+        **run_options: Any,
+    ) -> List[QueuedJobResult]:
+    """
+    Runs every job through execute_script_with_alarm from this process, at most `max_parallel`
+    at a time, each with its own log file. Results keep the order of `jobs`.
+    """
+    results: List[Optional[QueuedJobResult]] = [None] * len(jobs)
+    output_lock = threading.Lock()
+
+    def report(message: str) -> None:
+        with output_lock:
+            sys.stdout.write(f"[AlarmQueue] {message}\n")
+            sys.stdout.flush()
+
+    def run_one(index: int, job: QueuedJob) -> None:
+        report(f"[{index + 1}/{len(jobs)}] Starting: {job.display}")
+        run_results: List[AlarmRunResult] = []
+        start_time = datetime.now()
+        try:
+            exit_code = execute_script_with_alarm(
+                job.script_path,
+                list(job.script_args),
+                [job.script_path] + list(job.script_args),
+                enable_logging=True,
+                detach_logging=False,
+                notification_config=job_config,
+                on_run_finished=run_results.append,
+                **run_options,
+            )
+        except Exception as e:
+            sys.stderr.write(f"[AlarmQueue] Error running {job.display}: {e}\n")
+            exit_code = 1
+        end_time = datetime.now()
+        results[index] = QueuedJobResult(
+            job, exit_code, start_time, end_time, run_results[0] if run_results else None, job_index=index,
+        )
+        report(
+            f"[{index + 1}/{len(jobs)}] Finished with exit code {exit_code} "
+            f"in {format_script_duration(start_time, end_time)}: {job.display}"
+        )
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        for index, job in enumerate(jobs):
+            executor.submit(run_one, index, job)
+
+    finished_results = [result for result in results if result is not None]
+    failed_count = sum(1 for result in finished_results if result.exit_code != 0)
+    report(f"{len(finished_results) - failed_count}/{len(jobs)} jobs succeeded.")
+    return finished_results
+
+
+def get_job_config(notification_config: ResearchFlowConfig, notify: str) -> ResearchFlowConfig:
+    if notify == "summary":
+        return replace(notification_config, slack_destination="off", include_gpu=False)
+    return notification_config
+
+
+def run_job_queue(
+        jobs: List[QueuedJob],
+        max_parallel: int = 1,
+        notification_config: Optional[ResearchFlowConfig] = None,
+        notify: str = "each",
+        queue_name: str = "queue",
+        **run_options: Any,
+    ) -> int:
+    """
+    Runs `jobs` with run_jobs, resolving config once for the whole queue.
+    Returns 0 when every job succeeded, else 1.
+    """
+    notification_config = notification_config or load_config()
+
+    queue_start_time = datetime.now()
+    results = run_jobs(jobs, max_parallel, get_job_config(notification_config, notify), **run_options)
+    queue_end_time = datetime.now()
+
+    if notify in ("summary", "both") and notification_config.slack_destination != "off":
+        AlarmSlackSender(config=notification_config).send_queue_summary(
+            queue_name=queue_name,
+            job_results=[
+                {
+                    "command": result.job.display,
+                    "exit_code": result.exit_code,
+                    "duration_str": format_script_duration(result.start_time, result.end_time),
+                }
+                for result in results
+            ],
+            duration_str=format_script_duration(queue_start_time, queue_end_time),
+            hostname=get_hostname(),
+            start_time_str=get_kst_timestamp_string(queue_start_time),
+            end_time_str=get_kst_timestamp_string(queue_end_time),
+        )
+
+    succeeded = len(results) == len(jobs) and all(result.exit_code == 0 for result in results)
+    return 0 if succeeded else 1
@@ -0,0 +1,144 @@
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+from .constants import DEFAULT_LOG_KEEP, DEFAULT_LOG_WRITE_BUFFER_BYTES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def resolve_log_compression(compression: str) -> str:
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        sys.stderr.write("[AlarmHandler] zstd log compression needs the 'zstandard' package. Using gzip instead.\n")
+        return "gzip"
+    return compression
+
+
+def _compressed_suffix(compression: str) -> str:
+    return {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+
+
+def _compress_file(source_path: str, target_path: str, compression: str) -> None:
+    temporary_path = f"{target_path}.tmp"
+    with open(source_path, "rb") as source:
+        if compression == "zstd":
+            with open(temporary_path, "wb") as target:
+                zstandard.ZstdCompressor().copy_stream(source, target)
+        else:
+            with gzip.open(temporary_path, "wb", compresslevel=6) as target:
+                shutil.copyfileobj(source, target, DEFAULT_LOG_WRITE_BUFFER_BYTES)
+    os.replace(temporary_path, target_path)
+    os.remove(source_path)
+
+
+class RotatingLogWriter:
+    """
+    Log file sink that rotates at `max_bytes`, preferring a line boundary in the current chunk.
+    Rotated segments are named <log>.1, <log>.2, ... (oldest first) and compressed on a background
+    thread, so the pump that feeds this writer never waits for compression. Only the newest
+    `keep` segments are kept. `flush` may be called from another thread while the pump writes.
+    """
+
+    def __init__(self, path: str, max_bytes: int, keep: int = DEFAULT_LOG_KEEP, compression: str = "auto"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = max(0, keep)
+        self.compression = resolve_log_compression(compression)
+        self.segment_paths: List[str] = []
+        self._file = open(path, "wb", buffering=DEFAULT_LOG_WRITE_BUFFER_BYTES)
+        self._file_lock = threading.Lock()
+        self._size = 0
+        self._sequence = 0
+        self._tasks: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, daemon=True)
+        self._worker.start()
+
+    @property
+    def all_paths(self) -> List[str]:
+        return self.segment_paths + [self.path]
+
+    def write(self, data: bytes) -> None:
+        with self._file_lock:
+            self._write_locked(data)
+
+    def _write_locked(self, data: bytes) -> None:
+        if self.max_bytes <= 0 or self._size + len(data) < self.max_bytes:
+            self._write_active(data)
+            return
+
+        split_index = data.rfind(b"\n") + 1
+        if split_index == 0:
+            self._write_active(data)
+            self._rotate()
+            return
+        self._write_active(data[:split_index])
+        self._rotate()
+        if split_index < len(data):
+            self._write_active(data[split_index:])
+
+    def _write_active(self, data: bytes) -> None:
+        self._file.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._sequence += 1
+        rotated_path = f"{self.path}.{self._sequence}"
+        os.replace(self.path, rotated_path)
+        self._file = open(self.path, "wb", buffering=DEFAULT_LOG_WRITE_BUFFER_BYTES)
+        self._size = 0
+
+        if self.keep == 0:
+            self._tasks.put(("delete", rotated_path))
+            return
+
+        if self.compression == "none":
+            self.segment_paths.append(rotated_path)
+        else:
+            compressed_path = rotated_path + _compressed_suffix(self.compression)
+            self.segment_paths.append(compressed_path)
+            self._tasks.put(("compress", rotated_path))
+
+        while len(self.segment_paths) > self.keep:
+            self._tasks.put(("delete", self.segment_paths.pop(0)))
+
+    def _run_worker(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            action, path = task
+            try:
+                if action == "compress":
+                    _compress_file(path, path + _compressed_suffix(self.compression), self.compression)
+                elif action == "delete":
+                    for candidate in (path, f"{path}.tmp"):
+                        if os.path.exists(candidate):
+                            os.remove(candidate)
+            except OSError as e:
+                sys.stderr.write(f"[AlarmHandler] Log segment {action} failed for {path}: {e}\n")
+
+    def flush(self) -> None:
+        with self._file_lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._file_lock:
+            if not self._file.closed:
+                self._file.close()
+        if self._worker.is_alive():
+            self._tasks.put(None)
+            self._worker.join()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed and not self._worker.is_alive()
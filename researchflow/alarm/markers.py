@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from researchflow.core.utils import decode_utf8_bytes
+from .constants import DEFAULT_MAX_PARSED_ARGS_BYTES, METRICS_MARKER, PARSED_ARGS_END_MARKER, PARSED_ARGS_START_MARKER
+
+
+class ParsedArgsMarkerParser:
+    """
+    Incrementally finds the first report_arguments() JSON block in a byte stream.
+    Only a marker-sized carry-over is kept while searching, and parsing stops once the block is found.
+    """
+
+    def __init__(self, max_block_bytes: int = DEFAULT_MAX_PARSED_ARGS_BYTES):
+        self.max_block_bytes = max_block_bytes
+        self.json_text: Optional[str] = None
+        self.overflowed = False
+        self._start_marker = PARSED_ARGS_START_MARKER.encode("utf-8")
+        self._end_marker = PARSED_ARGS_END_MARKER.encode("utf-8")
+        self._carry = b""
+        self._block = bytearray()
+        self._in_block = False
+
+    @property
+    def done(self) -> bool:
+        return self.json_text is not None or self.overflowed
+
+    def feed(self, data: bytes) -> None:
+        if self.done or not data:
+            return
+
+        if not self._in_block:
+            buffer = self._carry + data
+            start_index = buffer.find(self._start_marker)
+            if start_index < 0:
+                self._carry = buffer[-(len(self._start_marker) - 1):]
+                return
+            data = buffer[start_index + len(self._start_marker):]
+            self._carry = b""
+            self._in_block = True
+
+        search_from = max(0, len(self._block) - (len(self._end_marker) - 1))
+        self._block += data
+        end_index = self._block.find(self._end_marker, search_from)
+        if end_index < 0:
+            if len(self._block) > self.max_block_bytes:
+                sys.stderr.write(
+                    f"\n[AlarmHandler Warning] Parsed arguments block exceeded {self.max_block_bytes} bytes without an end marker. Ignoring it.\n"
+                )
+                self.overflowed = True
+                self._block = bytearray()
+            return
+
+        self.json_text = decode_utf8_bytes(bytes(self._block[:end_index])).strip()
+        self._block = bytearray()
+
+
+class LogFileMarkerWatcher:
+    """
+    Follows a growing log file in a background thread and feeds new bytes to a ParsedArgsMarkerParser.
+    The thread exits as soon as the arguments block has been captured.
+    """
+
+    def __init__(
+        self,
+        log_file_path: str,
+        parser: ParsedArgsMarkerParser,
+        poll_interval: float = 0.5,
+        read_size: int = 1024 * 1024,
+    ):
+        self.log_file_path = log_file_path
+        self.parser = parser
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._offset = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _drain(self) -> None:
+        try:
+            with open(self.log_file_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < self._offset:
+                    self._offset = 0
+                f.seek(self._offset)
+                while not self.parser.done:
+                    chunk = f.read(self.read_size)
+                    if not chunk:
+                        break
+                    self._offset += len(chunk)
+                    self.parser.feed(chunk)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            sys.stderr.write(f"\n[AlarmHandler] Error following log file {self.log_file_path}: {e}\n")
+
+    def _run(self) -> None:
+        while not self.parser.done:
+            stopping = self._stop_event.wait(self.poll_interval)
+            self._drain()
+            if stopping:
+                return
+
+
+def find_last_metrics(text: str) -> Optional[Dict[str, Any]]:
+    """Returns the JSON object from the last report_metrics() line in `text`, if any."""
+    for line in reversed(text.splitlines()):
+        marker_index = line.find(METRICS_MARKER)
+        if marker_index < 0:
+            continue
+        try:
+            metrics = json.loads(line[marker_index + len(METRICS_MARKER):])
+        except json.JSONDecodeError:
+            continue
+        if isinstance(metrics, dict):
+            return metrics
+    return None
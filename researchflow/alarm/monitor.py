@@ -0,0 +1,20 @@
+"""
+Minimal entry point for a detached `alarm --log` monitor on platforms without os.fork.
+The parent passes the resolved config and run options as JSON on stdin, so the monitor skips
+argument parsing, .env loading and config file lookup.
+"""
+import json
+import sys
+
+from researchflow.core.config import ResearchFlowConfig
+from .handler import execute_script_with_alarm
+
+
+def main() -> None:
+    monitor_spec = json.loads(sys.stdin.buffer.read().decode("utf-8"))
+    notification_config = ResearchFlowConfig(**monitor_spec["config"])
+    sys.exit(execute_script_with_alarm(notification_config=notification_config, **monitor_spec["kwargs"]))
+
+
+if __name__ == '__main__':
+    main()
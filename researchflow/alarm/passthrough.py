@@ -0,0 +1,199 @@
+import errno
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+from typing import Any, Optional
+
+from .capture import BoundedOutputCapture
+from .constants import (
+    DEFAULT_RAW_MARKER_SCAN_BYTES,
+    DEFAULT_RAW_MIN_WAKEUP_INTERVAL,
+    DEFAULT_RAW_PIPE_BYTES,
+    DEFAULT_RAW_SPOOL_BYTES,
+)
+from .markers import ParsedArgsMarkerParser
+from .pump import OutputPump
+
+
+def is_raw_passthrough_supported() -> bool:
+    return sys.platform.startswith("linux") and hasattr(os, "splice") and hasattr(os, "sendfile")
+
+
+def _grow_pipe(fd: int, size: int) -> None:
+    set_pipe_size = getattr(fcntl, "F_SETPIPE_SZ", 1031) if fcntl is not None else None
+    if set_pipe_size is None:
+        return
+    try:
+        fcntl.fcntl(fd, set_pipe_size, size)
+    except OSError:
+        pass
+
+
+def _open_spool_fd() -> int:
+    if hasattr(os, "memfd_create"):
+        try:
+            return os.memfd_create("researchflow_spool")
+        except OSError:
+            pass
+    spool_file = tempfile.TemporaryFile()
+    spool_fd = os.dup(spool_file.fileno())
+    spool_file.close()
+    return spool_fd
+
+
+class _SpliceStream:
+    def __init__(
+        self,
+        fd: int,
+        sink_fd: Optional[int],
+        spool_fd: int,
+        owns_spool: bool,
+        capture: Optional[BoundedOutputCapture],
+        marker_parser: Optional[ParsedArgsMarkerParser],
+    ):
+        self.fd = fd
+        self.sink_fd = sink_fd
+        self.spool_fd = spool_fd
+        self.owns_spool = owns_spool
+        self.capture = capture
+        self.marker_parser = marker_parser
+        self.writer = None
+        self.unsampled_bytes = 0
+        self.marker_scanned_bytes = 0
+        self.use_sendfile = True
+
+
+class SplicePassthrough(OutputPump):
+    """
+    Linux-only pump that keeps child output in the kernel.
+    Each chunk is spliced from the child pipe into a spool (the log file, or a private memfd),
+    then sent to the terminal with sendfile. Only the capture head/tail windows and the first
+    bytes scanned for the arguments marker are copied into user space.
+    The child pipes are enlarged and partial reads are followed by a short pause, so a chatty
+    child is drained in large chunks instead of one wakeup per write.
+    """
+
+    def __init__(
+        self,
+        process: Any,
+        spool_bytes: int = DEFAULT_RAW_SPOOL_BYTES,
+        marker_scan_bytes: int = DEFAULT_RAW_MARKER_SCAN_BYTES,
+        pipe_bytes: int = DEFAULT_RAW_PIPE_BYTES,
+        min_wakeup_interval: float = DEFAULT_RAW_MIN_WAKEUP_INTERVAL,
+        **kwargs: Any,
+    ):
+        kwargs.setdefault("read_size", pipe_bytes)
+        super().__init__(process, **kwargs)
+        self.spool_bytes = spool_bytes
+        self.marker_scan_bytes = marker_scan_bytes
+        self.pipe_bytes = pipe_bytes
+        self.min_wakeup_interval = min_wakeup_interval
+
+    def add_raw_stream(
+        self,
+        pipe: Any,
+        sink: Any = None,
+        log_fd: Optional[int] = None,
+        capture: Optional[BoundedOutputCapture] = None,
+        marker_parser: Optional[ParsedArgsMarkerParser] = None,
+    ) -> None:
+        if pipe is None:
+            return
+        sink_fd: Optional[int] = None
+        if sink is not None:
+            sink.flush()
+            sink_fd = sink.fileno()
+
+        _grow_pipe(pipe.fileno(), self.pipe_bytes)
+        owns_spool = log_fd is None
+        spool_fd = _open_spool_fd() if owns_spool else log_fd
+        self._streams.append(_SpliceStream(pipe.fileno(), sink_fd, spool_fd, owns_spool, capture, marker_parser))
+
+    def _on_readable(self, stream: Any) -> bool:
+        offset = os.lseek(stream.spool_fd, 0, os.SEEK_CUR)
+        try:
+            moved = os.splice(stream.fd, stream.spool_fd, self.read_size)
+        except OSError as e:
+            sys.stderr.write(f"\n[AlarmHandler] splice failed on child output: {e}\n")
+            return False
+        if moved == 0:
+            return False
+
+        self.bytes_read += moved
+        self.last_activity = time.monotonic()
+        self._send_to_sink(stream, offset, moved)
+        self._sample(stream, offset, moved)
+        if stream.owns_spool and offset + moved >= self.spool_bytes:
+            self._recycle_spool(stream)
+        if moved < self.read_size and self.min_wakeup_interval > 0:
+            time.sleep(self.min_wakeup_interval)
+        return True
+
+    @staticmethod
+    def _send_to_sink(stream: _SpliceStream, offset: int, count: int) -> None:
+        if stream.sink_fd is None:
+            return
+        sent = 0
+        while sent < count:
+            try:
+                if stream.use_sendfile:
+                    written = os.sendfile(stream.sink_fd, stream.spool_fd, offset + sent, count - sent)
+                else:
+                    written = os.write(stream.sink_fd, os.pread(stream.spool_fd, count - sent, offset + sent))
+            except OSError as e:
+                if stream.use_sendfile and e.errno in (errno.EINVAL, errno.ENOSYS):
+                    stream.use_sendfile = False
+                    continue
+                sys.stderr.write(f"\n[AlarmHandler] Error writing child output: {e}\n")
+                return
+            if written == 0:
+                return
+            sent += written
+
+    def _sample(self, stream: _SpliceStream, offset: int, count: int) -> None:
+        parser = stream.marker_parser
+        if parser is not None and not parser.done and stream.marker_scanned_bytes < self.marker_scan_bytes:
+            scan_size = min(count, self.marker_scan_bytes - stream.marker_scanned_bytes)
+            parser.feed(os.pread(stream.spool_fd, scan_size, offset))
+            stream.marker_scanned_bytes += scan_size
+
+        capture = stream.capture
+        if capture is None:
+            return
+        head_size = min(count, capture.head_room)
+        if head_size:
+            capture.write(os.pread(stream.spool_fd, head_size, offset))
+        stream.unsampled_bytes += count - head_size
+
+    @staticmethod
+    def _sample_tail(stream: _SpliceStream) -> None:
+        capture = stream.capture
+        if capture is None or not stream.unsampled_bytes:
+            return
+        end = os.lseek(stream.spool_fd, 0, os.SEEK_CUR)
+        window = min(stream.unsampled_bytes, capture.tail_bytes, end)
+        # The unsampled bytes are the last ones in the spool; all but the tail window are skipped.
+        skipped = stream.unsampled_bytes - window
+        capture.skip(skipped, stream.spool_fd, end - window - skipped)
+        capture.write(os.pread(stream.spool_fd, window, end - window))
+        stream.unsampled_bytes = 0
+
+    def _recycle_spool(self, stream: _SpliceStream) -> None:
+        self._sample_tail(stream)
+        os.ftruncate(stream.spool_fd, 0)
+        os.lseek(stream.spool_fd, 0, os.SEEK_SET)
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            for stream in self._streams:
+                self._sample_tail(stream)
+                if stream.owns_spool:
+                    os.close(stream.spool_fd)
@@ -0,0 +1,338 @@
+import codecs
+import io
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Sequence, Union
+
+from researchflow.core.process_utils import has_exited
+from researchflow.core.utils import format_byte_size
+
+from .constants import (
+    DEFAULT_PUMP_BATCH_BYTES,
+    DEFAULT_PUMP_EXIT_GRACE_SECONDS,
+    DEFAULT_PUMP_FLUSH_INTERVAL,
+    DEFAULT_PUMP_READ_SIZE,
+    DEFAULT_TEE_TERMINAL_BACKLOG_BYTES,
+)
+
+ChunkConsumer = Callable[[bytes], None]
+
+
+class _TextSinkAdapter:
+    def __init__(self, stream: Any):
+        self._stream = stream
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def write(self, data: bytes) -> None:
+        text = self._decoder.decode(data)
+        if text:
+            self._stream.write(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def get_binary_sink(stream: Any) -> Any:
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return stream
+    binary_stream = getattr(stream, "buffer", None)
+    if binary_stream is None:
+        return _TextSinkAdapter(stream)
+    try:
+        stream.flush()
+    except (OSError, ValueError):
+        pass
+    return binary_stream
+
+
+class BatchedWriter:
+    def __init__(self, sink: Any, batch_bytes: int = DEFAULT_PUMP_BATCH_BYTES):
+        self.sink = sink
+        self.batch_bytes = batch_bytes
+        self._pending = bytearray()
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def write(self, data: bytes) -> None:
+        self._pending += data
+        if len(self._pending) >= self.batch_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        data = bytes(self._pending)
+        self._pending.clear()
+        try:
+            self.sink.write(data)
+            self.sink.flush()
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"\n[AlarmHandler] Error writing child output: {e}\n")
+
+
+class _DroppedBytes:
+    def __init__(self) -> None:
+        self.count = 0
+
+
+class ThrottledSink:
+    """
+    Writes to a possibly slow sink (usually the terminal) on a background thread.
+    When more than `max_backlog_bytes` are waiting, new chunks are dropped and replaced by a
+    short note instead of blocking the pump, so a slow terminal never stalls the child.
+    """
+
+    def __init__(self, sink: Any, max_backlog_bytes: int = DEFAULT_TEE_TERMINAL_BACKLOG_BYTES):
+        self.sink = sink
+        self.max_backlog_bytes = max_backlog_bytes
+        self.dropped_bytes = 0
+        self._items: Deque[Union[bytes, _DroppedBytes]] = deque()
+        self._backlog_bytes = 0
+        self._closed = False
+        self._broken = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes) -> None:
+        with self._condition:
+            if self._broken:
+                return
+            if self._backlog_bytes and self._backlog_bytes + len(data) > self.max_backlog_bytes:
+                self.dropped_bytes += len(data)
+                if not self._items or not isinstance(self._items[-1], _DroppedBytes):
+                    self._items.append(_DroppedBytes())
+                self._items[-1].count += len(data)
+            else:
+                self._items.append(data)
+                self._backlog_bytes += len(data)
+            self._condition.notify()
+
+    def flush(self) -> None:
+        pass
+
+    def _render(self, items: List[Union[bytes, _DroppedBytes]]) -> bytes:
+        parts = []
+        for item in items:
+            if isinstance(item, _DroppedBytes):
+                parts.append(f"\n[AlarmHandler] Terminal too slow, skipped {format_byte_size(item.count)} of output here.\n".encode("utf-8"))
+            else:
+                parts.append(item)
+        return b"".join(parts)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._items and not self._closed:
+                    self._condition.wait()
+                if not self._items:
+                    return
+                items = list(self._items)
+                self._items.clear()
+            accepted_bytes = sum(len(item) for item in items if isinstance(item, bytes))
+            try:
+                self.sink.write(self._render(items))
+                self.sink.flush()
+            except (OSError, ValueError) as e:
+                sys.stderr.write(f"\n[AlarmHandler] Error writing child output: {e}\n")
+                with self._condition:
+                    self._broken = True
+                    self._items.clear()
+            with self._condition:
+                self._backlog_bytes -= accepted_bytes
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+class _PumpStream:
+    def __init__(self, fd: int, writer: Optional[BatchedWriter], consumers: Sequence[ChunkConsumer]):
+        self.fd = fd
+        self.writer: Optional[BatchedWriter] = writer
+        self.consumers = list(consumers)
+
+
+class OutputPump:
+    """
+    Moves raw bytes from the child's pipes to their sinks on a single thread.
+    Chunks are read with os.read, written to the terminal in batches, and handed to
+    consumers (capture, marker parser) without decoding.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        read_size: int = DEFAULT_PUMP_READ_SIZE,
+        batch_bytes: int = DEFAULT_PUMP_BATCH_BYTES,
+        flush_interval: float = DEFAULT_PUMP_FLUSH_INTERVAL,
+        exit_grace_seconds: float = DEFAULT_PUMP_EXIT_GRACE_SECONDS,
+    ):
+        self.process = process
+        self.read_size = read_size
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.exit_grace_seconds = exit_grace_seconds
+        self.bytes_read = 0
+        self.last_activity = time.monotonic()
+        self._streams: List[_PumpStream] = []
+        self._throttled_sinks: List[ThrottledSink] = []
+        self._periodic_flushes: List[Callable[[], None]] = []
+        self._unflushed_output = False
+
+    def add_stream(
+        self,
+        pipe: Any,
+        sink: Any = None,
+        consumers: Sequence[ChunkConsumer] = (),
+        max_sink_backlog_bytes: int = 0,
+    ) -> None:
+        """
+        `max_sink_backlog_bytes` > 0 makes `sink` lossy: it is written on its own thread and
+        output is dropped once that many bytes are waiting. Consumers always see every byte.
+        """
+        if pipe is None:
+            return
+        writer = None
+        if sink is not None:
+            binary_sink = get_binary_sink(sink)
+            if max_sink_backlog_bytes > 0:
+                binary_sink = ThrottledSink(binary_sink, max_sink_backlog_bytes)
+                self._throttled_sinks.append(binary_sink)
+            writer = BatchedWriter(binary_sink, self.batch_bytes)
+        self._streams.append(_PumpStream(pipe.fileno(), writer, consumers))
+
+    def add_periodic_flush(self, flush: Callable[[], None]) -> None:
+        """
+        Calls `flush` every `flush_interval` while there is new output, for a buffered consumer such
+        as the log file: `tail -f` then follows the run and a crash of alarm loses little output.
+        """
+        self._periodic_flushes.append(flush)
+
+    @property
+    def dropped_sink_bytes(self) -> int:
+        return sum(sink.dropped_bytes for sink in self._throttled_sinks)
+
+    def _handle_chunk(self, stream: _PumpStream, data: bytes) -> None:
+        self.bytes_read += len(data)
+        self.last_activity = time.monotonic()
+        self._unflushed_output = True
+        if stream.writer is not None:
+            stream.writer.write(data)
+        for consumer in stream.consumers:
+            consumer(data)
+
+    def _on_readable(self, stream: Any) -> bool:
+        try:
+            data = os.read(stream.fd, self.read_size)
+        except OSError:
+            data = b""
+        if not data:
+            return False
+        self._handle_chunk(stream, data)
+        return True
+
+    def _flush_all(self) -> None:
+        for stream in self._streams:
+            if stream.writer is not None:
+                stream.writer.flush()
+        self._run_periodic_flushes()
+
+    def _run_periodic_flushes(self) -> None:
+        if not self._unflushed_output:
+            return
+        self._unflushed_output = False
+        for flush in self._periodic_flushes:
+            try:
+                flush()
+            except (OSError, ValueError) as e:
+                sys.stderr.write(f"\n[AlarmHandler] Error flushing child output: {e}\n")
+
+    def _close_throttled_sinks(self) -> None:
+        for sink in self._throttled_sinks:
+            sink.close()
+
+    def run(self) -> None:
+        if not self._streams:
+            return
+        try:
+            if os.name == "nt":
+                self._run_with_threads()
+            else:
+                self._run_with_selector()
+        finally:
+            self._close_throttled_sinks()
+
+    def _run_with_selector(self) -> None:
+
+        selector = selectors.DefaultSelector()
+        for stream in self._streams:
+            selector.register(stream.fd, selectors.EVENT_READ, stream)
+
+        exit_deadline: Optional[float] = None
+        last_flush = time.monotonic()
+        try:
+            while selector.get_map():
+                has_pending = (self._unflushed_output and bool(self._periodic_flushes)) or any(
+                    stream.writer is not None and stream.writer.has_pending for stream in self._streams
+                )
+                timeout = self.flush_interval if has_pending else 0.5
+                if exit_deadline is not None:
+                    timeout = min(timeout, max(0.0, exit_deadline - time.monotonic()))
+
+                for key, _ in selector.select(timeout):
+                    if not self._on_readable(key.data):
+                        selector.unregister(key.fd)
+
+                now = time.monotonic()
+                if now - last_flush >= self.flush_interval:
+                    self._flush_all()
+                    last_flush = now
+
+                if exit_deadline is None and has_exited(self.process):
+                    exit_deadline = now + self.exit_grace_seconds
+                elif exit_deadline is not None and now >= exit_deadline:
+                    break
+        finally:
+            self._flush_all()
+            selector.close()
+
+    def _run_with_threads(self) -> None:
+        def pump_one(stream: _PumpStream) -> None:
+            while True:
+                try:
+                    data = os.read(stream.fd, self.read_size)
+                except OSError:
+                    break
+                if not data:
+                    break
+                self._handle_chunk(stream, data)
+                if stream.writer is not None:
+                    stream.writer.flush()
+
+        threads = [threading.Thread(target=pump_one, args=(stream,), daemon=True) for stream in self._streams]
+        for thread in threads:
+            thread.start()
+        if self._periodic_flushes:
+            while self._wait_for_exit(self.flush_interval) is None:
+                self._run_periodic_flushes()
+        else:
+            self.process.wait()
+        for thread in threads:
+            thread.join(timeout=self.exit_grace_seconds)
+        self._flush_all()
+
+    def _wait_for_exit(self, timeout: float) -> Optional[int]:
+        try:
+            return self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return None
@@ -0,0 +1,157 @@
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from researchflow.core.process_utils import has_exited
+from researchflow.core.resources import get_process_start_time
+from .constants import DEFAULT_STALL_KILL_GRACE_SECONDS
+
+_PY_SPY_TIMEOUT_SECONDS = 30
+
+
+class LogFileActivity:
+    """
+    Activity clock for a child that writes its log file directly. Each call stats the file and
+    returns the monotonic time at which its size or mtime was last seen to change.
+    """
+
+    def __init__(self, log_file_path: str):
+        self.log_file_path = log_file_path
+        self._last_state: Optional[tuple] = None
+        self._last_activity = time.monotonic()
+
+    def __call__(self) -> float:
+        try:
+            stat_result = os.stat(self.log_file_path)
+            state = (stat_result.st_size, stat_result.st_mtime_ns)
+        except OSError:
+            state = None
+        if state != self._last_state:
+            self._last_state = state
+            self._last_activity = time.monotonic()
+        return self._last_activity
+
+
+class OutputStallWatch:
+    """
+    Calls `on_stall(silent_seconds)` once when the child has written no output for
+    `timeout_seconds`. The time of the last output comes from `get_last_activity`, a monotonic
+    timestamp: the output pumps update theirs once per chunk read, so watching costs nothing per
+    line. Checks run on a background thread every tenth of the timeout, at most once per 30s.
+    """
+
+    def __init__(self, timeout_seconds: float, on_stall: Callable[[float], None]):
+        self.timeout_seconds = timeout_seconds
+        self.on_stall = on_stall
+        self.check_interval = min(max(timeout_seconds / 10, 0.05), 30.0)
+        self.fired = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, get_last_activity: Callable[[], float]) -> "OutputStallWatch":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(get_last_activity,),
+                name="researchflow-stall-watch",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    @property
+    def stopped(self) -> threading.Event:
+        """Set once stop() is called, i.e. when the child has exited."""
+        return self._stop_event
+
+    def _run(self, get_last_activity: Callable[[], float]) -> None:
+        while not self._stop_event.wait(self.check_interval):
+            silent_seconds = time.monotonic() - get_last_activity()
+            if silent_seconds >= self.timeout_seconds:
+                self.fired = True
+                self.on_stall(silent_seconds)
+                return
+
+    def stop(self) -> None:
+        """Stops watching. Safe to call from on_stall and more than once."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+def dump_python_stacks(pid: int) -> Optional[str]:
+    """Returns `py-spy dump` output for `pid`, or None when py-spy is not installed or fails."""
+    py_spy_path = shutil.which("py-spy")
+    if not py_spy_path:
+        return None
+    try:
+        result = subprocess.run(
+            [py_spy_path, "dump", "--pid", str(pid)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=_PY_SPY_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def _signal_pid(pid: int, signal_number: int) -> None:
+    try:
+        os.kill(pid, signal_number)
+    except OSError:
+        pass
+
+
+def kill_stalled_process(
+        process: subprocess.Popen,
+        descendant_pids: Iterable[int] = (),
+        exited: Optional[threading.Event] = None,
+        grace_seconds: float = DEFAULT_STALL_KILL_GRACE_SECONDS,
+    ) -> None:
+    """
+    Stops a hung child. On POSIX the child gets SIGABRT, so a Python child started with
+    PYTHONFAULTHANDLER=1 writes the traceback of every thread to its stderr before it dies, and
+    its descendants get SIGTERM. Whatever is still alive after `grace_seconds` (or once `exited`
+    is set) gets SIGKILL; a descendant only if its PID still has the start time it had before, so
+    a PID reused by an unrelated process in the meantime is left alone. Elsewhere the child is
+    killed outright.
+    """
+    if os.name != "posix":
+        process.kill()
+        return
+
+    # Descendants are not our children, so their PIDs can be reused as soon as they exit.
+    descendant_start_times = {}
+    for pid in descendant_pids:
+        start_time = get_process_start_time(pid) if pid != process.pid else None
+        if start_time is not None:
+            descendant_start_times[pid] = start_time
+    try:
+        import resource
+        # The faulthandler dump is what we want from SIGABRT; a core file of a large job is not.
+        resource.prlimit(process.pid, resource.RLIMIT_CORE, (0, 0))
+    except (ImportError, AttributeError, OSError, ValueError):
+        pass
+    # os.kill rather than send_signal: Popen.poll() would reap the child before wait_with_rusage.
+    if not has_exited(process):
+        _signal_pid(process.pid, signal.SIGABRT)
+    for pid in descendant_start_times:
+        _signal_pid(pid, signal.SIGTERM)
+
+    if exited is not None:
+        exited.wait(grace_seconds)
+    else:
+        time.sleep(grace_seconds)
+    if not has_exited(process):
+        _signal_pid(process.pid, signal.SIGKILL)
+    for pid, start_time in descendant_start_times.items():
+        if get_process_start_time(pid) == start_time:
+            _signal_pid(pid, signal.SIGKILL)
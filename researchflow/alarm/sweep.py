@@ -0,0 +1,193 @@
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from researchflow.core.config import ResearchFlowConfig, load_config
+from researchflow.core.slack_sender import AlarmSlackSender
+from researchflow.core.utils import format_script_duration, format_text_table, get_hostname, get_kst_timestamp_string
+from .handler import _resolve_log_file_path
+from .jobqueue import QueuedJob, QueuedJobResult, get_job_config, run_jobs
+
+_SWEEP_SPEC_KEYS = ("grid", "runs", "args", "parallel")
+_MAX_TABLE_METRICS = 4
+
+
+def load_sweep_spec(spec_path: str) -> Dict[str, Any]:
+    """
+    Reads a sweep spec: {"grid": {"lr": [...], "seed": [...]}, "runs": [{...}], "args": [...], "parallel": N}.
+    A JSON list is read as "runs", and an object without any of those keys is read as the grid itself.
+    """
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+
+    if isinstance(spec, list):
+        spec = {"runs": spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Sweep spec must be a JSON object or list: {spec_path}")
+    if not any(key in spec for key in _SWEEP_SPEC_KEYS):
+        spec = {"grid": spec}
+    if not isinstance(spec.get("grid", {}), dict):
+        raise ValueError("Sweep 'grid' must be an object of argument name -> list of values.")
+    if not isinstance(spec.get("runs", []), list) or not all(isinstance(run, dict) for run in spec.get("runs", [])):
+        raise ValueError("Sweep 'runs' must be a list of objects.")
+    return spec
+
+
+def expand_sweep(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Returns one dict of argument values per run: every "runs" entry crossed with every grid point."""
+    grid = spec.get("grid", {})
+    grid_keys = list(grid)
+    grid_values = [values if isinstance(values, list) else [values] for values in grid.values()]
+    base_runs = spec.get("runs") or [{}]
+
+    expanded = []
+    for base_run in base_runs:
+        for values in itertools.product(*grid_values):
+            run_values = dict(base_run)
+            run_values.update(zip(grid_keys, values))
+            expanded.append(run_values)
+    return expanded
+
+
+def _to_flag(key: str) -> str:
+    return key if key.startswith("-") else f"--{key}"
+
+
+def build_sweep_args(run_values: Dict[str, Any]) -> List[str]:
+    args: List[str] = []
+    for key, value in run_values.items():
+        if value is None or value is False:
+            continue
+        if value is True:
+            args.append(_to_flag(key))
+        elif isinstance(value, list):
+            args.append(_to_flag(key))
+            args.extend(str(item) for item in value)
+        else:
+            args.extend([_to_flag(key), str(value)])
+    return args
+
+
+def _format_cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    if value is None:
+        return "-"
+    return str(value)
+
+
+def format_sweep_table(run_values: Sequence[Dict[str, Any]], results: Sequence[QueuedJobResult]) -> str:
+    varying_keys = [
+        key for key in dict.fromkeys(key for values in run_values for key in values)
+        if len({json.dumps(values.get(key), sort_keys=True, default=str) for values in run_values}) > 1
+    ]
+    metric_keys: List[str] = []
+    for result in results:
+        metrics = result.run_result.metrics if result.run_result and result.run_result.metrics else {}
+        for key in metrics:
+            if key not in metric_keys and len(metric_keys) < _MAX_TABLE_METRICS:
+                metric_keys.append(key)
+
+    header = ["#"] + [key.lstrip("-") for key in varying_keys] + ["exit", "time"] + metric_keys
+    rows = [header]
+    for index, (values, result) in enumerate(zip(run_values, results)):
+        metrics = result.run_result.metrics if result.run_result and result.run_result.metrics else {}
+        rows.append(
+            [str(index + 1)]
+            + [_format_cell(values.get(key)) for key in varying_keys]
+            + [str(result.exit_code), format_script_duration(result.start_time, result.end_time)]
+            + [_format_cell(metrics.get(key)) for key in metric_keys]
+        )
+
+    return format_text_table(rows)
+
+
+def _write_sweep_results(
+        results_path: str,
+        run_values: Sequence[Dict[str, Any]],
+        results: Sequence[QueuedJobResult],
+    ) -> None:
+    records = []
+    for values, result in zip(run_values, results):
+        run_result = result.run_result
+        records.append({
+            "values": values,
+            "args": list(result.job.script_args),
+            "exit_code": result.exit_code,
+            "duration_seconds": round((result.end_time - result.start_time).total_seconds(), 3),
+            "parsed_args": run_result.parsed_args if run_result else None,
+            "metrics": run_result.metrics if run_result else None,
+            "resources": run_result.resources if run_result else None,
+            "gpu_usage": run_result.gpu_usage if run_result else None,
+            "log_file": run_result.log_file_path if run_result else None,
+        })
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2, default=str)
+        f.write("\n")
+
+
+def run_sweep(
+        script_path: str,
+        spec: Dict[str, Any],
+        fixed_args: Sequence[str] = (),
+        max_parallel: Optional[int] = None,
+        notification_config: Optional[ResearchFlowConfig] = None,
+        notify: str = "summary",
+        **run_options: Any,
+    ) -> int:
+    """
+    Runs `script_path` once per expanded sweep point with run_jobs and reports all runs together:
+    a results table on stdout and in one Slack message, plus a JSON file next to the logs.
+    Returns 0 when every run succeeded, else 1.
+    """
+    notification_config = notification_config or load_config()
+    run_values = expand_sweep(spec)
+    base_args = list(fixed_args) + [str(arg) for arg in spec.get("args", [])]
+    jobs = [QueuedJob(script_path, tuple(base_args + build_sweep_args(values))) for values in run_values]
+    parallel = max_parallel or int(spec.get("parallel", 1))
+
+    sys.stdout.write(f"[AlarmSweep] {len(jobs)} runs of {script_path}, {parallel} at a time.\n")
+    sweep_start_time = datetime.now()
+    results = run_jobs(jobs, parallel, get_job_config(notification_config, notify), **run_options)
+    sweep_end_time = datetime.now()
+
+    completed_values = [run_values[result.job_index] for result in results]
+    results_table = format_sweep_table(completed_values, results)
+    results_path = _resolve_log_file_path(os.path.abspath(script_path), notification_config.log_dir)
+    results_path = results_path[:-len(".log")] + "_sweep.json"
+    try:
+        _write_sweep_results(results_path, completed_values, results)
+    except OSError as e:
+        sys.stderr.write(f"[AlarmSweep] Could not write sweep results to {results_path}: {e}\n")
+        results_path = None
+
+    sys.stdout.write(f"\n{results_table}\n")
+    if results_path:
+        sys.stdout.write(f"[AlarmSweep] Results saved to: {results_path}\n")
+
+    if notify in ("summary", "both") and notification_config.slack_destination != "off":
+        AlarmSlackSender(config=notification_config).send_queue_summary(
+            queue_name=os.path.basename(script_path),
+            job_results=[
+                {
+                    "command": result.job.display,
+                    "exit_code": result.exit_code,
+                    "duration_str": format_script_duration(result.start_time, result.end_time),
+                }
+                for result in results
+            ],
+            duration_str=format_script_duration(sweep_start_time, sweep_end_time),
+            hostname=get_hostname(),
+            start_time_str=get_kst_timestamp_string(sweep_start_time),
+            end_time_str=get_kst_timestamp_string(sweep_end_time),
+            report_title="Sweep Report",
+            results_table=results_table,
+            results_file_path_str=results_path,
+        )
+
+    succeeded = len(results) == len(jobs) and all(result.exit_code == 0 for result in results)
+    return 0 if succeeded else 1
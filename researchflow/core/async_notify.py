@@ -0,0 +1,157 @@
+import atexit
+import collections
+import os
+import sys
+import threading
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .config import ResearchFlowConfig, load_config
+from .utils import get_hostname
+
+_DEFAULT_MAX_PENDING = 100
+_DEFAULT_EXIT_FLUSH_SECONDS = 5.0
+
+_default_notifier: Optional["AsyncSlackNotifier"] = None
+_default_notifier_lock = threading.Lock()
+
+
+def _build_progress_payload(text: str, script_name: str, hostname: str, dropped_count: int) -> Dict[str, Any]:
+    context = f"`{script_name}` on `{hostname}`"
+    if dropped_count:
+        context += f" · {dropped_count} earlier message{'s' if dropped_count != 1 else ''} dropped (queue full)"
+    return {
+        "text": text,
+        "blocks": [
+            {"type": "section", "text": {"type": "mrkdwn", "text": text[:2900]}},
+            {"type": "context", "elements": [{"type": "mrkdwn", "text": context}]},
+        ],
+    }
+
+
+class AsyncSlackNotifier:
+    """
+    Sends Slack messages from a background thread so a training loop never waits on the network.
+
+    `submit` only appends to a bounded deque and wakes the sender thread, which costs a few
+    microseconds. When `max_pending` messages are already waiting, the oldest is dropped: in a
+    progress stream the newest message matters most. The next delivered message mentions how
+    many were dropped. Pending messages are flushed at interpreter exit for up to
+    `exit_flush_seconds`, then abandoned so a dead Slack connection cannot hang the exit.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ResearchFlowConfig] = None,
+        max_pending: int = _DEFAULT_MAX_PENDING,
+        exit_flush_seconds: float = _DEFAULT_EXIT_FLUSH_SECONDS,
+        send_payload: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        self.config = config
+        self.max_pending = max_pending
+        self.exit_flush_seconds = exit_flush_seconds
+        self._send_payload = send_payload
+        self._reset_state()
+        atexit.register(self._flush_at_exit)
+
+    def _reset_state(self) -> None:
+        self._pid = os.getpid()
+        self._pending: Deque[str] = collections.deque(maxlen=self.max_pending)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self.dropped_count = 0
+        self._unreported_drops = 0
+
+    def submit(self, text: str) -> None:
+        if self._pid != os.getpid():
+            # A forked child (e.g. a DataLoader worker) inherits the queue but not the thread.
+            self._reset_state()
+        with self._condition:
+            if self._closing:
+                return
+            if len(self._pending) == self.max_pending:
+                self.dropped_count += 1
+                self._unreported_drops += 1
+            self._pending.append(text)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="researchflow-notify", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _resolve_sender(self) -> Callable[[Dict[str, Any]], Any]:
+        if self._send_payload is None:
+            from .slack_sender import SlackNotifier
+
+            notifier = SlackNotifier(self.config if self.config is not None else load_config())
+            delivery = notifier._resolve_delivery()
+            if delivery in ("off", None):
+                if delivery is None:
+                    sys.stderr.write("[researchflow.notify_async] Slack destination not configured. Messages are discarded.\n")
+                self._send_payload = lambda payload: False
+            else:
+                self._send_payload = notifier.send_payload
+        return self._send_payload
+
+    def _run(self) -> None:
+        try:
+            send = self._resolve_sender()
+        except Exception as e:
+            # Without this the thread would die silently and every later message would pile up unsent.
+            sys.stderr.write(f"[researchflow.notify_async] Could not set up Slack delivery: {e}. Messages are discarded.\n")
+            send = self._send_payload = lambda payload: False
+        script_name = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+        hostname = get_hostname()
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                text = self._pending.popleft()
+                dropped_count, self._unreported_drops = self._unreported_drops, 0
+            try:
+                send(_build_progress_payload(text, script_name, hostname, dropped_count))
+            except Exception as e:
+                sys.stderr.write(f"[researchflow.notify_async] Could not send Slack message: {e}\n")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Stops accepting messages and waits up to `timeout` seconds for the rest to be sent."""
+        if self._pid != os.getpid():
+            return True
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+        return not self._pending
+
+    def _flush_at_exit(self) -> None:
+        if not self.flush(self.exit_flush_seconds):
+            sys.stderr.write(
+                f"[researchflow.notify_async] Gave up on unsent Slack messages after {self.exit_flush_seconds:g}s "
+                f"({len(self._pending)} still queued).\n"
+            )
+
+
+def get_default_async_notifier() -> AsyncSlackNotifier:
+    global _default_notifier
+    if _default_notifier is None:
+        with _default_notifier_lock:
+            if _default_notifier is None:
+                _default_notifier = AsyncSlackNotifier()
+    return _default_notifier
+
+
+def notify_async(text: str) -> None:
+    """
+    Queues `text` for Slack and returns immediately, for progress messages from a training loop:
+
+        researchflow.notify_async(f"epoch {epoch} done, val acc {val_acc:.3f}")
+
+    Uses the same destination as `alarm` (config file, environment). Messages are sent in order
+    by a background thread; see AsyncSlackNotifier for what happens when Slack falls behind.
+    """
+    get_default_async_notifier().submit(text)
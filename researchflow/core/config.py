@@ -3,16 +3,29 @@ import os
 import sys
 from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from .constants import (
+    HISTORY_DB_ENV_KEY,
+    LEGACY_SLACK_BOT_TOKEN_ENV_KEY,
+    LEGACY_SLACK_CHANNEL_ENV_KEY,
+    LEGACY_SLACK_USER_ID_ENV_KEY,
+    LOG_DIR_ENV_KEY,
     RESEARCHFLOW_CONFIG_ENV_KEY,
+    SLACK_BOT_TOKEN_ENV_KEY,
+    SLACK_CHANNEL_ENV_KEY,
+    SLACK_DESTINATION_ENV_KEY,
+    SLACK_TEAM_ID_ENV_KEY,
+    SLACK_USER_ID_ENV_KEY,
+    SLACK_WEBHOOK_ENV_KEY,
 )
+from .registry import get_default_history_db_path
 from .utils import (
     ensure_dotenv_is_loaded,
     get_slack_bot_token_from_env,
     get_slack_channel_from_env,
     get_log_dir_from_env,
+    get_history_db_from_env,
     get_slack_destination_from_env,
     get_slack_team_id_from_env,
     get_slack_user_id_from_env,
@@ -21,6 +34,25 @@ from .utils import (
 
 
 VALID_DESTINATIONS = {"auto", "channel", "dm", "webhook", "off"}
+# Environment variables that load_config reads, directly or through the config and history paths.
+_CONFIG_ENV_KEYS = (
+    RESEARCHFLOW_CONFIG_ENV_KEY,
+    SLACK_DESTINATION_ENV_KEY,
+    SLACK_BOT_TOKEN_ENV_KEY,
+    LEGACY_SLACK_BOT_TOKEN_ENV_KEY,
+    SLACK_CHANNEL_ENV_KEY,
+    LEGACY_SLACK_CHANNEL_ENV_KEY,
+    SLACK_USER_ID_ENV_KEY,
+    LEGACY_SLACK_USER_ID_ENV_KEY,
+    SLACK_WEBHOOK_ENV_KEY,
+    SLACK_TEAM_ID_ENV_KEY,
+    LOG_DIR_ENV_KEY,
+    HISTORY_DB_ENV_KEY,
+    "HOME",
+    "XDG_DATA_HOME",
+)
+_MAX_CACHED_CONFIGS = 16
+_config_cache: Dict[Tuple[Any, ...], "ResearchFlowConfig"] = {}
 
 
 @dataclass(frozen=True)
@@ -35,6 +67,8 @@ class ResearchFlowConfig:
     slack_user_name: Optional[str] = None
     slack_user_query: Optional[str] = None
     log_dir: Optional[str] = None
+    # Run history database. None records nothing; load_config fills in the default path.
+    history_db: Optional[str] = None
     include_gpu: bool = True
     mention_user: bool = False
 
@@ -63,6 +97,7 @@ def get_config_template() -> Dict[str, Any]:
         "slack_team_id": "",
         "slack_team_name": "",
         "log_dir": "",
+        "history_db": "",
         "include_gpu": True,
         "mention_user": False,
     }
@@ -103,6 +138,37 @@ def _read_config_file(config_path: Optional[str] = None) -> Dict[str, Any]:
     return merged_data
 
 
+def _get_source_signature(path: str) -> Tuple[str, Optional[int], Optional[int]]:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return path, None, None
+    return path, stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _get_config_cache_key(config_path: Optional[str], overrides: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Everything load_config depends on: the (path, mtime, size) of every config file that is or
+    could be read, the relevant environment variables and the overrides. Built from plain
+    os.path strings because it runs on every call.
+    """
+    ensure_dotenv_is_loaded()
+    environ = os.environ
+    explicit_path = config_path or environ.get(RESEARCHFLOW_CONFIG_ENV_KEY)
+    if explicit_path:
+        source_paths = (os.path.expanduser(explicit_path),)
+    else:
+        source_paths = (
+            os.path.join(os.path.expanduser("~"), ".config", "researchflow", "config.json"),
+            os.path.join(os.getcwd(), ".researchflow.json"),
+        )
+    return (
+        tuple(_get_source_signature(path) for path in source_paths),
+        tuple(environ.get(key) for key in _CONFIG_ENV_KEYS),
+        tuple(sorted(overrides.items())),
+    )
+
+
 def _normalize_destination(value: Optional[str]) -> str:
     if not value:
         return "auto"
@@ -126,7 +192,7 @@ def _coerce_bool(value: Any, default: bool) -> bool:
     return bool(value)
 
 
-def load_config(config_path: Optional[str] = None, **overrides: Any) -> ResearchFlowConfig:
+def _resolve_config(config_path: Optional[str], overrides: Dict[str, Any]) -> ResearchFlowConfig:
     file_data = _read_config_file(config_path)
 
     config = ResearchFlowConfig(
@@ -140,6 +206,7 @@ def load_config(config_path: Optional[str] = None, **overrides: Any) -> Research
         slack_user_name=file_data.get("slack_user_name"),
         slack_user_query=file_data.get("slack_user_query"),
         log_dir=file_data.get("log_dir"),
+        history_db=file_data.get("history_db"),
         include_gpu=_coerce_bool(file_data.get("include_gpu"), True),
         mention_user=_coerce_bool(file_data.get("mention_user"), False),
     )
@@ -153,6 +220,7 @@ def load_config(config_path: Optional[str] = None, **overrides: Any) -> Research
         "slack_webhook_url": get_slack_webhook_url_from_env() or config.slack_webhook_url,
         "slack_team_id": get_slack_team_id_from_env() or config.slack_team_id,
         "log_dir": get_log_dir_from_env() or config.log_dir,
+        "history_db": get_history_db_from_env() or config.history_db,
     }
     config = replace(config, **env_config)
 
@@ -168,6 +236,25 @@ def load_config(config_path: Optional[str] = None, **overrides: Any) -> Research
     if clean_overrides:
         config = replace(config, **clean_overrides)
 
+    history_db = config.history_db or get_default_history_db_path()
+    config = replace(config, history_db=None if history_db.strip().lower() == "off" else history_db)
+    return config
+
+
+def load_config(config_path: Optional[str] = None, **overrides: Any) -> ResearchFlowConfig:
+    """
+    Resolves the config from the config files, then environment variables, then `overrides`.
+    Results are cached until a config file changes (by mtime or size) or one of the environment
+    variables does, so queues, sweeps and setup commands can call this repeatedly for the cost
+    of a few stat calls.
+    """
+    cache_key = _get_config_cache_key(config_path, overrides)
+    config = _config_cache.get(cache_key)
+    if config is None:
+        config = _resolve_config(config_path, overrides)
+        if len(_config_cache) >= _MAX_CACHED_CONFIGS:
+            _config_cache.clear()
+        _config_cache[cache_key] = config
     return config
 
 
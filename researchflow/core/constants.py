@@ -6,6 +6,8 @@ SLACK_DESTINATION_ENV_KEY = "RESEARCHFLOW_SLACK_DESTINATION"
 SLACK_TEAM_ID_ENV_KEY = "RESEARCHFLOW_SLACK_TEAM_ID"
 LOG_DIR_ENV_KEY = "RESEARCHFLOW_LOG_DIR"
 RESEARCHFLOW_CONFIG_ENV_KEY = "RESEARCHFLOW_CONFIG"
+GPU_LEASE_DIR_ENV_KEY = "RESEARCHFLOW_GPU_LEASE_DIR"
+HISTORY_DB_ENV_KEY = "RESEARCHFLOW_HISTORY_DB"
 
 LEGACY_SLACK_BOT_TOKEN_ENV_KEY = "SLACK_BOT_TOKEN"
 LEGACY_SLACK_CHANNEL_ENV_KEY = "SLACK_CHANNEL"
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import ResearchFlowConfig
+from .process_utils import try_lock_file
+
+_LEADER_LOCK_NAME = "leader.lock"
+_LEADER_LOG_NAME = "leader.log"
+_ENTRY_SUFFIX = ".json"
+# A claimed entry, renamed while the leader sends it and deleted only once the send succeeded.
+_SENDING_SUFFIX = ".sending"
+
+
+def get_digest_spool_dir(destination_key: str = "") -> str:
+    # One spool per user and destination, so a digest only ever merges runs bound for the same place.
+    user_id = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    destination_hash = hashlib.sha256(destination_key.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"researchflow-digest-{user_id}-{destination_hash}")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _list_entry_paths(spool_dir: str, suffixes: Tuple[str, ...] = (_ENTRY_SUFFIX,)) -> List[str]:
+    try:
+        names = os.listdir(spool_dir)
+    except OSError:
+        return []
+    return [os.path.join(spool_dir, name) for name in sorted(names) if name.endswith(suffixes)]
+
+
+class NotificationDigest:
+    """
+    Coalesces notifications from concurrent alarm processes of the same user on this host that
+    go to the same Slack destination (see get_digest_spool_dir).
+
+    Every notification is written to the spool directory as one JSON file (written to a temp name,
+    then renamed, so readers never see partial entries). The first process to take the leader lock
+    waits `window_seconds`, then claims every spooled entry and sends them through `send_entries`.
+    A process that finds the lock taken only spools its entry; the current leader will pick it up.
+    After the leader releases the lock it checks the spool again, so an entry written during the
+    hand-off is never stranded. Claimed entries are only deleted after `send_entries` succeeds
+    (does not raise or return False); otherwise they go back to the spool for the next leader.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        send_entries: Callable[[List[Dict[str, Any]]], Any],
+        spool_dir: Optional[str] = None,
+        leader_config: Optional[ResearchFlowConfig] = None,
+    ):
+        self.window_seconds = window_seconds
+        self.send_entries = send_entries
+        self.spool_dir = spool_dir or get_digest_spool_dir()
+        self.leader_config = leader_config
+
+    def _spool(self, entry: Dict[str, Any]) -> str:
+        os.makedirs(self.spool_dir, mode=0o700, exist_ok=True)
+        entry_name = f"{time.time_ns()}_{os.getpid()}"
+        temporary_path = os.path.join(self.spool_dir, f".{entry_name}.tmp")
+        entry_path = os.path.join(self.spool_dir, entry_name + _ENTRY_SUFFIX)
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temporary_path, entry_path)
+        return entry_path
+
+    def _claim_entries(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Renames spooled entries to the sending state and reads them. Entries a previous leader
+        left in that state (it died mid-send) are claimed again; only the lock holder gets here.
+        """
+        entries: List[Dict[str, Any]] = []
+        claimed_paths: List[str] = []
+        for entry_path in _list_entry_paths(self.spool_dir, (_ENTRY_SUFFIX, _SENDING_SUFFIX)):
+            sending_path = entry_path
+            if entry_path.endswith(_ENTRY_SUFFIX):
+                sending_path = entry_path[:-len(_ENTRY_SUFFIX)] + _SENDING_SUFFIX
+                try:
+                    os.replace(entry_path, sending_path)
+                except OSError:
+                    continue
+            try:
+                with open(sending_path, "r", encoding="utf-8") as f:
+                    entries.append(json.load(f))
+                claimed_paths.append(sending_path)
+            except (OSError, json.JSONDecodeError) as e:
+                sys.stderr.write(f"[NotificationDigest] Dropping unreadable spool entry {entry_path}: {e}\n")
+                _remove_quietly(sending_path)
+        return entries, claimed_paths
+
+    @staticmethod
+    def _release_entries(claimed_paths: List[str], sent: bool) -> None:
+        for sending_path in claimed_paths:
+            if sent:
+                _remove_quietly(sending_path)
+            else:
+                try:
+                    os.replace(sending_path, sending_path[:-len(_SENDING_SUFFIX)] + _ENTRY_SUFFIX)
+                except OSError:
+                    pass
+
+    def _send_claimed(self, entries: List[Dict[str, Any]], claimed_paths: List[str]) -> bool:
+        try:
+            sent = self.send_entries(entries) is not False
+        except Exception as e:
+            sys.stderr.write(f"[NotificationDigest] Error sending digest: {e}\n")
+            sent = False
+        self._release_entries(claimed_paths, sent)
+        if not sent:
+            sys.stderr.write(f"[NotificationDigest] Sending {len(entries)} notifications failed; they stay spooled in {self.spool_dir} for the next digest.\n")
+        return sent
+
+    def flush_as_leader(self) -> int:
+        """Sends spooled entries while this process can hold the leader lock. Returns how many were sent."""
+        sent_count = 0
+        while True:
+            lock_fd = try_lock_file(os.path.join(self.spool_dir, _LEADER_LOCK_NAME))
+            if lock_fd is None:
+                return sent_count
+            try:
+                time.sleep(self.window_seconds)
+                entries, claimed_paths = self._claim_entries()
+                if entries:
+                    if not self._send_claimed(entries, claimed_paths):
+                        return sent_count
+                    sent_count += len(entries)
+            finally:
+                os.close(lock_fd)
+            if not _list_entry_paths(self.spool_dir):
+                return sent_count
+
+    def _start_leader_process(self) -> None:
+        """
+        Starts `python -m researchflow.core.digest_leader` in its own session and hands it the spool,
+        window and `leader_config` on stdin. A fresh interpreter rather than a fork: the caller may
+        have threads (a JobQueue worker) whose locks a forked child would inherit held.
+        """
+        popen_kwargs: Dict[str, Any] = {"stdin": subprocess.PIPE, "stdout": subprocess.DEVNULL}
+        if os.name == 'nt':
+            DETACHED_PROCESS = 0x00000008
+            popen_kwargs['creationflags'] = DETACHED_PROCESS
+        else:
+            popen_kwargs['start_new_session'] = True
+
+        with open(os.path.join(self.spool_dir, _LEADER_LOG_NAME), "ab") as leader_log:
+            process = subprocess.Popen([sys.executable, "-m", "researchflow.core.digest_leader"], stderr=leader_log, **popen_kwargs)
+        leader_spec = {"spool_dir": self.spool_dir, "window_seconds": self.window_seconds, "config": asdict(self.leader_config)}
+        with process.stdin:
+            process.stdin.write(json.dumps(leader_spec).encode("utf-8"))
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """
+        Spools `entry`. If no other process is collecting, starts the collector: a detached process
+        when `leader_config` is given, so the caller can exit now, or inline otherwise.
+        """
+        self._spool(entry)
+        probe_fd = try_lock_file(os.path.join(self.spool_dir, _LEADER_LOCK_NAME))
+        if probe_fd is None:
+            return
+        os.close(probe_fd)
+
+        if self.leader_config is not None:
+            try:
+                self._start_leader_process()
+                return
+            except OSError as e:
+                sys.stderr.write(f"[NotificationDigest] Could not start the digest process ({e}). Collecting inline.\n")
+        self.flush_as_leader()
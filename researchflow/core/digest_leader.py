@@ -0,0 +1,21 @@
+"""
+Entry point for the process that collects and sends a notification digest.
+NotificationDigest.submit starts it in a fresh interpreter and passes the spool directory,
+window and resolved config as JSON on stdin.
+"""
+import json
+import sys
+
+from .config import ResearchFlowConfig
+from .digest import NotificationDigest
+from .slack_sender import AlarmSlackSender
+
+
+def main() -> None:
+    leader_spec = json.loads(sys.stdin.buffer.read().decode("utf-8"))
+    sender = AlarmSlackSender(config=ResearchFlowConfig(**leader_spec["config"]))
+    NotificationDigest(leader_spec["window_seconds"], sender.send_digest, spool_dir=leader_spec["spool_dir"]).flush_as_leader()
+
+
+if __name__ == '__main__':
+    main()
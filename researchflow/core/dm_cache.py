@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from .config import get_default_config_path
+
+_CACHE_FILE_NAME = "dm_channels.json"
+
+# Entries already read from or written to each cache file in this process, keyed by file path.
+_memory_cache: Dict[str, Dict[str, str]] = {}
+_memory_cache_lock = threading.Lock()
+
+
+def get_dm_channel_cache_path() -> str:
+    return str(get_default_config_path().parent / _CACHE_FILE_NAME)
+
+
+def get_dm_cache_key(bot_token: str, user_id: str, team_id: Optional[str] = None) -> str:
+    # A DM channel belongs to one bot and one user. The token is hashed so the file holds no secret.
+    bot_hash = hashlib.sha256(bot_token.encode("utf-8")).hexdigest()[:16]
+    return f"{team_id or '-'}:{bot_hash}:{user_id}"
+
+
+class DmChannelCache:
+    """
+    Remembers the DM channel ID that conversations.open returned for a bot and user, in memory
+    and in a small JSON file next to the user config, so a DM notification needs only
+    chat.postMessage. The ID never changes on Slack's side; the caller forgets an entry when
+    Slack answers channel_not_found. The file is rewritten atomically, after re-reading it so
+    entries other alarm processes saved in the meantime are kept. Losing it only costs one extra
+    conversations.open.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_dm_channel_cache_path()
+
+    def _read_file(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _load(self) -> Dict[str, str]:
+        entries = _memory_cache.get(self.path)
+        if entries is None:
+            entries = _memory_cache[self.path] = self._read_file()
+        return entries
+
+    def _save(self, entries: Dict[str, str]) -> None:
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            sys.stderr.write(f"[SlackNotifier] Could not save DM channel cache {self.path}: {e}\n")
+
+    def get(self, key: str) -> Optional[str]:
+        with _memory_cache_lock:
+            return self._load().get(key)
+
+    def set(self, key: str, channel_id: str) -> None:
+        with _memory_cache_lock:
+            if self._load().get(key) == channel_id:
+                return
+            entries = self._read_file()
+            entries[key] = channel_id
+            self._save(entries)
+            _memory_cache[self.path] = entries
+
+    def forget(self, key: str) -> None:
+        with _memory_cache_lock:
+            if key not in self._load():
+                return
+            entries = self._read_file()
+            entries.pop(key, None)
+            self._save(entries)
+            _memory_cache[self.path] = entries
@@ -1,4 +1,3 @@
-import csv
 import shutil
 import subprocess
 import sys
@@ -61,6 +60,8 @@ def _run_command(command: List[str]) -> Optional[str]:
 def _parse_csv_rows(output: str) -> List[List[str]]:
     if not output:
         return []
+    import csv
+
     reader = csv.reader(StringIO(output))
     return [[cell.strip() for cell in row] for row in reader if row]
 
@@ -84,7 +85,7 @@ def _get_ps_info(pid: str) -> ProcessInfo:
     )
 
 
-def collect_gpu_info() -> List[GpuInfo]:
+def collect_gpu_info(include_processes: bool = True) -> List[GpuInfo]:
     if shutil.which("nvidia-smi") is None:
         return []
 
@@ -97,12 +98,14 @@ def collect_gpu_info() -> List[GpuInfo]:
         return []
 
     gpu_rows = _parse_csv_rows(gpu_output)
-    process_output = _run_command([
-        "nvidia-smi",
-        "--query-compute-apps=gpu_uuid,pid,process_name,used_memory",
-        "--format=csv,noheader,nounits",
-    ])
-    process_rows = _parse_csv_rows(process_output or "")
+    process_rows: List[List[str]] = []
+    if include_processes:
+        process_output = _run_command([
+            "nvidia-smi",
+            "--query-compute-apps=gpu_uuid,pid,process_name,used_memory",
+            "--format=csv,noheader,nounits",
+        ])
+        process_rows = _parse_csv_rows(process_output or "")
 
     processes_by_gpu: Dict[str, List[GpuProcessInfo]] = {}
     for row in process_rows:
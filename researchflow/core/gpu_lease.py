@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .constants import GPU_LEASE_DIR_ENV_KEY
+from .gpu import GpuInfo, collect_gpu_info
+from .process_utils import try_lock_file
+from .utils import get_hostname
+
+DEFAULT_GPU_POLL_MIN_SECONDS = 2.0
+DEFAULT_GPU_POLL_MAX_SECONDS = 60.0
+_GPU_POLL_BACKOFF = 1.5
+
+
+class GpuLeaseError(RuntimeError):
+    pass
+
+
+def get_gpu_lease_dir() -> str:
+    return os.environ.get(GPU_LEASE_DIR_ENV_KEY) or os.path.join(tempfile.gettempdir(), "researchflow-gpu-leases")
+
+
+def _ensure_lease_dir(lease_dir: str) -> None:
+    if os.path.isdir(lease_dir):
+        return
+    os.makedirs(lease_dir, exist_ok=True)
+    try:
+        # Shared by every user on the host, like /tmp.
+        os.chmod(lease_dir, 0o1777)
+    except OSError:
+        pass
+
+
+def _try_lock_gpu(lock_path: str) -> Optional[int]:
+    fd = try_lock_file(lock_path)
+    if fd is None:
+        return None
+    try:
+        os.ftruncate(fd, 0)
+        os.write(fd, f"pid={os.getpid()} host={get_hostname()} since={datetime.now().isoformat()}\n".encode("utf-8"))
+    except OSError:
+        pass
+    return fd
+
+
+def _to_number(value: str, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class GpuLease:
+    """
+    Host-wide claim on a set of GPUs. Each GPU is held through an exclusive lock on
+    <lease_dir>/<gpu uuid>.lock, which the OS releases if this process dies.
+    """
+
+    def __init__(self, gpus: List[GpuInfo], lock_fds: List[int]):
+        self.gpus = gpus
+        self._lock_fds = lock_fds
+
+    @property
+    def cuda_visible_devices(self) -> str:
+        return ",".join(gpu.index for gpu in self.gpus)
+
+    def apply_to_env(self, env: Dict[str, str]) -> Dict[str, str]:
+        # nvidia-smi numbers GPUs in PCI bus order; make CUDA use the same order.
+        env["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
+        env["CUDA_VISIBLE_DEVICES"] = self.cuda_visible_devices
+        return env
+
+    def release(self) -> None:
+        while self._lock_fds:
+            fd = self._lock_fds.pop()
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "GpuLease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def _try_lease(candidates: List[GpuInfo], gpu_count: int, lease_dir: str) -> Optional[GpuLease]:
+    leased_gpus: List[GpuInfo] = []
+    lock_fds: List[int] = []
+    for gpu in candidates:
+        fd = _try_lock_gpu(os.path.join(lease_dir, f"{gpu.uuid}.lock"))
+        if fd is None:
+            continue
+        leased_gpus.append(gpu)
+        lock_fds.append(fd)
+        if len(leased_gpus) == gpu_count:
+            return GpuLease(leased_gpus, lock_fds)
+    GpuLease(leased_gpus, lock_fds).release()
+    return None
+
+
+def acquire_gpu_lease(
+        gpu_count: int,
+        min_free_mib: int = 0,
+        timeout_seconds: Optional[float] = None,
+        lease_dir: Optional[str] = None,
+        min_poll_interval: float = DEFAULT_GPU_POLL_MIN_SECONDS,
+        max_poll_interval: float = DEFAULT_GPU_POLL_MAX_SECONDS,
+    ) -> GpuLease:
+    """
+    Waits until `gpu_count` GPUs each have at least `min_free_mib` MiB free and are not leased
+    by another alarm on this host, then leases the least-loaded ones.
+    Polling backs off from `min_poll_interval` to `max_poll_interval` while nothing changes and
+    starts over whenever more GPUs become eligible.
+    """
+    lease_dir = lease_dir or get_gpu_lease_dir()
+    _ensure_lease_dir(lease_dir)
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds is not None else None
+    poll_interval = min_poll_interval
+    last_eligible_count: Optional[int] = None
+
+    while True:
+        gpu_infos = collect_gpu_info(include_processes=False)
+        if not gpu_infos:
+            raise GpuLeaseError("No GPUs found. --gpus needs a working nvidia-smi on PATH.")
+        if gpu_count > len(gpu_infos):
+            raise GpuLeaseError(f"Requested {gpu_count} GPU(s), but this host only has {len(gpu_infos)}.")
+
+        eligible = [gpu for gpu in gpu_infos if _to_number(gpu.memory_free_mib, 0) >= min_free_mib]
+        eligible.sort(key=lambda gpu: (
+            _to_number(gpu.utilization_gpu_percent, 100),
+            -_to_number(gpu.memory_free_mib, 0),
+            _to_number(gpu.index, 0),
+        ))
+        if len(eligible) >= gpu_count:
+            lease = _try_lease(eligible, gpu_count, lease_dir)
+            if lease is not None:
+                return lease
+
+        if last_eligible_count is None or len(eligible) != last_eligible_count:
+            sys.stderr.write(
+                f"[GpuLease] Waiting for {gpu_count} GPU(s) with >= {min_free_mib} MiB free "
+                f"({len(eligible)} of {len(gpu_infos)} have enough memory now).\n"
+            )
+            if last_eligible_count is not None and len(eligible) > last_eligible_count:
+                poll_interval = min_poll_interval
+        last_eligible_count = len(eligible)
+
+        if deadline is not None and time.monotonic() + poll_interval > deadline:
+            raise GpuLeaseError(f"Timed out waiting for {gpu_count} free GPU(s).")
+        time.sleep(poll_interval)
+        poll_interval = min(poll_interval * _GPU_POLL_BACKOFF, max_poll_interval)
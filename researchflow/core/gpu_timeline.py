@@ -0,0 +1,343 @@
+import importlib.util
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .gpu import _parse_csv_rows, _run_command
+
+# nvidia-smi is a separate process per query, so it is polled less often than NVML.
+DEFAULT_NVML_SAMPLE_INTERVAL = 2.0
+DEFAULT_NVIDIA_SMI_SAMPLE_INTERVAL = 5.0
+DEFAULT_IDLE_ALERT_REPEAT_SECONDS = 3600.0
+_MAX_TIMELINE_POINTS = 120
+_SPARKLINE_LEVELS = "▁▂▃▄▅▆▇█"
+_MIB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class GpuReading:
+    index: str
+    name: str
+    uuid: str
+    utilization_percent: float
+    memory_used_mib: float
+    memory_total_mib: float
+
+
+@dataclass(frozen=True)
+class GpuUsage:
+    index: str
+    name: str
+    uuid: str
+    memory_total_mib: float
+    # Memory of the job's own processes on this GPU. None when nvidia-smi never listed them,
+    # e.g. inside a container with its own PID namespace; peak_device_memory_mib still applies.
+    peak_job_memory_mib: Optional[float]
+    peak_device_memory_mib: float
+    mean_utilization_percent: float
+    peak_utilization_percent: float
+    sampled_seconds: float
+    utilization_timeline: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _NvidiaSmiReader:
+    def read(self) -> Tuple[List[GpuReading], List[Tuple[str, int, float]]]:
+        gpu_rows = _parse_csv_rows(_run_command([
+            "nvidia-smi",
+            "--query-gpu=index,name,uuid,utilization.gpu,memory.used,memory.total",
+            "--format=csv,noheader,nounits",
+        ]) or "")
+        process_rows = _parse_csv_rows(_run_command([
+            "nvidia-smi",
+            "--query-compute-apps=gpu_uuid,pid,used_memory",
+            "--format=csv,noheader,nounits",
+        ]) or "")
+
+        readings = [
+            GpuReading(row[0], row[1], row[2], _to_float(row[3]), _to_float(row[4]), _to_float(row[5]))
+            for row in gpu_rows
+            if len(row) >= 6
+        ]
+        processes = [
+            (row[0], int(row[1]), _to_float(row[2]))
+            for row in process_rows
+            if len(row) >= 3 and row[1].isdigit()
+        ]
+        return readings, processes
+
+    def close(self) -> None:
+        pass
+
+
+def _import_pynvml() -> Any:
+    """Imports the optional NVML bindings, or returns None. Only the sampler thread calls this."""
+    try:
+        import pynvml
+    except ImportError:
+        return None
+    return pynvml
+
+
+class _NvmlReader:
+    def __init__(self, pynvml: Any):
+        self._pynvml = pynvml
+        pynvml.nvmlInit()
+        self._handles = [pynvml.nvmlDeviceGetHandleByIndex(index) for index in range(pynvml.nvmlDeviceGetCount())]
+        self._static = []
+        for index, handle in enumerate(self._handles):
+            name = pynvml.nvmlDeviceGetName(handle)
+            uuid = pynvml.nvmlDeviceGetUUID(handle)
+            self._static.append((
+                str(index),
+                name.decode() if isinstance(name, bytes) else name,
+                uuid.decode() if isinstance(uuid, bytes) else uuid,
+            ))
+
+    def read(self) -> Tuple[List[GpuReading], List[Tuple[str, int, float]]]:
+        pynvml = self._pynvml
+        readings: List[GpuReading] = []
+        processes: List[Tuple[str, int, float]] = []
+        for handle, (index, name, uuid) in zip(self._handles, self._static):
+            try:
+                utilization = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+                memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+                running = pynvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            except pynvml.NVMLError:
+                continue
+            readings.append(GpuReading(index, name, uuid, float(utilization), memory.used / _MIB, memory.total / _MIB))
+            processes.extend((uuid, process.pid, (process.usedGpuMemory or 0) / _MIB) for process in running)
+        return readings, processes
+
+    def close(self) -> None:
+        try:
+            self._pynvml.nvmlShutdown()
+        except self._pynvml.NVMLError:
+            pass
+
+
+def is_gpu_sampling_supported() -> bool:
+    return importlib.util.find_spec("pynvml") is not None or shutil.which("nvidia-smi") is not None
+
+
+class _GpuTrack:
+    def __init__(self, reading: GpuReading):
+        self.reading = reading
+        self.peak_job_memory_mib: Optional[float] = None
+        self.peak_device_memory_mib = 0.0
+        self.peak_utilization_percent = 0.0
+        self.weighted_utilization = 0.0
+        self.sampled_seconds = 0.0
+        self.timeline: List[float] = []
+        self._samples_per_point = 1
+        self._pending: List[float] = []
+
+    def add(self, reading: GpuReading, job_memory_mib: Optional[float], weight_seconds: float) -> None:
+        self.reading = reading
+        if job_memory_mib is not None:
+            self.peak_job_memory_mib = max(self.peak_job_memory_mib or 0.0, job_memory_mib)
+        self.peak_device_memory_mib = max(self.peak_device_memory_mib, reading.memory_used_mib)
+        self.peak_utilization_percent = max(self.peak_utilization_percent, reading.utilization_percent)
+        self.weighted_utilization += reading.utilization_percent * weight_seconds
+        self.sampled_seconds += weight_seconds
+
+        # Keeps at most _MAX_TIMELINE_POINTS points: when full, adjacent points are averaged and
+        # each later point covers twice as many samples.
+        self._pending.append(reading.utilization_percent)
+        if len(self._pending) < self._samples_per_point:
+            return
+        self.timeline.append(sum(self._pending) / len(self._pending))
+        self._pending = []
+        if len(self.timeline) >= _MAX_TIMELINE_POINTS:
+            self.timeline = [
+                sum(self.timeline[position:position + 2]) / len(self.timeline[position:position + 2])
+                for position in range(0, len(self.timeline), 2)
+            ]
+            self._samples_per_point *= 2
+
+    def to_usage(self) -> GpuUsage:
+        mean = self.weighted_utilization / self.sampled_seconds if self.sampled_seconds > 0 else 0.0
+        return GpuUsage(
+            index=self.reading.index,
+            name=self.reading.name,
+            uuid=self.reading.uuid,
+            memory_total_mib=self.reading.memory_total_mib,
+            peak_job_memory_mib=self.peak_job_memory_mib,
+            peak_device_memory_mib=self.peak_device_memory_mib,
+            mean_utilization_percent=round(mean, 1),
+            peak_utilization_percent=self.peak_utilization_percent,
+            sampled_seconds=round(self.sampled_seconds, 1),
+            utilization_timeline=[round(value, 1) for value in self.timeline + (
+                [sum(self._pending) / len(self._pending)] if self._pending else []
+            )],
+        )
+
+
+class GpuTimelineSampler:
+    """
+    Polls GPU utilization and memory while the job runs and keeps a timeline for every GPU the job
+    uses: GPUs where a compute process belongs to the job's process tree (from `get_job_pids`),
+    plus any `assigned_gpu_uuids` such as the GPUs leased with --gpus. Uses NVML when pynvml is
+    installed and nvidia-smi otherwise.
+    """
+
+    def __init__(
+            self,
+            get_job_pids: Callable[[], Set[int]],
+            assigned_gpu_uuids: Iterable[str] = (),
+            interval: Optional[float] = None,
+            on_sample: Optional[Callable[[float, List[GpuReading]], None]] = None,
+        ):
+        self.get_job_pids = get_job_pids
+        self.assigned_gpu_uuids = set(assigned_gpu_uuids)
+        self.interval = interval
+        self.on_sample = on_sample
+        self._reader: Optional[Any] = None
+        self._tracks: Dict[str, _GpuTrack] = {}
+        self._last_sample_at: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._usage: Optional[List[GpuUsage]] = None
+
+    def _open_reader(self) -> Any:
+        pynvml = _import_pynvml()
+        if pynvml is not None:
+            try:
+                reader = _NvmlReader(pynvml)
+                self.interval = self.interval or DEFAULT_NVML_SAMPLE_INTERVAL
+                return reader
+            except pynvml.NVMLError:
+                pass
+        self.interval = self.interval or DEFAULT_NVIDIA_SMI_SAMPLE_INTERVAL
+        return _NvidiaSmiReader()
+
+    def start(self) -> "GpuTimelineSampler":
+        self._thread = threading.Thread(target=self._run, name="researchflow-gpu-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        self._reader = self._open_reader()
+        try:
+            while not self._stop_event.is_set():
+                self.sample()
+                self._stop_event.wait(self.interval)
+        finally:
+            self._reader.close()
+
+    def sample(self, now: Optional[float] = None) -> None:
+        if self._reader is None:
+            self._reader = self._open_reader()
+        now = time.monotonic() if now is None else now
+        weight_seconds = now - self._last_sample_at if self._last_sample_at is not None else self.interval
+        self._last_sample_at = now
+
+        readings, processes = self._reader.read()
+        job_pids = self.get_job_pids()
+        job_memory: Dict[str, float] = {}
+        for gpu_uuid, pid, used_memory_mib in processes:
+            if pid in job_pids:
+                job_memory[gpu_uuid] = job_memory.get(gpu_uuid, 0.0) + used_memory_mib
+
+        job_readings = [
+            reading for reading in readings
+            if reading.uuid in job_memory or reading.uuid in self.assigned_gpu_uuids
+        ]
+        for reading in job_readings:
+            track = self._tracks.setdefault(reading.uuid, _GpuTrack(reading))
+            track.add(reading, job_memory.get(reading.uuid), weight_seconds)
+        if self.on_sample is not None:
+            self.on_sample(now, job_readings)
+
+    def stop(self) -> List[GpuUsage]:
+        """Stops sampling and returns per-GPU usage, ordered by GPU index. Calling it again returns the same result."""
+        if self._usage is not None:
+            return self._usage
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._usage = sorted(
+            (track.to_usage() for track in self._tracks.values()),
+            key=lambda usage: _to_float(usage.index),
+        )
+        return self._usage
+
+
+class IdleGpuWatch:
+    """
+    Feeds on GpuTimelineSampler samples and calls `on_idle(idle_seconds, readings)` once every GPU
+    of the job has stayed below `threshold_percent` utilization for `idle_seconds`. While the job
+    stays idle, `on_idle` is called again at most every `repeat_seconds`; activity ends the idle
+    episode, so a later one is reported as soon as it reaches `idle_seconds`. Samples where the job
+    has no GPU yet do not count as idle.
+    """
+
+    def __init__(
+            self,
+            threshold_percent: float,
+            idle_seconds: float,
+            on_idle: Callable[[float, List[GpuReading]], None],
+            repeat_seconds: float = DEFAULT_IDLE_ALERT_REPEAT_SECONDS,
+        ):
+        self.threshold_percent = threshold_percent
+        self.idle_seconds = idle_seconds
+        self.on_idle = on_idle
+        self.repeat_seconds = repeat_seconds
+        self._idle_since: Optional[float] = None
+        self._last_alert_at: Optional[float] = None
+
+    def observe(self, now: float, readings: List[GpuReading]) -> None:
+        if not readings or any(reading.utilization_percent >= self.threshold_percent for reading in readings):
+            # The idle episode is over; the next one alerts after its own idle window.
+            self._idle_since = None
+            self._last_alert_at = None
+            return
+        if self._idle_since is None:
+            self._idle_since = now
+        idle_for = now - self._idle_since
+        if idle_for < self.idle_seconds:
+            return
+        if self._last_alert_at is not None and now - self._last_alert_at < self.repeat_seconds:
+            return
+        self._last_alert_at = now
+        self.on_idle(idle_for, readings)
+
+
+def format_sparkline(values: List[float], width: int = 24, maximum: float = 100.0) -> str:
+    if not values:
+        return ""
+    if len(values) > width:
+        bucket_size = len(values) / width
+        values = [
+            sum(values[int(bucket * bucket_size):int((bucket + 1) * bucket_size)])
+            / len(values[int(bucket * bucket_size):int((bucket + 1) * bucket_size)])
+            for bucket in range(width)
+        ]
+    top = len(_SPARKLINE_LEVELS) - 1
+    return "".join(_SPARKLINE_LEVELS[min(top, max(0, round(value / maximum * top)))] for value in values)
+
+
+def format_gpu_usage(usages: List[GpuUsage]) -> str:
+    lines = []
+    for usage in usages:
+        if usage.peak_job_memory_mib is not None:
+            memory_text = f"peak {usage.peak_job_memory_mib / 1024:.1f} GiB"
+        else:
+            memory_text = f"peak {usage.peak_device_memory_mib / 1024:.1f} GiB (whole GPU)"
+        lines.append(
+            f"GPU {usage.index} ({usage.name}, {usage.memory_total_mib / 1024:.0f} GiB): {memory_text}, "
+            f"mean util {usage.mean_utilization_percent:.0f}%, peak {usage.peak_utilization_percent:.0f}% "
+            f"{format_sparkline(usage.utilization_timeline)}"
+        )
+    return "\n".join(lines)
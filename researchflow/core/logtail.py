@@ -0,0 +1,133 @@
+import gzip
+import io
+import mmap
+import os
+from collections import deque
+from typing import BinaryIO, List, Sequence, Tuple
+
+from .utils import decode_utf8_bytes
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_TAIL_BLOCK_SIZE = 64 * 1024
+DEFAULT_TAIL_MAX_BYTES = 1024 * 1024
+
+
+def _read_tail_bytes_by_seeking(f, file_size: int, n_lines: int, block_size: int, max_bytes: int) -> Tuple[bytes, bool]:
+    blocks: List[bytes] = []
+    newline_count = 0
+    position = file_size
+    lower_bound = max(0, file_size - max_bytes)
+
+    while position > lower_bound and newline_count <= n_lines:
+        read_size = min(block_size, position - lower_bound)
+        position -= read_size
+        f.seek(position)
+        block = f.read(read_size)
+        blocks.append(block)
+        newline_count += block.count(b"\n")
+
+    blocks.reverse()
+    return b"".join(blocks), position == 0
+
+
+def _read_tail_bytes_with_mmap(f, file_size: int, n_lines: int, max_bytes: int) -> Tuple[bytes, bool]:
+    lower_bound = max(0, file_size - max_bytes)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = file_size
+        for _ in range(n_lines + 1):
+            position = mapped.rfind(b"\n", lower_bound, position)
+            if position < 0:
+                position = lower_bound
+                break
+        return mapped[position:file_size], position == 0
+
+
+def _collapse_carriage_returns(line: str) -> str:
+    if line.endswith("\r"):
+        line = line[:-1]
+    if "\r" in line:
+        line = line.rsplit("\r", 1)[1]
+    return line
+
+
+def read_last_lines(
+    file_path: str,
+    n_lines: int = 50,
+    block_size: int = DEFAULT_TAIL_BLOCK_SIZE,
+    max_bytes: int = DEFAULT_TAIL_MAX_BYTES,
+    use_mmap: bool = False,
+) -> str:
+    """
+    Returns the last `n_lines` lines of a file by reading backwards from the end.
+    The cost depends on `n_lines` and is capped by `max_bytes`, not by the file size.
+    Carriage-return progress updates are reduced to their final state.
+    """
+    if n_lines <= 0:
+        return ""
+
+    with open(file_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size == 0:
+            return ""
+        if use_mmap:
+            data, reached_start = _read_tail_bytes_with_mmap(f, file_size, n_lines, max_bytes)
+        else:
+            data, reached_start = _read_tail_bytes_by_seeking(f, file_size, n_lines, block_size, max_bytes)
+
+    text = decode_utf8_bytes(data, trim_leading=not reached_start)
+    ends_with_newline = text.endswith("\n")
+    lines = text.split("\n")
+    if ends_with_newline:
+        lines.pop()
+    if not reached_start and len(lines) > n_lines:
+        lines = lines[1:]
+
+    last_lines = [_collapse_carriage_returns(line) for line in lines[-n_lines:]]
+    return "\n".join(last_lines) + ("\n" if ends_with_newline else "")
+
+
+def open_log_segment(file_path: str) -> BinaryIO:
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rb")
+    if file_path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {file_path} requires the optional 'zstandard' package.")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True))
+    return open(file_path, "rb")
+
+
+def _last_lines_of_compressed_segment(file_path: str, n_lines: int) -> List[str]:
+    last_lines: deque = deque(maxlen=n_lines)
+    with open_log_segment(file_path) as f:
+        for raw_line in f:
+            last_lines.append(raw_line)
+    return [_collapse_carriage_returns(decode_utf8_bytes(line.rstrip(b"\n"))) for line in last_lines]
+
+
+def read_last_lines_from_segments(segment_paths: Sequence[str], n_lines: int = 50) -> str:
+    """
+    Like read_last_lines, but for a log split into segments (oldest first).
+    Plain segments are read backwards; gzip/zstd segments are streamed with a bounded line window.
+    """
+    collected: List[str] = []
+    for file_path in reversed(segment_paths):
+        needed = n_lines - len(collected)
+        if needed <= 0:
+            break
+        if not os.path.exists(file_path):
+            continue
+        if file_path.endswith((".gz", ".zst")):
+            lines = _last_lines_of_compressed_segment(file_path, needed)
+        else:
+            text = read_last_lines(file_path, needed)
+            if not text:
+                continue
+            lines = text.split("\n")
+            if text.endswith("\n"):
+                lines.pop()
+        collected = lines + collected
+    return "\n".join(collected) + "\n" if collected else ""
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def redirect_standard_streams_to_devnull() -> None:
+    devnull_fd = os.open(os.devnull, os.O_RDWR)
+    for target_fd in (0, 1, 2):
+        os.dup2(devnull_fd, target_fd)
+    if devnull_fd > 2:
+        os.close(devnull_fd)
+
+
+def fork_daemon(run: Callable[[], int]) -> int:
+    """
+    Runs `run` in a daemon made with a double fork and setsid, with stdio sent to os.devnull.
+    The daemon keeps everything this process has already imported and resolved.
+    POSIX only. Returns the PID of the daemon.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read_fd, write_fd = os.pipe()
+
+    intermediate_pid = os.fork()
+    if intermediate_pid == 0:
+        exit_code = 1
+        try:
+            os.close(read_fd)
+            os.setsid()
+            daemon_pid = os.fork()
+            if daemon_pid != 0:
+                os.write(write_fd, str(daemon_pid).encode("ascii"))
+                exit_code = 0
+            else:
+                os.close(write_fd)
+                redirect_standard_streams_to_devnull()
+                exit_code = run()
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    os.close(write_fd)
+    os.waitpid(intermediate_pid, 0)
+    with os.fdopen(read_fd, "rb") as pid_reader:
+        return int(pid_reader.read() or b"0")
+
+
+def try_lock_file(lock_path: str) -> Optional[int]:
+    """
+    Takes an exclusive, non-blocking lock on `lock_path` (created if missing) and returns the
+    open fd, or None if someone else holds it. Closing the fd, or exiting, releases the lock.
+    """
+    try:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+    except PermissionError:
+        try:
+            fd = os.open(lock_path, os.O_RDONLY)
+        except OSError:
+            return None
+    except OSError:
+        return None
+
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def has_exited(process: subprocess.Popen) -> bool:
+    """
+    Like `process.poll() is not None`, but leaves an exited child unreaped where waitid supports
+    WNOWAIT, so wait_with_rusage can still collect its resource usage.
+    """
+    if process.returncode is not None:
+        return True
+    if hasattr(os, "waitid") and hasattr(os, "WNOWAIT"):
+        try:
+            return os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        except ChildProcessError:
+            return process.poll() is not None
+    return process.poll() is not None
+
+
+def _exit_code_from_wait_status(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def wait_with_rusage(process: subprocess.Popen) -> Tuple[int, Optional[Any]]:
+    """
+    Waits for `process` and returns (exit code, rusage). The rusage comes from os.wait4 and covers
+    the child plus every descendant it waited for; it is None where wait4 is unavailable or the
+    child was already reaped.
+    """
+    if process.returncode is None and hasattr(os, "wait4"):
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            return process.wait(), None
+        process.returncode = _exit_code_from_wait_status(status)
+        return process.returncode, rusage
+    return process.wait(), None
@@ -0,0 +1,284 @@
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .gpu import GpuInfo
+
+_SCHEMA_VERSION = 3
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        script_path TEXT NOT NULL,
+        script_name TEXT NOT NULL,
+        command TEXT NOT NULL,
+        script_args TEXT NOT NULL,
+        parsed_args TEXT,
+        metrics TEXT,
+        start_time REAL NOT NULL,
+        end_time REAL NOT NULL,
+        exit_code INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        host TEXT NOT NULL,
+        log_path TEXT,
+        gpu_snapshot TEXT,
+        resources TEXT,
+        gpu_usage TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_by_script_path ON runs (script_path, start_time)",
+    "CREATE INDEX IF NOT EXISTS runs_by_script_name ON runs (script_name, start_time)",
+    "CREATE INDEX IF NOT EXISTS runs_by_start_time ON runs (start_time)",
+    "CREATE INDEX IF NOT EXISTS runs_by_status ON runs (status, start_time)",
+    "CREATE INDEX IF NOT EXISTS runs_by_host ON runs (host, start_time)",
+)
+# Statements that bring a database at version N - 1 up to version N.
+_MIGRATIONS = {
+    2: ("ALTER TABLE runs ADD COLUMN resources TEXT",),
+    3: ("ALTER TABLE runs ADD COLUMN gpu_usage TEXT",),
+}
+_BUSY_TIMEOUT_MS = 10000
+
+
+def get_default_history_db_path() -> str:
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(Path.home(), ".local", "share")
+    return os.path.join(data_home, "researchflow", "runs.db")
+
+
+def gpu_snapshot_from_infos(gpu_infos: Sequence[GpuInfo]) -> List[Dict[str, str]]:
+    """Keeps the per-GPU numbers; the process list names other users' jobs and is left out."""
+    return [
+        {
+            "index": gpu.index,
+            "name": gpu.name,
+            "uuid": gpu.uuid,
+            "memory_used_mib": gpu.memory_used_mib,
+            "memory_total_mib": gpu.memory_total_mib,
+            "utilization_gpu_percent": gpu.utilization_gpu_percent,
+        }
+        for gpu in gpu_infos
+    ]
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    script_path: str
+    command: str
+    start_time: datetime
+    end_time: datetime
+    exit_code: int
+    status: str
+    host: str
+    script_args: Tuple[str, ...] = ()
+    parsed_args: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    log_path: Optional[str] = None
+    gpu_snapshot: Optional[List[Dict[str, Any]]] = None
+    resources: Optional[Dict[str, Any]] = None
+    gpu_usage: Optional[List[Dict[str, Any]]] = None
+    run_id: Optional[int] = field(default=None, compare=False)
+
+    @property
+    def script_name(self) -> str:
+        return os.path.basename(self.script_path)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time - self.start_time).total_seconds()
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, default=str)
+
+
+def _loads(text: Optional[str]) -> Any:
+    return None if text is None else json.loads(text)
+
+
+def _json_path(key: str) -> str:
+    if '"' in key or "\\" in key:
+        raise ValueError(f"Unsupported argument name: {key}")
+    return f'$."{key}"'
+
+
+def _parse_filter_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+_INSERT_RUN = (
+    "INSERT INTO runs (script_path, script_name, command, script_args, parsed_args, metrics, "
+    "start_time, end_time, exit_code, status, host, log_path, gpu_snapshot, resources, gpu_usage) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _to_row(record: RunRecord) -> Tuple[Any, ...]:
+    return (
+        record.script_path,
+        record.script_name,
+        record.command,
+        json.dumps(list(record.script_args)),
+        _dumps(record.parsed_args),
+        _dumps(record.metrics),
+        record.start_time.timestamp(),
+        record.end_time.timestamp(),
+        record.exit_code,
+        record.status,
+        record.host,
+        record.log_path,
+        _dumps(record.gpu_snapshot),
+        _dumps(record.resources),
+        _dumps(record.gpu_usage),
+    )
+
+
+class RunRegistry:
+    """
+    SQLite history of alarm runs, one row per run. The database uses WAL mode so concurrent
+    alarm processes can record runs while `alarm --history` reads, and every filter used by
+    query_runs is backed by an index on (column, start_time).
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = os.path.abspath(os.path.expanduser(db_path or get_default_history_db_path()))
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_MS / 1000)
+        connection.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+        if connection.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            self._upgrade_schema(connection)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    @staticmethod
+    def _upgrade_schema(connection: sqlite3.Connection) -> None:
+        connection.execute("PRAGMA journal_mode = WAL")
+        isolation_level = connection.isolation_level
+        connection.isolation_level = None
+        try:
+            # BEGIN IMMEDIATE serializes concurrent upgrades; re-read the version once we hold the lock.
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                version = connection.execute("PRAGMA user_version").fetchone()[0]
+                if version == 0:
+                    statements = list(_SCHEMA)
+                else:
+                    statements = [
+                        statement
+                        for target_version in range(version + 1, _SCHEMA_VERSION + 1)
+                        for statement in _MIGRATIONS[target_version]
+                    ]
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.isolation_level = isolation_level
+
+    def record_runs(self, records: Sequence[RunRecord]) -> None:
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(_INSERT_RUN, [_to_row(record) for record in records])
+        finally:
+            connection.close()
+
+    def record_run(self, record: RunRecord) -> int:
+        connection = self.connect()
+        try:
+            with connection:
+                cursor = connection.execute(_INSERT_RUN, _to_row(record))
+            return cursor.lastrowid
+        finally:
+            connection.close()
+
+    def query_runs(
+            self,
+            script: Optional[str] = None,
+            since: Optional[datetime] = None,
+            status: Optional[str] = None,
+            host: Optional[str] = None,
+            arg_filters: Sequence[Tuple[str, str]] = (),
+            limit: Optional[int] = 20,
+        ) -> List[RunRecord]:
+        """
+        Returns matching runs, newest first. `script` is a path (matched after abspath) or a bare
+        file name. Each (name, value) in `arg_filters` matches the value reported with
+        report_arguments, or `--name value` / `--name=value` on the command line.
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if script:
+            if os.sep in script or (os.altsep and os.altsep in script):
+                conditions.append("script_path = ?")
+                params.append(os.path.abspath(os.path.expanduser(script)))
+            else:
+                conditions.append("script_name = ?")
+                params.append(script)
+        if since is not None:
+            conditions.append("start_time >= ?")
+            params.append(since.timestamp())
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if host:
+            conditions.append("host = ?")
+            params.append(host)
+        for name, value in arg_filters:
+            flag = name if name.startswith("-") else f"--{name}"
+            conditions.append(
+                "(json_extract(parsed_args, ?) IN (?, ?) OR instr(script_args, ?) > 0 OR instr(script_args, ?) > 0)"
+            )
+            params.extend([
+                _json_path(name.lstrip("-")),
+                _parse_filter_value(value),
+                value,
+                json.dumps([flag, value])[1:-1],
+                json.dumps(f"{flag}={value}"),
+            ])
+
+        query = "SELECT * FROM runs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY start_time DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        connection = self.connect()
+        connection.row_factory = sqlite3.Row
+        try:
+            rows = connection.execute(query, params).fetchall()
+        finally:
+            connection.close()
+        return [
+            RunRecord(
+                script_path=row["script_path"],
+                command=row["command"],
+                start_time=datetime.fromtimestamp(row["start_time"]),
+                end_time=datetime.fromtimestamp(row["end_time"]),
+                exit_code=row["exit_code"],
+                status=row["status"],
+                host=row["host"],
+                script_args=tuple(json.loads(row["script_args"])),
+                parsed_args=_loads(row["parsed_args"]),
+                metrics=_loads(row["metrics"]),
+                log_path=row["log_path"],
+                gpu_snapshot=_loads(row["gpu_snapshot"]),
+                resources=_loads(row["resources"]),
+                gpu_usage=_loads(row["gpu_usage"]),
+                run_id=row["id"],
+            )
+            for row in rows
+        ]
@@ -0,0 +1,302 @@
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .utils import format_byte_size
+
+_PROC_DIR = "/proc"
+DEFAULT_SAMPLE_MIN_INTERVAL = 0.25
+DEFAULT_SAMPLE_MAX_INTERVAL = 5.0
+_SAMPLE_BACKOFF = 1.5
+# Fraction of one core the sampler may spend reading /proc; the interval grows to stay under it.
+_SAMPLER_CPU_BUDGET = 0.005
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    wall_seconds: float
+    cpu_user_seconds: float
+    cpu_system_seconds: float
+    peak_cpu_cores: float
+    peak_rss_bytes: int
+    max_process_rss_bytes: int
+    read_bytes: int
+    write_bytes: int
+    peak_process_count: int
+    sample_count: int
+    sampler_cpu_seconds: float
+
+    @property
+    def average_cpu_cores(self) -> float:
+        if self.wall_seconds <= 0:
+            return 0.0
+        return (self.cpu_user_seconds + self.cpu_system_seconds) / self.wall_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        usage_dict = asdict(self)
+        usage_dict["average_cpu_cores"] = round(self.average_cpu_cores, 3)
+        return usage_dict
+
+
+@dataclass
+class _ProcessSample:
+    cpu_ticks: int = 0
+    rss_bytes: int = 0
+    hwm_bytes: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+
+
+def is_resource_sampling_supported() -> bool:
+    return os.path.isdir(os.path.join(_PROC_DIR, "self", "task"))
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_stat(pid: int, page_size: int) -> Optional[Tuple[int, int]]:
+    """Returns (utime + stime in clock ticks, rss in bytes) from /proc/<pid>/stat."""
+    text = _read_text(f"{_PROC_DIR}/{pid}/stat")
+    if not text:
+        return None
+    # The command name is in parentheses and may contain spaces; fields restart after the last ')'.
+    fields = text[text.rfind(")") + 2:].split()
+    try:
+        return int(fields[11]) + int(fields[12]), int(fields[21]) * page_size
+    except (IndexError, ValueError):
+        return None
+
+
+def get_process_start_time(pid: int) -> Optional[int]:
+    """
+    Start time of `pid` in clock ticks after boot, from /proc/<pid>/stat. Together with the PID it
+    identifies a process, so a PID the kernel has since given to another process is not mistaken
+    for the old one. None when the process is gone or /proc is unavailable.
+    """
+    text = _read_text(f"{_PROC_DIR}/{pid}/stat")
+    if not text:
+        return None
+    fields = text[text.rfind(")") + 2:].split()
+    try:
+        return int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def _read_hwm_bytes(pid: int) -> int:
+    text = _read_text(f"{_PROC_DIR}/{pid}/status") or ""
+    for line in text.splitlines():
+        if line.startswith("VmHWM:"):
+            try:
+                return int(line.split()[1]) * 1024
+            except (IndexError, ValueError):
+                return 0
+    return 0
+
+
+def _read_io_bytes(pid: int) -> Tuple[int, int]:
+    read_bytes = write_bytes = 0
+    for line in (_read_text(f"{_PROC_DIR}/{pid}/io") or "").splitlines():
+        key, _, value = line.partition(":")
+        if key == "read_bytes":
+            read_bytes = int(value)
+        elif key == "write_bytes":
+            write_bytes = int(value)
+    return read_bytes, write_bytes
+
+
+def _list_children(pid: int) -> List[int]:
+    children: List[int] = []
+    try:
+        thread_ids = os.listdir(f"{_PROC_DIR}/{pid}/task")
+    except OSError:
+        return children
+    for thread_id in thread_ids:
+        text = _read_text(f"{_PROC_DIR}/{pid}/task/{thread_id}/children")
+        if text:
+            children.extend(int(child) for child in text.split())
+    return children
+
+
+def _rusage_max_rss_bytes(rusage: Any) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return int(rusage.ru_maxrss) if sys.platform == "darwin" else int(rusage.ru_maxrss) * 1024
+
+
+class ProcessTreeSampler:
+    """
+    Samples CPU time, RSS and storage I/O of a child process and all of its descendants from
+    /proc in a background thread. The interval starts at `min_interval`, backs off to
+    `max_interval` while the set of processes stays the same, and starts over when it changes.
+    It also grows so that reading /proc stays within a small CPU budget.
+
+    stop() merges the samples with the child's wait4 rusage, when given, for exact CPU totals.
+    With `exclude_prior_usage`, CPU time and I/O the root process had already used when start()
+    was called are not counted, for a root that is not a fresh child (alarm --inprocess).
+    Does nothing where /proc is unavailable.
+    """
+
+    def __init__(
+            self,
+            root_pid: int,
+            min_interval: float = DEFAULT_SAMPLE_MIN_INTERVAL,
+            max_interval: float = DEFAULT_SAMPLE_MAX_INTERVAL,
+            exclude_prior_usage: bool = False,
+        ):
+        self.root_pid = root_pid
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.exclude_prior_usage = exclude_prior_usage
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._processes: Dict[int, _ProcessSample] = {}
+        self._tree_pids: Set[int] = {root_pid}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+        self._usage: Optional[ResourceUsage] = None
+
+        self._peak_cpu_cores = 0.0
+        self._peak_rss_bytes = 0
+        self._peak_process_count = 0
+        self._sample_count = 0
+        self._sampler_cpu_seconds = 0.0
+        self._last_sample_at: Optional[float] = None
+        self._last_tree_ticks = 0
+        self._baseline = _ProcessSample()
+
+    def start(self) -> "ProcessTreeSampler":
+        self._started_at = time.monotonic()
+        if self.exclude_prior_usage and is_resource_sampling_supported():
+            stat = _read_stat(self.root_pid, self._page_size)
+            self._baseline.cpu_ticks = stat[0] if stat else 0
+            self._baseline.read_bytes, self._baseline.write_bytes = _read_io_bytes(self.root_pid)
+        if is_resource_sampling_supported():
+            self._thread = threading.Thread(target=self._run, name="researchflow-resource-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        interval = self.min_interval
+        previous_pids: Set[int] = set()
+        while True:
+            cost_started = time.thread_time()
+            pids = self.sample()
+            sample_cost = time.thread_time() - cost_started
+            self._sampler_cpu_seconds += sample_cost
+
+            if pids != previous_pids:
+                interval = self.min_interval
+            else:
+                interval = min(interval * _SAMPLE_BACKOFF, self.max_interval)
+            interval = max(interval, sample_cost / _SAMPLER_CPU_BUDGET)
+            previous_pids = pids
+            if self._stop_event.wait(interval):
+                return
+
+    @property
+    def tree_pids(self) -> Set[int]:
+        """PIDs of the child and its descendants as of the latest sample."""
+        return self._tree_pids
+
+    def sample(self) -> Set[int]:
+        """Reads the current process tree once and returns the PIDs that were alive."""
+        now = time.monotonic()
+        alive: Set[int] = set()
+        tree_ticks = 0
+        tree_rss = 0
+        pending = [self.root_pid]
+        while pending:
+            pid = pending.pop()
+            if pid in alive:
+                continue
+            stat = _read_stat(pid, self._page_size)
+            if stat is None:
+                continue
+            alive.add(pid)
+            cpu_ticks, rss_bytes = stat
+            process = self._processes.setdefault(pid, _ProcessSample())
+            process.cpu_ticks = cpu_ticks
+            process.rss_bytes = rss_bytes
+            if rss_bytes > process.hwm_bytes:
+                process.hwm_bytes = max(rss_bytes, _read_hwm_bytes(pid))
+            read_bytes, write_bytes = _read_io_bytes(pid)
+            process.read_bytes = max(process.read_bytes, read_bytes)
+            process.write_bytes = max(process.write_bytes, write_bytes)
+            tree_ticks += cpu_ticks
+            tree_rss += rss_bytes
+            pending.extend(_list_children(pid))
+
+        if alive:
+            self._tree_pids = alive
+            self._sample_count += 1
+            self._peak_rss_bytes = max(self._peak_rss_bytes, tree_rss)
+            self._peak_process_count = max(self._peak_process_count, len(alive))
+            if self._last_sample_at is not None and now > self._last_sample_at:
+                # Ticks of processes that exited since the last sample drop out of tree_ticks.
+                tick_delta = max(0, tree_ticks - self._last_tree_ticks)
+                cores = tick_delta / self._clock_ticks / (now - self._last_sample_at)
+                self._peak_cpu_cores = max(self._peak_cpu_cores, cores)
+            self._last_sample_at = now
+            self._last_tree_ticks = tree_ticks
+        return alive
+
+    def stop(self, child_rusage: Optional[Any] = None) -> ResourceUsage:
+        """Stops sampling and returns the usage of the whole run. Calling it again returns the same result."""
+        if self._usage is not None:
+            return self._usage
+        wall_seconds = time.monotonic() - self._started_at
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+        processes = list(self._processes.values())
+        baseline = self._baseline
+        sampled_cpu_ticks = sum(process.cpu_ticks for process in processes) - baseline.cpu_ticks
+        sampled_cpu_seconds = max(0, sampled_cpu_ticks) / self._clock_ticks
+        cpu_user_seconds, cpu_system_seconds = sampled_cpu_seconds, 0.0
+        read_bytes = max(0, sum(process.read_bytes for process in processes) - baseline.read_bytes)
+        write_bytes = max(0, sum(process.write_bytes for process in processes) - baseline.write_bytes)
+        max_process_rss_bytes = max((process.hwm_bytes for process in processes), default=0)
+        if child_rusage is not None:
+            cpu_user_seconds, cpu_system_seconds = child_rusage.ru_utime, child_rusage.ru_stime
+            # Block counts are in 512-byte units and come from the same accounting as /proc/<pid>/io.
+            read_bytes = max(read_bytes, int(child_rusage.ru_inblock) * 512)
+            write_bytes = max(write_bytes, int(child_rusage.ru_oublock) * 512)
+            max_process_rss_bytes = max(max_process_rss_bytes, _rusage_max_rss_bytes(child_rusage))
+
+        self._usage = ResourceUsage(
+            wall_seconds=round(wall_seconds, 3),
+            cpu_user_seconds=round(cpu_user_seconds, 3),
+            cpu_system_seconds=round(cpu_system_seconds, 3),
+            peak_cpu_cores=round(self._peak_cpu_cores, 2),
+            peak_rss_bytes=max(self._peak_rss_bytes, max_process_rss_bytes),
+            max_process_rss_bytes=max_process_rss_bytes,
+            read_bytes=read_bytes,
+            write_bytes=write_bytes,
+            peak_process_count=self._peak_process_count,
+            sample_count=self._sample_count,
+            sampler_cpu_seconds=round(self._sampler_cpu_seconds, 4),
+        )
+        return self._usage
+
+
+def format_resource_usage(usage: ResourceUsage) -> str:
+    peak_cores = max(usage.peak_cpu_cores, usage.average_cpu_cores)
+    parts = [
+        f"Peak RSS {format_byte_size(usage.peak_rss_bytes)} (largest process {format_byte_size(usage.max_process_rss_bytes)})",
+        f"CPU {usage.average_cpu_cores:.2f} cores avg, {peak_cores:.2f} peak "
+        f"(user {usage.cpu_user_seconds:.1f}s, sys {usage.cpu_system_seconds:.1f}s)",
+        f"Disk read {format_byte_size(usage.read_bytes)}, write {format_byte_size(usage.write_bytes)}",
+    ]
+    if usage.peak_process_count > 1:
+        parts.append(f"{usage.peak_process_count} processes")
+    return " | ".join(parts)
@@ -0,0 +1,134 @@
+import email.utils
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+_REQUEST_TIMEOUT_SECONDS = 30
+_DEFAULT_MAX_ATTEMPTS = 4
+_BACKOFF_BASE_SECONDS = 1.0
+_MAX_BACKOFF_SECONDS = 30.0
+# Slack's rate-limit windows are a minute at most; a longer Retry-After is capped rather than trusted.
+_MAX_RETRY_AFTER_SECONDS = 60.0
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# The server refused these without acting on them (RFC 9110), so even a chat.postMessage can be resent.
+_REJECTED_STATUS_CODES = frozenset({429, 503})
+
+_session: Any = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+# Module level so tests can record the delays instead of waiting them out.
+_sleep = time.sleep
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session, so Slack calls reuse one keep-alive connection
+    instead of a TCP and TLS handshake each. A forked child gets its own session rather than
+    sharing the parent's sockets.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            # Imported here: requests takes ~100 ms to import and most alarm invocations never post.
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def get_request_exception_class() -> type:
+    """The base class of what request_with_retry raises, without importing requests in the caller."""
+    import requests
+
+    return requests.exceptions.RequestException
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER_SECONDS)
+
+
+def _get_retry_delay_seconds(attempt: int, retry_after: Optional[float]) -> float:
+    """Retry-After plus a little jitter when given, otherwise exponential backoff with full jitter."""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, _BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(_MAX_BACKOFF_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def _failed_before_sending(error: Exception) -> bool:
+    import requests
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    from urllib3.exceptions import NewConnectionError
+
+    # requests wraps urllib3's MaxRetryError, whose `reason` says whether a connection was ever made.
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def request_with_retry(method: str, url: str, idempotent: bool, max_attempts: int = _DEFAULT_MAX_ATTEMPTS, **request_kwargs: Any):
+    """
+    Sends a request on the shared session, retrying 429s, 5xx responses and network errors with
+    exponential backoff, or after the server's Retry-After when it sends one.
+
+    A request that is not `idempotent` (a chat.postMessage or webhook post) is only retried when
+    Slack cannot have acted on it: the connection was never made, or the response was 429 or 503.
+    After a read timeout or another 5xx the message may already be posted, so it is not resent.
+
+    Returns the last response, whatever its status, and raises the last requests exception when
+    every attempt failed without one.
+    """
+    import requests
+
+    request_kwargs.setdefault("timeout", _REQUEST_TIMEOUT_SECONDS)
+    session = get_session()
+    # Webhook URLs carry their secret in the path, so only the host goes into messages.
+    host = urlsplit(url).netloc
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = session.request(method, url, **request_kwargs)
+        except requests.exceptions.RequestException as e:
+            retryable = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            if attempt == max_attempts or not retryable or not (idempotent or _failed_before_sending(e)):
+                raise
+            delay = _get_retry_delay_seconds(attempt, None)
+            sys.stderr.write(f"[SlackHTTP] {type(e).__name__} talking to {host}. Retrying in {delay:.1f}s ({attempt}/{max_attempts - 1}).\n")
+            _sleep(delay)
+            continue
+
+        status_code = response.status_code
+        if (
+            attempt == max_attempts
+            or status_code not in _RETRY_STATUS_CODES
+            or not (idempotent or status_code in _REJECTED_STATUS_CODES)
+        ):
+            return response
+        delay = _get_retry_delay_seconds(attempt, _parse_retry_after(response.headers.get("Retry-After")))
+        sys.stderr.write(f"[SlackHTTP] HTTP {status_code} from {host}. Retrying in {delay:.1f}s ({attempt}/{max_attempts - 1}).\n")
+        response.close()
+        _sleep(delay)
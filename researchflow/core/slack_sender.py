@@ -1,26 +1,41 @@
+import hashlib
 import json
 import os
 import sys
 import traceback
-from typing import Any, Dict, List, Optional
-
-import requests
+from typing import Any, Dict, List, Optional, Sequence
 
 from .config import ResearchFlowConfig, load_config
+from .digest import NotificationDigest, get_digest_spool_dir
+from .dm_cache import DmChannelCache, get_dm_cache_key
+from .slack_http import get_request_exception_class, request_with_retry
+
+_MAX_DIGEST_EXPANDED_FAILURES = 10
+_DIGEST_ERROR_EXCERPT_LENGTH = 800
+# Slack API methods that are safe to resend after an ambiguous failure: they post nothing.
+_IDEMPOTENT_SLACK_METHODS = frozenset({"conversations.open"})
 
 
 class SlackNotifier:
-    def __init__(self, config: Optional[ResearchFlowConfig] = None):
+    def __init__(self, config: Optional[ResearchFlowConfig] = None, dm_channel_cache: Optional[DmChannelCache] = None):
         self.config = config if config is not None else load_config()
+        self.dm_channel_cache = dm_channel_cache if dm_channel_cache is not None else DmChannelCache()
 
     @staticmethod
-    def _post_json(url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    def _post_json(
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        request_exception_class = get_request_exception_class()
         try:
-            response = requests.post(
+            response = request_with_retry(
+                "POST",
                 url,
+                idempotent,
                 data=json.dumps(payload),
                 headers=headers or {"Content-Type": "application/json"},
-                timeout=30,
             )
             response.raise_for_status()
             if response.text:
@@ -29,7 +44,7 @@ class SlackNotifier:
                 except ValueError:
                     return {"ok": True, "text": response.text}
             return {"ok": True}
-        except requests.exceptions.RequestException as e:
+        except request_exception_class as e:
             sys.stderr.write(f"[SlackNotifier] Error sending Slack notification: {e}\n")
             if e.response is not None:
                 sys.stderr.write(f"[SlackNotifier] Response Status Code: {e.response.status_code}\n")
@@ -42,15 +57,24 @@ class SlackNotifier:
             "Content-Type": "application/json; charset=utf-8",
         }
 
-    def _call_slack_api(self, method: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _call_slack_api(
+        self,
+        method: str,
+        payload: Dict[str, Any],
+        expected_errors: Sequence[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the response, or None on failure. Errors in `expected_errors` return the response unlogged."""
         response_payload = self._post_json(
             f"https://slack.com/api/{method}",
             payload,
             headers=self._api_headers(),
+            idempotent=method in _IDEMPOTENT_SLACK_METHODS,
         )
         if response_payload is None:
             return None
         if not response_payload.get("ok"):
+            if response_payload.get("error") in expected_errors:
+                return response_payload
             sys.stderr.write(
                 f"[SlackNotifier] Slack API method {method} failed: "
                 f"{response_payload.get('error', 'unknown_error')}\n"
@@ -96,6 +120,20 @@ class SlackNotifier:
             return "webhook"
         return None
 
+    def get_destination_key(self) -> str:
+        """Identifies where send_payload would post. Bot tokens are hashed so the key holds no secret."""
+        delivery = self._resolve_delivery()
+        token_hash = hashlib.sha256(self.config.slack_bot_token.encode("utf-8")).hexdigest()[:16] if self.config.slack_bot_token else "-"
+        if delivery == "webhook":
+            target = self.config.slack_webhook_url or "-"
+        elif delivery == "channel":
+            target = f"{token_hash}:{self.config.slack_channel or '-'}"
+        elif delivery == "dm":
+            target = f"{token_hash}:{self.config.slack_team_id or '-'}:{self.config.slack_user_id or '-'}"
+        else:
+            target = "-"
+        return f"{delivery or '-'}:{target}"
+
     def send_payload(self, payload: Dict[str, Any]) -> bool:
         delivery = self._resolve_delivery()
         if delivery == "off":
@@ -111,9 +149,10 @@ class SlackNotifier:
             sys.stderr.write("[SlackNotifier] Slack bot token not configured. Skipping notification.\n")
             return False
 
-        channel_id = self.config.slack_channel
         if delivery == "dm":
-            channel_id = self._open_dm()
+            return self._send_dm_payload(payload)
+
+        channel_id = self.config.slack_channel
         if not channel_id:
             sys.stderr.write("[SlackNotifier] Slack channel/DM target could not be resolved.\n")
             return False
@@ -122,21 +161,48 @@ class SlackNotifier:
         api_payload["channel"] = channel_id
         return self._call_slack_api("chat.postMessage", api_payload) is not None
 
+    def _send_dm_payload(self, payload: Dict[str, Any]) -> bool:
+        """Posts to the cached DM channel, opening it with conversations.open only on a cache miss."""
+        cache_key = None
+        if self.config.slack_user_id:
+            cache_key = get_dm_cache_key(self.config.slack_bot_token, self.config.slack_user_id, self.config.slack_team_id)
+            channel_id = self.dm_channel_cache.get(cache_key)
+            if channel_id:
+                response_payload = self._call_slack_api(
+                    "chat.postMessage",
+                    dict(payload, channel=channel_id),
+                    expected_errors=("channel_not_found",),
+                )
+                if response_payload is None:
+                    return False
+                if response_payload.get("ok"):
+                    return True
+                self.dm_channel_cache.forget(cache_key)
+
+        channel_id = self._open_dm()
+        if not channel_id:
+            sys.stderr.write("[SlackNotifier] Slack channel/DM target could not be resolved.\n")
+            return False
+        self.dm_channel_cache.set(cache_key, channel_id)
+        return self._call_slack_api("chat.postMessage", dict(payload, channel=channel_id)) is not None
+
     def _send_webhook_payload(self, payload: Dict[str, Any]) -> bool:
         if not self.config.slack_webhook_url:
             sys.stderr.write("[SlackNotifier] Slack webhook URL not configured. Skipping notification.\n")
             return False
 
+        request_exception_class = get_request_exception_class()
         try:
-            response = requests.post(
+            response = request_with_retry(
+                "POST",
                 self.config.slack_webhook_url,
+                False,
                 data=json.dumps(payload),
                 headers={"Content-Type": "application/json"},
-                timeout=30,
             )
             response.raise_for_status()
             return True
-        except requests.exceptions.RequestException as e:
+        except request_exception_class as e:
             sys.stderr.write(f"[SlackNotifier] Error sending Slack webhook notification: {e}\n")
             if e.response is not None:
                 sys.stderr.write(f"[SlackNotifier] Response Status Code: {e.response.status_code}\n")
@@ -156,7 +222,7 @@ class AlarmSlackSender:
         self.notifier = SlackNotifier(config=config)
 
     @staticmethod
-    def _format_slack_block_text(text: str, max_length: int = 2900, is_mrkdwn: bool = True) -> str:
+    def _format_slack_block_text(text: str, max_length: int = 2900, is_mrkdwn: bool = True, keep_tail: bool = False) -> str:
         if not text:
             return "N/A" if is_mrkdwn else ""
 
@@ -165,10 +231,18 @@ class AlarmSlackSender:
             allowed_text_len = max_length - len(truncate_msg)
             if allowed_text_len < 0:
                 return text[:max_length]
+            if keep_tail:
+                head_len = allowed_text_len // 3
+                tail_len = allowed_text_len - head_len - 1
+                return text[:head_len] + truncate_msg + "\n" + text[-tail_len:]
             text = text[:allowed_text_len] + truncate_msg
         return text
 
-    def _format_parsed_arguments_block(self, args_dict: Optional[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    def _format_parsed_arguments_block(
+        self,
+        args_dict: Optional[Dict[str, Any]],
+        title: str = "Parsed Arguments",
+    ) -> Optional[List[Dict[str, Any]]]:
         if not args_dict:
             return None
 
@@ -188,7 +262,7 @@ class AlarmSlackSender:
         )
 
         return [
-            {"type": "section", "text": {"type": "mrkdwn", "text": "*Parsed Arguments*"}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": f"*{title}*"}},
             {"type": "context", "elements": [{"type": "mrkdwn", "text": formatted_args_text_for_block}]},
         ]
 
@@ -201,6 +275,7 @@ class AlarmSlackSender:
             f"```{error_to_send}```",
             max_length=2950,
             is_mrkdwn=True,
+            keep_tail=True,
         )
 
         return [
@@ -208,7 +283,7 @@ class AlarmSlackSender:
             {"type": "context", "elements": [{"type": "mrkdwn", "text": formatted_error_text_for_block}]},
         ]
 
-    def _format_gpu_info_block(self, gpu_info_text: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    def _format_gpu_info_block(self, gpu_info_text: Optional[str], title: str = "GPU Snapshot") -> Optional[List[Dict[str, Any]]]:
         if not gpu_info_text:
             return None
 
@@ -218,7 +293,7 @@ class AlarmSlackSender:
             is_mrkdwn=True,
         )
         return [
-            {"type": "section", "text": {"type": "mrkdwn", "text": "*GPU Snapshot*"}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": f"*{title}*"}},
             {"type": "context", "elements": [{"type": "mrkdwn", "text": formatted_gpu_text}]},
         ]
 
@@ -237,6 +312,9 @@ class AlarmSlackSender:
         error_output_str: Optional[str] = None,
         log_file_path_str: Optional[str] = None,
         gpu_info_text: Optional[str] = None,
+        metrics_dict: Optional[Dict[str, Any]] = None,
+        resource_usage_text: Optional[str] = None,
+        gpu_usage_text: Optional[str] = None,
     ) -> Dict[str, Any]:
         color = "#36a64f" if status == "Success" else "#ff0000"
         status_emoji = "✅" if status == "Success" else "❌"
@@ -270,11 +348,17 @@ class AlarmSlackSender:
             base_blocks.append(
                 {"type": "context", "elements": [{"type": "mrkdwn", "text": f"*Log:* `{log_file_path_str}`"}]}
             )
+        if resource_usage_text:
+            base_blocks.append(
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": f"*Resources:* {resource_usage_text}"}]}
+            )
 
         final_blocks = list(base_blocks)
 
         for optional_blocks in (
             self._format_parsed_arguments_block(parsed_args_dict),
+            self._format_parsed_arguments_block(metrics_dict, title="Final Metrics"),
+            self._format_gpu_info_block(gpu_usage_text, title="GPU Usage During Run"),
             self._format_gpu_info_block(gpu_info_text),
         ):
             if optional_blocks:
@@ -322,6 +406,10 @@ class AlarmSlackSender:
         error_output_str: Optional[str] = None,
         log_file_path_str: Optional[str] = None,
         gpu_info_text: Optional[str] = None,
+        metrics_dict: Optional[Dict[str, Any]] = None,
+        resource_usage_text: Optional[str] = None,
+        gpu_usage_text: Optional[str] = None,
+        digest_seconds: float = 0,
     ) -> bool:
         payload = self._build_alarm_payload(
             script_name=script_name,
@@ -337,5 +425,340 @@ class AlarmSlackSender:
             error_output_str=error_output_str,
             log_file_path_str=log_file_path_str,
             gpu_info_text=gpu_info_text,
+            metrics_dict=metrics_dict,
+            resource_usage_text=resource_usage_text,
+            gpu_usage_text=gpu_usage_text,
+        )
+        if digest_seconds > 0:
+            try:
+                NotificationDigest(
+                    digest_seconds,
+                    self.send_digest,
+                    spool_dir=self._get_digest_spool_dir(),
+                    leader_config=self.config,
+                ).submit({
+                    "script_name": script_name,
+                    "status": status,
+                    "duration_str": duration_str,
+                    "exit_code": exit_code,
+                    "hostname": hostname,
+                    "end_time_str": end_time_str,
+                    "error_output_str": error_output_str if status == "Failure" else None,
+                    "log_file_path_str": log_file_path_str,
+                    "payload": payload,
+                })
+                return True
+            except OSError as e:
+                sys.stderr.write(f"[SlackNotifier] Could not queue digest notification: {e}. Sending it directly.\n")
+        return self.notifier.send_payload(payload)
+
+    def _build_running_job_alert_payload(
+        self,
+        title: str,
+        message: str,
+        fallback_text: str,
+        script_name: str,
+        hostname: str,
+        pid: int,
+        running_for_str: str,
+        detail_text: Optional[str] = None,
+        log_file_path_str: Optional[str] = None,
+        log_tail_str: Optional[str] = None,
+        stack_dump_str: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"{title}: {self._format_slack_block_text(script_name, max_length=140, is_mrkdwn=False)}",
+                    "emoji": True,
+                },
+            },
+            {"type": "section", "text": {"type": "mrkdwn", "text": message}},
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Host:*\n`{hostname}`"},
+                    {"type": "mrkdwn", "text": f"*PID:*\n`{pid}`"},
+                    {"type": "mrkdwn", "text": f"*Running For:*\n{running_for_str}"},
+                ],
+            },
+        ]
+        if detail_text is not None:
+            blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": detail_text}]})
+        if log_file_path_str:
+            blocks.append(
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": f"*Log:* `{log_file_path_str}`"}]}
+            )
+        for heading, text in (("*Last log lines:*", log_tail_str), ("*Stack dump:*", stack_dump_str)):
+            if not text:
+                continue
+            formatted_text = self._format_slack_block_text(text, max_length=2800, is_mrkdwn=False, keep_tail=True)
+            blocks.extend([
+                {"type": "section", "text": {"type": "mrkdwn", "text": heading}},
+                {"type": "section", "text": {"type": "mrkdwn", "text": f"```{formatted_text}```"}},
+            ])
+
+        if self.config.mention_user and self.config.slack_user_id:
+            fallback_text = f"<@{self.config.slack_user_id}> {fallback_text}"
+        return {"text": fallback_text, "attachments": [{"color": "#f2c744", "blocks": blocks}]}
+
+    def _build_idle_gpu_alert_payload(
+        self,
+        script_name: str,
+        hostname: str,
+        pid: int,
+        idle_duration_str: str,
+        running_for_str: str,
+        threshold_percent: float,
+        gpu_lines: List[str],
+        log_file_path_str: Optional[str] = None,
+        log_tail_str: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._build_running_job_alert_payload(
+            title="GPU Idle Alert",
+            message=f"⚠️ The job's GPUs have been below *{threshold_percent:g}%* utilization for *{idle_duration_str}*. "
+                    "It is still running; check for a stalled data loader or a hung collective.",
+            fallback_text=f"⚠️ {script_name} GPUs idle for {idle_duration_str} on {hostname}",
+            script_name=script_name,
+            hostname=hostname,
+            pid=pid,
+            running_for_str=running_for_str,
+            detail_text="\n".join(gpu_lines) or "No GPU readings",
+            log_file_path_str=log_file_path_str,
+            log_tail_str=log_tail_str,
+        )
+
+    def send_idle_gpu_alert(
+        self,
+        script_name: str,
+        hostname: str,
+        pid: int,
+        idle_duration_str: str,
+        running_for_str: str,
+        threshold_percent: float,
+        gpu_lines: List[str],
+        log_file_path_str: Optional[str] = None,
+        log_tail_str: Optional[str] = None,
+    ) -> bool:
+        payload = self._build_idle_gpu_alert_payload(
+            script_name=script_name,
+            hostname=hostname,
+            pid=pid,
+            idle_duration_str=idle_duration_str,
+            running_for_str=running_for_str,
+            threshold_percent=threshold_percent,
+            gpu_lines=gpu_lines,
+            log_file_path_str=log_file_path_str,
+            log_tail_str=log_tail_str,
+        )
+        return self.notifier.send_payload(payload)
+
+    def _build_stall_alert_payload(
+        self,
+        script_name: str,
+        hostname: str,
+        pid: int,
+        silent_duration_str: str,
+        running_for_str: str,
+        killing: bool = False,
+        log_file_path_str: Optional[str] = None,
+        log_tail_str: Optional[str] = None,
+        stack_dump_str: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if killing:
+            next_step = "It looks hung and is being stopped; its final notification follows."
+        else:
+            next_step = "It is still running; check for a deadlock or a hung collective."
+        return self._build_running_job_alert_payload(
+            title="Output Stall Alert",
+            message=f"⚠️ The script has written no output for *{silent_duration_str}*. {next_step}",
+            fallback_text=f"⚠️ {script_name} silent for {silent_duration_str} on {hostname}",
+            script_name=script_name,
+            hostname=hostname,
+            pid=pid,
+            running_for_str=running_for_str,
+            log_file_path_str=log_file_path_str,
+            log_tail_str=log_tail_str,
+            stack_dump_str=stack_dump_str,
+        )
+
+    def send_stall_alert(
+        self,
+        script_name: str,
+        hostname: str,
+        pid: int,
+        silent_duration_str: str,
+        running_for_str: str,
+        killing: bool = False,
+        log_file_path_str: Optional[str] = None,
+        log_tail_str: Optional[str] = None,
+        stack_dump_str: Optional[str] = None,
+    ) -> bool:
+        payload = self._build_stall_alert_payload(
+            script_name=script_name,
+            hostname=hostname,
+            pid=pid,
+            silent_duration_str=silent_duration_str,
+            running_for_str=running_for_str,
+            killing=killing,
+            log_file_path_str=log_file_path_str,
+            log_tail_str=log_tail_str,
+            stack_dump_str=stack_dump_str,
+        )
+        return self.notifier.send_payload(payload)
+
+    def _build_queue_summary_payload(
+        self,
+        queue_name: str,
+        job_results: List[Dict[str, Any]],
+        duration_str: str,
+        hostname: str,
+        start_time_str: str,
+        end_time_str: str,
+        report_title: str = "Queue Report",
+        results_table: Optional[str] = None,
+        results_file_path_str: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        failed_count = sum(1 for result in job_results if result["exit_code"] != 0)
+        succeeded_count = len(job_results) - failed_count
+        status = "Success" if failed_count == 0 else "Failure"
+        color = "#36a64f" if status == "Success" else "#ff0000"
+        status_emoji = "✅" if status == "Success" else "❌"
+
+        job_lines = []
+        for result in job_results:
+            job_emoji = "✅" if result["exit_code"] == 0 else "❌"
+            job_lines.append(f"{job_emoji} `{result['command']}` exit {result['exit_code']} ({result['duration_str']})")
+
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"{report_title}: {self._format_slack_block_text(queue_name, max_length=140, is_mrkdwn=False)}",
+                    "emoji": True,
+                },
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Status:*\n{status_emoji} *{succeeded_count}/{len(job_results)} succeeded*"},
+                    {"type": "mrkdwn", "text": f"*Duration:*\n{duration_str}"},
+                    {"type": "mrkdwn", "text": f"*Host:*\n`{hostname}`"},
+                    {"type": "mrkdwn", "text": f"*Failed:*\n`{failed_count}`"},
+                    {"type": "mrkdwn", "text": f"*Start Time:*\n{start_time_str}"},
+                    {"type": "mrkdwn", "text": f"*End Time:*\n{end_time_str}"},
+                ],
+            },
+        ]
+        if results_file_path_str:
+            blocks.append(
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": f"*Results:* `{results_file_path_str}`"}]}
+            )
+        results_text = f"```{results_table}```" if results_table else "\n".join(job_lines)
+        blocks.extend([
+            {"type": "divider"},
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": self._format_slack_block_text(results_text, max_length=2950)},
+            },
+        ])
+
+        fallback_text = f"{status_emoji} {queue_name}: {succeeded_count}/{len(job_results)} jobs succeeded ({duration_str})"
+        if self.config.mention_user and self.config.slack_user_id:
+            fallback_text = f"<@{self.config.slack_user_id}> {fallback_text}"
+
+        return {"text": fallback_text, "attachments": [{"color": color, "blocks": blocks}]}
+
+    def send_queue_summary(
+        self,
+        queue_name: str,
+        job_results: List[Dict[str, Any]],
+        duration_str: str,
+        hostname: str,
+        start_time_str: str,
+        end_time_str: str,
+        report_title: str = "Queue Report",
+        results_table: Optional[str] = None,
+        results_file_path_str: Optional[str] = None,
+    ) -> bool:
+        payload = self._build_queue_summary_payload(
+            queue_name=queue_name,
+            job_results=job_results,
+            duration_str=duration_str,
+            hostname=hostname,
+            start_time_str=start_time_str,
+            end_time_str=end_time_str,
+            report_title=report_title,
+            results_table=results_table,
+            results_file_path_str=results_file_path_str,
         )
         return self.notifier.send_payload(payload)
+
+    def _build_digest_payload(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failures = [entry for entry in entries if entry["status"] != "Success"]
+        successes = [entry for entry in entries if entry["status"] == "Success"]
+        hostnames = sorted({entry.get("hostname") or "N/A" for entry in entries})
+        color = "#36a64f" if not failures else "#ff0000"
+        status_emoji = "✅" if not failures else "❌"
+
+        blocks: List[Dict[str, Any]] = [
+            {
+                "type": "header",
+                "text": {"type": "plain_text", "text": f"Alarm Digest: {len(entries)} runs finished", "emoji": True},
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Succeeded:*\n`{len(successes)}`"},
+                    {"type": "mrkdwn", "text": f"*Failed:*\n`{len(failures)}`"},
+                    {"type": "mrkdwn", "text": f"*Host:*\n`{', '.join(hostnames)}`"},
+                    {"type": "mrkdwn", "text": f"*Last End Time:*\n{entries[-1].get('end_time_str', 'N/A')}"},
+                ],
+            },
+        ]
+
+        for entry in failures[:_MAX_DIGEST_EXPANDED_FAILURES]:
+            blocks.append({"type": "divider"})
+            summary = f"❌ *{entry['script_name']}* | Exit Code: `{entry['exit_code']}` | {entry['duration_str']}"
+            if entry.get("log_file_path_str"):
+                summary += f"\n*Log:* `{entry['log_file_path_str']}`"
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": self._format_slack_block_text(summary)}})
+            if entry.get("error_output_str"):
+                error_text = self._format_slack_block_text(
+                    f"```{entry['error_output_str'].strip()}```",
+                    max_length=_DIGEST_ERROR_EXCERPT_LENGTH,
+                    keep_tail=True,
+                )
+                blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": error_text}]})
+        if len(failures) > _MAX_DIGEST_EXPANDED_FAILURES:
+            blocks.append({
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"... and {len(failures) - _MAX_DIGEST_EXPANDED_FAILURES} more failures"}],
+            })
+
+        if successes:
+            success_lines = [f"✅ {entry['script_name']} ({entry['duration_str']})" for entry in successes]
+            blocks.append({"type": "divider"})
+            blocks.append({
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": self._format_slack_block_text("\n".join(success_lines), max_length=2950)},
+            })
+
+        fallback_text = f"{status_emoji} {len(entries)} runs finished: {len(successes)} succeeded, {len(failures)} failed"
+        if self.config.mention_user and self.config.slack_user_id:
+            fallback_text = f"<@{self.config.slack_user_id}> {fallback_text}"
+
+        return {"text": fallback_text, "attachments": [{"color": color, "blocks": blocks}]}
+
+    def _get_digest_spool_dir(self) -> str:
+        # The digest's own text mentions the user when configured, so that is part of where it goes.
+        mention = self.config.slack_user_id if self.config.mention_user else ""
+        return get_digest_spool_dir(f"{self.notifier.get_destination_key()}|mention:{mention or '-'}")
+
+    def send_digest(self, entries: List[Dict[str, Any]]) -> bool:
+        if len(entries) == 1:
+            return self.notifier.send_payload(entries[0]["payload"])
+        return self.notifier.send_payload(self._build_digest_payload(entries))
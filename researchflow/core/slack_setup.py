@@ -2,9 +2,8 @@ import getpass
 import sys
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
-
 from .config import load_config, update_config_file
+from .slack_http import request_with_retry
 
 
 class SlackApiError(RuntimeError):
@@ -26,11 +25,12 @@ class SlackSetupClient:
         return {"Authorization": f"Bearer {self.token}"}
 
     def _get(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        response = requests.get(
+        response = request_with_retry(
+            "GET",
             f"https://slack.com/api/{method}",
+            True,
             headers=self._headers(),
             params=params or {},
-            timeout=30,
         )
         response.raise_for_status()
         data = response.json()
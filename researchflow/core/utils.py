@@ -1,17 +1,17 @@
 import argparse
 import json
 import os
+import socket
 import sys
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Union, Dict, Any
-
-from dotenv import load_dotenv
+from typing import Callable, Union, Dict, Any, List, Sequence
 
 from .constants import (
     LEGACY_SLACK_BOT_TOKEN_ENV_KEY,
     LEGACY_SLACK_CHANNEL_ENV_KEY,
     LEGACY_SLACK_USER_ID_ENV_KEY,
+    HISTORY_DB_ENV_KEY,
     LOG_DIR_ENV_KEY,
     SLACK_BOT_TOKEN_ENV_KEY,
     SLACK_CHANNEL_ENV_KEY,
@@ -20,9 +20,12 @@ from .constants import (
     SLACK_USER_ID_ENV_KEY,
     SLACK_WEBHOOK_ENV_KEY,
 )
-from researchflow.alarm.constants import PARSED_ARGS_START_MARKER, PARSED_ARGS_END_MARKER
+from researchflow.alarm.constants import METRICS_MARKER, PARSED_ARGS_START_MARKER, PARSED_ARGS_END_MARKER
 
 _dotenv_loaded_globally = False
+# Called as listener(kind, values) by report_arguments ("arguments") and report_metrics ("metrics"),
+# so an open alarm_context sees the reports without parsing stdout.
+_report_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
 
 def ensure_dotenv_is_loaded():
     global _dotenv_loaded_globally
@@ -33,8 +36,10 @@ def ensure_dotenv_is_loaded():
     package_root_env = Path(__file__).resolve().parent.parent.parent / ".env"
 
     if current_working_directory_env.exists():
+        from dotenv import load_dotenv
         load_dotenv(dotenv_path=current_working_directory_env, override=True)
     elif package_root_env.exists():
+        from dotenv import load_dotenv
         load_dotenv(dotenv_path=package_root_env, override=True)
 
     _dotenv_loaded_globally = True
@@ -67,6 +72,10 @@ def get_log_dir_from_env():
     ensure_dotenv_is_loaded()
     return os.environ.get(LOG_DIR_ENV_KEY)
 
+def get_history_db_from_env():
+    ensure_dotenv_is_loaded()
+    return os.environ.get(HISTORY_DB_ENV_KEY)
+
 
 def get_kst_timestamp_string(target_datetime: datetime = None, datetime_format_str: str = '%Y-%m-%d %H:%M:%S KST'):
     korea_standard_time = timezone(timedelta(hours=9))
@@ -109,6 +118,79 @@ def format_script_duration(start_datetime: datetime, end_datetime: datetime) ->
         
     return " ".join(duration_components) if duration_components else "0s"
 
+def get_hostname() -> str:
+    try:
+        return os.uname().nodename
+    except AttributeError:
+        try:
+            return socket.gethostname()
+        except Exception:
+            return "N/A"
+
+
+def format_byte_size(num_bytes: int) -> str:
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    size = float(num_bytes)
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} TB"
+
+def format_text_table(rows: Sequence[Sequence[str]]) -> str:
+    """Left-aligns `rows` (the first one is the header) into columns separated by two spaces."""
+    if not rows:
+        return ""
+    widths: List[int] = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+def parse_byte_size(text: str) -> int:
+    value = str(text).strip().upper().replace("IB", "").rstrip("B")
+    multiplier = 1
+    for suffix, suffix_multiplier in (("K", 1024), ("M", 1024 ** 2), ("G", 1024 ** 3), ("T", 1024 ** 4)):
+        if value.endswith(suffix):
+            value = value[:-1]
+            multiplier = suffix_multiplier
+            break
+    size = int(float(value) * multiplier)
+    if size < 0:
+        raise ValueError(f"Size must not be negative: {text}")
+    return size
+
+def parse_duration_seconds(text: str) -> float:
+    value = str(text).strip().lower()
+    multiplier = 1.0
+    for suffix, suffix_multiplier in (("ms", 0.001), ("s", 1.0), ("m", 60.0), ("h", 3600.0), ("d", 86400.0), ("w", 604800.0)):
+        if value.endswith(suffix):
+            value = value[:-len(suffix)]
+            multiplier = suffix_multiplier
+            break
+    seconds = float(value) * multiplier
+    if seconds < 0:
+        raise ValueError(f"Duration must not be negative: {text}")
+    return seconds
+
+def decode_utf8_bytes(data: bytes, trim_leading: bool = False, trim_trailing: bool = False) -> str:
+    if trim_leading:
+        skip = 0
+        while skip < min(3, len(data)) and data[skip] & 0xC0 == 0x80:
+            skip += 1
+        data = data[skip:]
+
+    if trim_trailing:
+        for back in range(1, min(4, len(data)) + 1):
+            byte = data[-back]
+            if byte & 0xC0 == 0x80:
+                continue
+            if byte >= 0xC0:
+                sequence_length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if sequence_length > back:
+                    data = data[:-back]
+            break
+
+    return data.decode("utf-8", errors="replace")
+
 def report_arguments(args: Union[argparse.Namespace, Dict[str, Any]]):
     """
     Reports script arguments to be captured by the researchflow alarm tool.
@@ -122,5 +204,22 @@ def report_arguments(args: Union[argparse.Namespace, Dict[str, Any]]):
         sys.stdout.write(json_output)
         sys.stdout.write(f"\n{PARSED_ARGS_END_MARKER}\n\n")
         sys.stdout.flush()
+        for listener in list(_report_listeners):
+            listener("arguments", args_dict)
     except TypeError as e:
         sys.stderr.write(f"[researchflow.report_arguments] Error: Could not serialize arguments to JSON: {e}\n")
+
+
+def report_metrics(metrics: Dict[str, Any]):
+    """
+    Reports final metrics (e.g. {"loss": 0.12, "acc": 0.98}) to be shown by the researchflow alarm tool.
+    Call it as often as you like; the alarm report and sweep table use the last call.
+    """
+    try:
+        json_output = json.dumps(metrics)
+        sys.stdout.write(f"\n{METRICS_MARKER}{json_output}\n")
+        sys.stdout.flush()
+        for listener in list(_report_listeners):
+            listener("metrics", metrics)
+    except TypeError as e:
+        sys.stderr.write(f"[researchflow.report_metrics] Error: Could not serialize metrics to JSON: {e}\n")
@@ -0,0 +1,16 @@
+import os
+from typing import Dict
+
+from researchflow.core.constants import HISTORY_DB_ENV_KEY
+
+
+def isolated_alarm_env(history_db: str = "off", **overrides: str) -> Dict[str, str]:
+    """
+    Environment for running the alarm CLI in a subprocess. Run history goes to `history_db`
+    (off by default) instead of the user's real runs.db, the way the GPU lease tests point
+    RESEARCHFLOW_GPU_LEASE_DIR at a temporary directory.
+    """
+    env = dict(os.environ)
+    env[HISTORY_DB_ENV_KEY] = history_db
+    env.update(overrides)
+    return env
@@ -3,14 +3,84 @@ import re
 import subprocess
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from unittest import mock
 
-from researchflow.alarm.handler import _resolve_log_file_path
+from researchflow.alarm.handler import _resolve_log_file_path, _spawn_detached_monitor
+from researchflow.core.config import ResearchFlowConfig
+from support import isolated_alarm_env
+
+_WAITING_SCRIPT = """
+import os, sys, time
+for index in range(5):
+    print(f"line {index}", flush=True)
+deadline = time.monotonic() + 30
+while not os.path.exists(sys.argv[1]) and time.monotonic() < deadline:
+    time.sleep(0.05)
+"""
 
 
 class AlarmIntegrationTests(unittest.TestCase):
+    def _log_text_while_running(self, *alarm_args):
+        """Runs a script that prints and then blocks, and returns its log as read before it exits."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script_path = os.path.join(tmpdir, "waiting.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(_WAITING_SCRIPT)
+            release_path = os.path.join(tmpdir, "release")
+            log_dir = os.path.join(tmpdir, "logs")
+            process = subprocess.Popen(
+                [sys.executable, "-m", "researchflow.alarm.cli", "--destination", "off", "--no-gpu-info",
+                 "--log", "--wait", "--log-dir", log_dir, *alarm_args, script_path, release_path],
+                cwd=Path(__file__).resolve().parents[1],
+                env=isolated_alarm_env(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+            try:
+                log_text = ""
+                deadline = time.monotonic() + 10
+                while "line 4" not in log_text and time.monotonic() < deadline and process.poll() is None:
+                    time.sleep(0.05)
+                    log_paths = list(Path(log_dir).glob("*_waiting.log"))
+                    log_text = log_paths[0].read_text(encoding="utf-8", errors="replace") if log_paths else ""
+                still_running = process.poll() is None
+            finally:
+                Path(release_path).touch()
+                _, stderr = process.communicate(timeout=30)
+
+        self.assertTrue(still_running, stderr)
+        self.assertEqual(process.returncode, 0, stderr)
+        return log_text
+
+    def test_tee_without_log_is_rejected(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        completed = subprocess.run(
+            [sys.executable, "-m", "researchflow.alarm.cli", "--destination", "off", "--tee",
+             str(repo_root / "tests" / "fixtures" / "sample_experiment.py")],
+            cwd=repo_root,
+            env=isolated_alarm_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30,
+        )
+
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn("--tee requires --log", completed.stderr)
+        self.assertNotIn("Sample Experiment", completed.stdout)
+
+    def test_tee_log_is_written_while_the_script_runs(self):
+        self.assertIn("line 4", self._log_text_while_running("--tee"))
+
+    def test_rotating_log_is_written_while_the_script_runs(self):
+        self.assertIn("line 4", self._log_text_while_running("--log-max-size", "10M"))
+
+    def test_compacted_log_is_written_while_the_script_runs(self):
+        self.assertIn("line 4", self._log_text_while_running("--compact-log"))
+
     def test_alarm_wraps_sample_experiment_without_slack(self):
         repo_root = Path(__file__).resolve().parents[1]
         sample_script = repo_root / "tests" / "fixtures" / "sample_experiment.py"
@@ -34,6 +104,7 @@ class AlarmIntegrationTests(unittest.TestCase):
                     str(checkpoint_dir),
                 ],
                 cwd=repo_root,
+                env=isolated_alarm_env(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
@@ -72,6 +143,7 @@ class AlarmIntegrationTests(unittest.TestCase):
                     str(Path(tmpdir) / "artifacts"),
                 ],
                 cwd=repo_root,
+                env=isolated_alarm_env(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
@@ -86,6 +158,82 @@ class AlarmIntegrationTests(unittest.TestCase):
         self.assertIn("Skipping Slack notification", completed.stdout)
         self.assertEqual(len(log_files), 1)
 
+    @unittest.skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_detached_log_returns_before_script_finishes_and_monitor_writes_log(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        sample_script = repo_root / "tests" / "fixtures" / "sample_experiment.py"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "researchflow.alarm.cli",
+                    "--destination",
+                    "off",
+                    "--no-gpu-info",
+                    "--log",
+                    "--log-dir",
+                    tmpdir,
+                    str(sample_script),
+                    "--epochs",
+                    "1",
+                    "--total-runtime-factor",
+                    "0",
+                    "--checkpoint-save-dir",
+                    str(Path(tmpdir) / "artifacts"),
+                ],
+                cwd=repo_root,
+                env=isolated_alarm_env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=30,
+            )
+            self.assertEqual(completed.returncode, 0, completed.stderr)
+            monitor_pid = int(re.search(r"PID: (\d+)", completed.stdout).group(1))
+            self._wait_for_pid_exit(monitor_pid)
+
+            log_files = list(Path(tmpdir).glob("*_sample_experiment.log"))
+            self.assertEqual(len(log_files), 1)
+            self.assertIn("Finished successfully", log_files[0].read_text(encoding="utf-8"))
+
+    @unittest.skipUnless(os.name == "posix", "waits on the monitor with os.waitpid")
+    def test_spawned_monitor_runs_with_config_from_parent(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        sample_script = repo_root / "tests" / "fixtures" / "sample_experiment.py"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, "run.log")
+            monitor_pid = _spawn_detached_monitor(
+                log_path,
+                ResearchFlowConfig(slack_destination="off", include_gpu=False),
+                {
+                    "target_script_path": str(sample_script),
+                    "target_script_args": ["--epochs", "1", "--total-runtime-factor", "0",
+                                           "--checkpoint-save-dir", os.path.join(tmpdir, "artifacts")],
+                    "alarm_command_args_for_display": [str(sample_script)],
+                    "enable_logging": True,
+                },
+            )
+            _, status = os.waitpid(monitor_pid, 0)
+
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+            with open(log_path, "r", encoding="utf-8") as f:
+                self.assertIn("Finished successfully", f.read())
+
+    def _wait_for_pid_exit(self, pid, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                return
+            time.sleep(0.05)
+        self.fail(f"Monitor process {pid} did not exit")
+
     def test_default_log_path_uses_script_logs_dir_and_kst_timestamp(self):
         script_path = "/tmp/project/train.py"
         with mock.patch("researchflow.alarm.handler._get_kst_log_timestamp", return_value="20260502_123456_123456_KST"):
@@ -110,6 +258,22 @@ class AlarmIntegrationTests(unittest.TestCase):
             r"^\d{8}_\d{6}_\d{6}_KST_train\.log$",
         )
 
+    def test_cli_import_defers_slack_and_dotenv_modules(self):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, researchflow.alarm.cli; "
+                "print(' '.join(m for m in ('requests', 'dotenv', 'concurrent.futures') if m in sys.modules))",
+            ],
+            cwd=Path(__file__).resolve().parents[1],
+            stdout=subprocess.PIPE,
+            text=True,
+            timeout=30,
+        )
+
+        self.assertEqual(completed.stdout.strip(), "")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import time
+import io
+import os
+import unittest
+from unittest import mock
+
+from researchflow.core.async_notify import AsyncSlackNotifier
+
+
+class _BlockingSender:
+    def __init__(self):
+        self.payloads = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, payload):
+        self.entered.set()
+        self.release.wait(5)
+        self.payloads.append(payload)
+        return True
+
+
+class AsyncSlackNotifierTests(unittest.TestCase):
+    def test_sends_in_order_and_flushes(self):
+        sent = []
+        notifier = AsyncSlackNotifier(send_payload=sent.append)
+
+        for epoch in range(3):
+            notifier.submit(f"epoch {epoch} done")
+
+        self.assertTrue(notifier.flush(5))
+        self.assertEqual([payload["text"] for payload in sent], ["epoch 0 done", "epoch 1 done", "epoch 2 done"])
+        self.assertEqual(sent[0]["blocks"][0]["text"]["text"], "epoch 0 done")
+
+    def test_full_queue_drops_oldest_and_reports_it(self):
+        sender = _BlockingSender()
+        notifier = AsyncSlackNotifier(max_pending=2, send_payload=sender)
+        notifier.submit("first")
+        self.assertTrue(sender.entered.wait(5))
+
+        started = time.perf_counter()
+        for index in range(4):
+            notifier.submit(f"queued {index}")
+        submit_seconds = time.perf_counter() - started
+        sender.release.set()
+
+        self.assertTrue(notifier.flush(5))
+        self.assertLess(submit_seconds, 0.1)
+        self.assertEqual(notifier.dropped_count, 2)
+        self.assertEqual([payload["text"] for payload in sender.payloads], ["first", "queued 2", "queued 3"])
+        self.assertIn("2 earlier messages dropped", sender.payloads[1]["blocks"][1]["elements"][0]["text"])
+
+    def test_flush_gives_up_at_the_deadline(self):
+        sender = _BlockingSender()
+        notifier = AsyncSlackNotifier(send_payload=sender)
+        notifier.submit("stuck")
+        self.assertTrue(sender.entered.wait(5))
+
+        started = time.monotonic()
+        flushed = notifier.flush(0.1)
+        elapsed = time.monotonic() - started
+        sender.release.set()
+
+        self.assertFalse(flushed)
+        self.assertLess(elapsed, 2)
+
+
+    def test_broken_config_discards_messages_instead_of_killing_the_thread(self):
+        notifier = AsyncSlackNotifier()
+        with mock.patch("researchflow.core.async_notify.load_config", side_effect=ValueError("bad config file")), \
+                mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            notifier.submit("epoch 0 done")
+            notifier.submit("epoch 1 done")
+            self.assertTrue(notifier.flush(5))
+
+        self.assertEqual(stderr.getvalue().count("bad config file"), 1)
+
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_forked_child_starts_with_its_own_drop_count(self):
+        sender = _BlockingSender()
+        notifier = AsyncSlackNotifier(max_pending=1, send_payload=sender)
+        notifier.submit("first")
+        self.assertTrue(sender.entered.wait(5))
+        notifier.submit("queued 0")
+        notifier.submit("queued 1")
+        self.assertEqual(notifier.dropped_count, 1)
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            notifier._send_payload = lambda payload: None
+            notifier.submit("from the child")
+            os.write(write_fd, str(notifier.dropped_count).encode("utf-8"))
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            child_dropped_count = int(pipe.read())
+        os.waitpid(pid, 0)
+        sender.release.set()
+
+        self.assertEqual(child_dropped_count, 0)
+        self.assertTrue(notifier.flush(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
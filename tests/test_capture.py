@@ -0,0 +1,63 @@
+import os
+import unittest
+
+from researchflow.alarm.capture import BoundedOutputCapture
+
+
+class BoundedOutputCaptureTests(unittest.TestCase):
+    def test_small_output_is_kept_verbatim(self):
+        capture = BoundedOutputCapture(head_bytes=16, tail_bytes=16)
+        capture.write(b"hello\n")
+        capture.write(b"world\n")
+
+        self.assertFalse(capture.truncated)
+        self.assertEqual(capture.render_excerpt(), "hello\nworld\n")
+
+    def test_memory_stays_bounded_and_keeps_head_and_tail(self):
+        capture = BoundedOutputCapture(head_bytes=32, tail_bytes=32)
+        for index in range(10000):
+            capture.write(f"line {index}\n".encode("utf-8"))
+
+        self.assertEqual(len(capture.head), 32)
+        self.assertEqual(len(capture.tail), 32)
+        self.assertTrue(capture.truncated)
+        excerpt = capture.render_excerpt()
+        self.assertTrue(excerpt.startswith("line 0\nline 1\n"))
+        self.assertTrue(excerpt.endswith("line 9999\n"))
+        self.assertIn("omitted", excerpt)
+
+    def test_excerpt_does_not_split_multibyte_characters(self):
+        capture = BoundedOutputCapture(head_bytes=4, tail_bytes=4)
+        capture.write("가나다라마바사".encode("utf-8"))
+
+        excerpt = capture.render_excerpt()
+        self.assertNotIn("�", excerpt)
+        self.assertTrue(excerpt.startswith("가"))
+        self.assertTrue(excerpt.endswith("사"))
+
+    def test_spill_file_keeps_full_output_when_truncated(self):
+        capture = BoundedOutputCapture(head_bytes=8, tail_bytes=8, spill_to_file=True)
+        payload = b"x" * 100
+        capture.write(payload)
+        capture.close()
+
+        try:
+            self.assertIsNotNone(capture.spill_path)
+            with open(capture.spill_path, "rb") as f:
+                self.assertEqual(f.read(), payload)
+            self.assertIn(capture.spill_path, capture.render_excerpt())
+        finally:
+            os.remove(capture.spill_path)
+
+    def test_spill_file_is_removed_when_output_fits(self):
+        capture = BoundedOutputCapture(head_bytes=64, tail_bytes=64, spill_to_file=True)
+        spill_path = capture.spill_path
+        capture.write(b"short\n")
+        capture.close()
+
+        self.assertIsNone(capture.spill_path)
+        self.assertFalse(os.path.exists(spill_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from researchflow.alarm.compaction import CompactingWriter, OutputCompactor, compact_text
+
+
+class OutputCompactorTests(unittest.TestCase):
+    def test_keeps_final_carriage_return_state_across_chunks(self):
+        compactor = OutputCompactor()
+        output = b""
+        for percent in range(101):
+            output += compactor.feed(f"\r{percent}%".encode("utf-8"))
+        output += compactor.feed(b"\nnext\r\n")
+        output += compactor.flush()
+
+        self.assertEqual(output, b"100%\nnext\n")
+
+    def test_collapses_identical_consecutive_lines(self):
+        text = "start\n" + "warning: deprecated\n" * 1000 + "end\n"
+
+        self.assertEqual(
+            compact_text(text),
+            "start\nwarning: deprecated\n(repeated 999 more times)\nend\n",
+        )
+
+    def test_writer_flushes_pending_repeats_and_partial_line(self):
+        written = []
+        writer = CompactingWriter(written.append)
+        writer.write(b"same\nsame\nsa")
+        writer.write(b"me\ntail")
+        writer.flush()
+
+        self.assertEqual(b"".join(written), b"same\n(repeated 2 more times)\ntail")
+
+    def test_overlong_line_is_emitted_to_bound_memory(self):
+        compactor = OutputCompactor(max_line_bytes=8)
+        output = compactor.feed(b"x" * 20)
+
+        self.assertEqual(output, b"x" * 20 + b"\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
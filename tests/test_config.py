@@ -5,6 +5,7 @@ import unittest
 from pathlib import Path
 from unittest import mock
 
+from researchflow.core import config as config_module
 from researchflow.core.config import get_config_sources, load_config, write_default_config
 
 
@@ -43,6 +44,29 @@ class ConfigTests(unittest.TestCase):
         self.assertTrue(config.include_gpu)
         self.assertEqual(config.log_dir, "/tmp/logs")
 
+    def test_caches_until_file_or_env_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = Path(tmpdir) / "config.json"
+            config_path.write_text(json.dumps({"slack_channel": "C1"}), encoding="utf-8")
+
+            with mock.patch.dict(os.environ, {}, clear=True), \
+                    mock.patch("researchflow.core.config.ensure_dotenv_is_loaded"), \
+                    mock.patch("researchflow.core.utils.ensure_dotenv_is_loaded"), \
+                    mock.patch.object(config_module, "_read_config_file", wraps=config_module._read_config_file) as read_config_file:
+                first = load_config(config_path=str(config_path))
+                second = load_config(config_path=str(config_path))
+                self.assertEqual(read_config_file.call_count, 1)
+
+                config_path.write_text(json.dumps({"slack_channel": "C222"}), encoding="utf-8")
+                edited = load_config(config_path=str(config_path))
+                os.environ["RESEARCHFLOW_SLACK_CHANNEL"] = "CENV"
+                from_env = load_config(config_path=str(config_path))
+                self.assertEqual(read_config_file.call_count, 3)
+
+        self.assertIs(first, second)
+        self.assertEqual(edited.slack_channel, "C222")
+        self.assertEqual(from_env.slack_channel, "CENV")
+
     def test_write_default_config(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             config_path = Path(tmpdir) / "researchflow.json"
@@ -0,0 +1,119 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import researchflow
+from researchflow.core import utils
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.registry import RunRegistry
+from researchflow.core.utils import report_arguments, report_metrics
+
+_SIGTERM_SCRIPT = """
+import os, signal, sys
+import researchflow
+from researchflow.core.config import ResearchFlowConfig
+
+config = ResearchFlowConfig(slack_destination="off", include_gpu=False, history_db=sys.argv[1])
+with researchflow.alarm_context(name="scheduled-job", args={"seed": 7}, config=config):
+    os.kill(os.getpid(), signal.SIGTERM)
+    signal.pause()
+"""
+
+_NOHUP_SCRIPT = """
+import os, signal, sys
+import researchflow
+from researchflow.core.config import ResearchFlowConfig
+
+signal.signal(signal.SIGHUP, signal.SIG_IGN)
+config = ResearchFlowConfig(slack_destination="off", include_gpu=False, history_db=sys.argv[1])
+with researchflow.alarm_context(name="nohup-job", config=config):
+    os.kill(os.getpid(), signal.SIGHUP)
+"""
+
+
+class AlarmContextTests(unittest.TestCase):
+    def setUp(self):
+        self.config = ResearchFlowConfig(slack_destination="channel", include_gpu=False)
+        patcher = mock.patch("researchflow.alarm.context.AlarmSlackSender.send_alarm_notification", return_value=True)
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reports_exception_with_traceback_and_reraises(self):
+        with self.assertRaises(ValueError):
+            with researchflow.alarm_context(name="eval", config=self.config):
+                report_arguments({"lr": 0.1})
+                report_metrics({"acc": 0.5})
+                raise ValueError("bad checkpoint")
+
+        sent = self.send.call_args.kwargs
+        self.assertEqual(sent["script_name"], "eval")
+        self.assertEqual(sent["status"], "Failure")
+        self.assertEqual(sent["exit_code"], 1)
+        self.assertEqual(sent["parsed_args_dict"], {"lr": 0.1})
+        self.assertEqual(sent["metrics_dict"], {"acc": 0.5})
+        self.assertIn("ValueError: bad checkpoint", sent["error_output_str"])
+        self.assertEqual(utils._report_listeners, [])
+
+    def test_decorator_reports_success_and_returns_value(self):
+        @researchflow.notify_on_exit(config=self.config, args={"split": "val"})
+        def main():
+            return 42
+
+        self.assertEqual(main(), 42)
+        sent = self.send.call_args.kwargs
+        self.assertEqual(sent["status"], "Success")
+        self.assertEqual(sent["exit_code"], 0)
+        self.assertEqual(sent["parsed_args_dict"], {"split": "val"})
+        self.assertIsNone(sent["error_output_str"])
+
+    def test_sys_exit_code_is_the_exit_code(self):
+        with self.assertRaises(SystemExit):
+            with researchflow.alarm_context(config=self.config):
+                sys.exit(3)
+
+        self.assertEqual(self.send.call_args.kwargs["exit_code"], 3)
+        self.assertEqual(self.send.call_args.kwargs["status"], "Failure")
+
+    @unittest.skipUnless(os.name == "posix", "sends SIGTERM")
+    def test_sigterm_records_the_run_before_the_process_dies(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_db = os.path.join(tmpdir, "runs.db")
+            completed = subprocess.run(
+                [sys.executable, "-c", _SIGTERM_SCRIPT, history_db],
+                cwd=Path(__file__).resolve().parents[1],
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=30,
+            )
+            runs = RunRegistry(history_db).query_runs()
+
+        self.assertEqual(completed.returncode, -signal.SIGTERM, completed.stderr)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0].exit_code, -signal.SIGTERM)
+        self.assertEqual(runs[0].parsed_args, {"seed": 7})
+
+
+    @unittest.skipUnless(hasattr(signal, "SIGHUP"), "sends SIGHUP")
+    def test_ignored_sighup_under_nohup_is_not_reported(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_db = os.path.join(tmpdir, "runs.db")
+            completed = subprocess.run(
+                [sys.executable, "-c", _NOHUP_SCRIPT, history_db],
+                cwd=Path(__file__).resolve().parents[1],
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=30,
+            )
+            runs = RunRegistry(history_db).query_runs()
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual([(run.status, run.exit_code) for run in runs], [("Success", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
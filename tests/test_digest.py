@@ -0,0 +1,199 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.digest import NotificationDigest, get_digest_spool_dir
+from researchflow.core.process_utils import try_lock_file
+from researchflow.core.slack_sender import AlarmSlackSender
+
+_SUBMIT_SCRIPT = """
+import sys
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.digest import NotificationDigest
+from researchflow.core.slack_sender import AlarmSlackSender
+
+spool_dir, webhook_url, name = sys.argv[1], sys.argv[2], sys.argv[3]
+config = ResearchFlowConfig(slack_destination="webhook", slack_webhook_url=webhook_url)
+entry = {
+    "script_name": name, "status": "Success", "duration_str": "1s", "exit_code": 0, "hostname": "host",
+    "end_time_str": "end", "error_output_str": None, "log_file_path_str": None, "payload": {"text": name},
+}
+NotificationDigest(0.5, AlarmSlackSender(config=config).send_digest, spool_dir=spool_dir, leader_config=config).submit(entry)
+"""
+
+
+class _WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.posts = []
+        super().__init__(("127.0.0.1", 0), _WebhookHandler)
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.posts.append(json.loads(body))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _count_runs(post):
+    match = re.search(r"(\d+) runs finished", post["text"])
+    return int(match.group(1)) if match else 1
+
+
+def _entry(name, status="Success"):
+    return {
+        "script_name": name,
+        "status": status,
+        "duration_str": "1s",
+        "exit_code": 0 if status == "Success" else 1,
+        "hostname": "host",
+        "end_time_str": "end",
+        "error_output_str": "Traceback: boom" if status != "Success" else None,
+        "log_file_path_str": None,
+        "payload": {"text": name},
+    }
+
+
+class NotificationDigestTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = os.path.join(self.temp_dir.name, "spool")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_leader_sends_all_spooled_entries_at_once(self):
+        batches = []
+        digest = NotificationDigest(0, batches.append, spool_dir=self.spool_dir)
+        for name in ("a.py", "b.py", "c.py"):
+            digest._spool(_entry(name))
+
+        self.assertEqual(digest.flush_as_leader(), 3)
+        self.assertEqual([[entry["script_name"] for entry in batch] for batch in batches], [["a.py", "b.py", "c.py"]])
+        self.assertEqual([name for name in os.listdir(self.spool_dir) if name.endswith(".json")], [])
+
+    def test_failed_send_keeps_entries_for_the_next_leader(self):
+        batches = []
+
+        def failing_send(entries):
+            batches.append(entries)
+            return False
+
+        digest = NotificationDigest(0, failing_send, spool_dir=self.spool_dir)
+        digest._spool(_entry("a.py"))
+        digest._spool(_entry("b.py"))
+
+        self.assertEqual(digest.flush_as_leader(), 0)
+        self.assertEqual(len([name for name in os.listdir(self.spool_dir) if name.endswith(".json")]), 2)
+
+        digest.send_entries = batches.append
+        self.assertEqual(digest.flush_as_leader(), 2)
+        self.assertEqual([[entry["script_name"] for entry in batch] for batch in batches], [["a.py", "b.py"]] * 2)
+        self.assertEqual([name for name in os.listdir(self.spool_dir) if name.endswith((".json", ".sending"))], [])
+
+    def test_entries_wait_while_another_process_is_leader(self):
+        batches = []
+        digest = NotificationDigest(0, batches.append, spool_dir=self.spool_dir)
+        digest._spool(_entry("a.py"))
+        lock_fd = try_lock_file(os.path.join(self.spool_dir, "leader.lock"))
+        try:
+            self.assertEqual(digest.flush_as_leader(), 0)
+        finally:
+            os.close(lock_fd)
+
+        self.assertEqual(batches, [])
+        self.assertEqual(digest.flush_as_leader(), 1)
+
+    def test_concurrent_processes_share_one_digest(self):
+        server = _WebhookServer()
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        webhook_url = f"http://127.0.0.1:{server.server_address[1]}/hooks"
+
+        processes = [
+            subprocess.Popen([sys.executable, "-c", _SUBMIT_SCRIPT, self.spool_dir, webhook_url, f"run{index}.py"])
+            for index in range(5)
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(timeout=30), 0)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and sum(_count_runs(post) for post in server.posts) < 5:
+            time.sleep(0.05)
+
+        self.assertEqual(sum(_count_runs(post) for post in server.posts), 5, server.posts)
+        self.assertLess(len(server.posts), 5)
+        self.assertEqual([name for name in os.listdir(self.spool_dir) if name.endswith((".json", ".sending"))], [])
+
+
+class DigestPayloadTests(unittest.TestCase):
+    def test_spool_is_separate_per_destination(self):
+        def spool_dir(**config_values):
+            return AlarmSlackSender(config=ResearchFlowConfig(**config_values))._get_digest_spool_dir()
+
+        channel_a = spool_dir(slack_destination="channel", slack_bot_token="xoxb-1", slack_channel="C1")
+        self.assertEqual(channel_a, spool_dir(slack_destination="channel", slack_bot_token="xoxb-1", slack_channel="C1"))
+        self.assertNotEqual(channel_a, spool_dir(slack_destination="channel", slack_bot_token="xoxb-1", slack_channel="C2"))
+        self.assertNotEqual(channel_a, spool_dir(slack_destination="channel", slack_bot_token="xoxb-2", slack_channel="C1"))
+        self.assertNotEqual(
+            spool_dir(slack_destination="webhook", slack_webhook_url="https://hooks.slack.test/A"),
+            spool_dir(slack_destination="webhook", slack_webhook_url="https://hooks.slack.test/B"),
+        )
+        self.assertNotEqual(
+            spool_dir(slack_destination="dm", slack_bot_token="xoxb-1", slack_user_id="U1"),
+            spool_dir(slack_destination="dm", slack_bot_token="xoxb-1", slack_user_id="U2"),
+        )
+        self.assertNotIn("xoxb-1", channel_a)
+        self.assertNotEqual(get_digest_spool_dir("a"), get_digest_spool_dir("b"))
+
+    def test_sends_directly_when_the_spool_is_unwritable(self):
+        sender = AlarmSlackSender(config=ResearchFlowConfig(slack_destination="webhook", slack_webhook_url="https://hooks.slack.test/A"))
+        with mock.patch.object(NotificationDigest, "submit", side_effect=PermissionError(13, "Permission denied")), \
+                mock.patch.object(sender.notifier, "send_payload", return_value=True) as send_payload, \
+                mock.patch("sys.stderr"):
+            sent = sender.send_alarm_notification(
+                script_name="a.py",
+                status="Success",
+                duration_str="1s",
+                exit_code=0,
+                hostname="host",
+                start_time_str="start",
+                end_time_str="end",
+                script_path_str="a.py",
+                executed_command_str="python a.py",
+                digest_seconds=60,
+            )
+
+        self.assertTrue(sent)
+        self.assertIn("a.py", str(send_payload.call_args.args[0]))
+
+    def test_counts_runs_and_expands_failures(self):
+        sender = AlarmSlackSender(config=ResearchFlowConfig(slack_destination="off"))
+        payload = sender._build_digest_payload([_entry("a.py"), _entry("b.py", "Failure"), _entry("c.py")])
+
+        self.assertIn("3 runs finished: 2 succeeded, 1 failed", payload["text"])
+        payload_text = str(payload)
+        self.assertIn("b.py", payload_text)
+        self.assertIn("Traceback: boom", payload_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchflow.core.dm_cache import DmChannelCache
+
+_SET_SCRIPT = """
+import sys
+from researchflow.core.dm_cache import DmChannelCache
+
+DmChannelCache(sys.argv[1]).set(sys.argv[2], sys.argv[3])
+"""
+
+
+class DmChannelCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "dm_channels.json")
+
+    def _set_in_other_process(self, key, channel_id):
+        subprocess.run(
+            [sys.executable, "-c", _SET_SCRIPT, self.path, key, channel_id],
+            cwd=Path(__file__).resolve().parents[1],
+            check=True,
+            timeout=30,
+        )
+
+    def _saved_entries(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_concurrent_processes_keep_each_others_entries(self):
+        cache = DmChannelCache(self.path)
+        self.assertIsNone(cache.get("T:bot:U1"))
+        self._set_in_other_process("T:bot:U2", "D2")
+
+        cache.set("T:bot:U1", "D1")
+        self.assertEqual(self._saved_entries(), {"T:bot:U1": "D1", "T:bot:U2": "D2"})
+
+        self._set_in_other_process("T:bot:U3", "D3")
+        DmChannelCache(self.path).forget("T:bot:U1")
+        self.assertEqual(self._saved_entries(), {"T:bot:U2": "D2", "T:bot:U3": "D3"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from researchflow.core.gpu_lease import GpuLeaseError, acquire_gpu_lease
+from support import isolated_alarm_env
+
+_FAKE_NVIDIA_SMI = """#!{python}
+import os
+import sys
+
+if any(arg.startswith("--query-gpu") for arg in sys.argv):
+    with open(os.environ["FAKE_NVIDIA_SMI_GPUS"], "r") as f:
+        sys.stdout.write(f.read())
+"""
+
+_GPU_ROWS = (
+    "0, Fake GPU, GPU-aaa, 40960, 10000, 30960, 50, 40\n"
+    "1, Fake GPU, GPU-bbb, 40960, 1000, 39960, 0, 40\n"
+    "2, Fake GPU, GPU-ccc, 40960, 39960, 1000, 0, 40\n"
+)
+
+
+@unittest.skipUnless(os.name == "posix", "the fake nvidia-smi is a POSIX script")
+class GpuLeaseTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        bin_dir = os.path.join(self.temp_dir.name, "bin")
+        os.makedirs(bin_dir)
+        fake_path = os.path.join(bin_dir, "nvidia-smi")
+        with open(fake_path, "w", encoding="utf-8") as f:
+            f.write(_FAKE_NVIDIA_SMI.format(python=sys.executable))
+        os.chmod(fake_path, 0o755)
+
+        gpus_path = os.path.join(self.temp_dir.name, "gpus.csv")
+        with open(gpus_path, "w", encoding="utf-8") as f:
+            f.write(_GPU_ROWS)
+
+        self.lease_dir = os.path.join(self.temp_dir.name, "leases")
+        self.env = {
+            "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            "FAKE_NVIDIA_SMI_GPUS": gpus_path,
+            "RESEARCHFLOW_GPU_LEASE_DIR": self.lease_dir,
+        }
+        patcher = mock.patch.dict(os.environ, self.env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_leases_least_loaded_gpu_with_enough_memory(self):
+        with acquire_gpu_lease(1, min_free_mib=20000) as lease:
+            self.assertEqual(lease.cuda_visible_devices, "1")
+            env = lease.apply_to_env({})
+            self.assertEqual(env["CUDA_VISIBLE_DEVICES"], "1")
+            self.assertEqual(env["CUDA_DEVICE_ORDER"], "PCI_BUS_ID")
+
+    def test_concurrent_leases_never_share_a_gpu(self):
+        first = acquire_gpu_lease(1, min_free_mib=20000)
+        second = acquire_gpu_lease(1, min_free_mib=20000)
+        try:
+            self.assertEqual({first.cuda_visible_devices, second.cuda_visible_devices}, {"0", "1"})
+            with self.assertRaises(GpuLeaseError):
+                acquire_gpu_lease(1, min_free_mib=20000, timeout_seconds=0.05, min_poll_interval=0.01)
+        finally:
+            first.release()
+            second.release()
+
+        with acquire_gpu_lease(2, min_free_mib=20000) as lease:
+            self.assertEqual(lease.cuda_visible_devices, "1,0")
+
+    def test_alarm_exports_leased_gpus_to_script(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        script_path = os.path.join(self.temp_dir.name, "show_gpus.py")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write("import os\nprint('visible=' + os.environ['CUDA_VISIBLE_DEVICES'])\n")
+
+        completed = subprocess.run(
+            [
+                sys.executable, "-m", "researchflow.alarm.cli",
+                "--destination", "off", "--no-gpu-info",
+                "--gpus", "1", "--min-free-mib", "20000",
+                script_path,
+            ],
+            cwd=repo_root,
+            env=isolated_alarm_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn("visible=1", completed.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from researchflow.alarm.handler import _send_idle_gpu_alert
+from researchflow.core import gpu_timeline
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.gpu_timeline import GpuReading, GpuTimelineSampler, IdleGpuWatch, format_gpu_usage, format_sparkline
+
+_GPU_QUERY = (
+    "nvidia-smi",
+    "--query-gpu=index,name,uuid,utilization.gpu,memory.used,memory.total",
+    "--format=csv,noheader,nounits",
+)
+_APPS_QUERY = (
+    "nvidia-smi",
+    "--query-compute-apps=gpu_uuid,pid,used_memory",
+    "--format=csv,noheader,nounits",
+)
+
+
+def _sample_sequence(sampler, readings):
+    for now, (gpu_rows, app_rows) in readings:
+        outputs = {_GPU_QUERY: gpu_rows, _APPS_QUERY: app_rows}
+        with mock.patch.object(gpu_timeline, "_run_command", side_effect=lambda command: outputs[tuple(command)]):
+            sampler.sample(now=now)
+
+
+class GpuTimelineSamplerTests(unittest.TestCase):
+    def test_tracks_only_gpus_used_by_the_job(self):
+        sampler = GpuTimelineSampler(lambda: {100, 101}, assigned_gpu_uuids=["GPU-ccc"], interval=1.0)
+        gpus = "0, A100, GPU-aaa, {util}, 30000, 81920\n1, A100, GPU-bbb, 90, 70000, 81920\n2, A100, GPU-ccc, 0, 500, 81920\n"
+
+        with mock.patch.object(gpu_timeline, "_import_pynvml", return_value=None):
+            _sample_sequence(sampler, [
+                (0.0, (gpus.format(util=20), "GPU-aaa, 100, 1000\nGPU-bbb, 200, 60000\n")),
+                (1.0, (gpus.format(util=80), "GPU-aaa, 100, 2000\nGPU-aaa, 101, 1000\nGPU-bbb, 200, 60000\n")),
+                (3.0, (gpus.format(util=50), "GPU-aaa, 100, 2500\nGPU-bbb, 200, 60000\n")),
+            ])
+        usage = sampler.stop()
+
+        self.assertEqual([gpu.uuid for gpu in usage], ["GPU-aaa", "GPU-ccc"])
+        self.assertEqual(usage[0].peak_job_memory_mib, 3000)
+        self.assertEqual(usage[0].peak_utilization_percent, 80)
+        # Weighted by time since the previous sample: (20 * 1 + 80 * 1 + 50 * 2) / 4.
+        self.assertEqual(usage[0].mean_utilization_percent, 50)
+        self.assertEqual(usage[0].utilization_timeline, [20, 80, 50])
+        self.assertIsNone(usage[1].peak_job_memory_mib)
+        self.assertEqual(usage[1].peak_device_memory_mib, 500)
+
+        text = format_gpu_usage(usage)
+        self.assertIn("GPU 0 (A100, 80 GiB): peak 2.9 GiB, mean util 50%, peak 80%", text)
+        self.assertIn("GPU 2 (A100, 80 GiB): peak 0.5 GiB (whole GPU)", text)
+
+    def test_timeline_stays_bounded(self):
+        sampler = GpuTimelineSampler(lambda: {100}, interval=1.0)
+        rows = ("0, A100, GPU-aaa, 40, 1000, 81920\n", "GPU-aaa, 100, 1000\n")
+
+        with mock.patch.object(gpu_timeline, "_import_pynvml", return_value=None):
+            _sample_sequence(sampler, [(float(now), rows) for now in range(1000)])
+        usage = sampler.stop()[0]
+
+        self.assertLessEqual(len(usage.utilization_timeline), 120)
+        self.assertEqual(set(usage.utilization_timeline), {40})
+        self.assertEqual(usage.sampled_seconds, 1000)
+
+
+def _reading(utilization):
+    return GpuReading("0", "A100", "GPU-aaa", utilization, 70000, 81920)
+
+
+class IdleGpuWatchTests(unittest.TestCase):
+    def test_alerts_after_idle_window_and_rate_limits(self):
+        alerts = []
+        watch = IdleGpuWatch(5, 60, lambda idle_seconds, readings: alerts.append(idle_seconds), repeat_seconds=600)
+
+        for now, utilization in [(0, 90), (10, 1), (40, 2), (69, 0), (70, 0), (100, 0), (669, 0), (670, 0)]:
+            watch.observe(now, [_reading(utilization)])
+
+        self.assertEqual(alerts, [60, 660])
+
+    def test_each_idle_episode_gets_its_own_alert(self):
+        alerts = []
+        watch = IdleGpuWatch(5, 60, lambda idle_seconds, readings: alerts.append(idle_seconds), repeat_seconds=600)
+
+        for now, utilization in [(0, 0), (60, 0), (100, 90), (200, 0), (260, 0)]:
+            watch.observe(now, [_reading(utilization)])
+
+        self.assertEqual(alerts, [60, 60])
+
+    def test_activity_or_no_gpu_resets_the_window(self):
+        alerts = []
+        watch = IdleGpuWatch(5, 60, lambda idle_seconds, readings: alerts.append(idle_seconds))
+
+        for now, readings in [(0, [_reading(0)]), (50, [_reading(40)]), (60, [_reading(0)]), (100, []), (110, [_reading(0)])]:
+            watch.observe(now, readings)
+        watch.observe(169, [_reading(0), GpuReading("1", "A100", "GPU-bbb", 30, 1000, 81920)])
+
+        self.assertEqual(alerts, [])
+
+    def test_sampler_feeds_job_gpus_to_watch(self):
+        alerts = []
+        watch = IdleGpuWatch(5, 30, lambda idle_seconds, readings: alerts.append([reading.uuid for reading in readings]))
+        sampler = GpuTimelineSampler(lambda: {100}, interval=10.0, on_sample=watch.observe)
+        rows = ("0, A100, GPU-aaa, 0, 70000, 81920\n1, A100, GPU-bbb, 0, 100, 81920\n", "GPU-aaa, 100, 69000\n")
+
+        with mock.patch.object(gpu_timeline, "_import_pynvml", return_value=None):
+            _sample_sequence(sampler, [(0.0, rows), (10.0, rows), (30.0, rows)])
+
+        self.assertEqual(alerts, [["GPU-aaa"]])
+
+
+class IdleGpuAlertTests(unittest.TestCase):
+    def test_log_tail_includes_output_still_in_the_log_buffer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, "run.log")
+            with open(log_path, "wb", buffering=1024 * 1024) as log_file, \
+                    mock.patch("researchflow.alarm.handler.AlarmSlackSender.send_idle_gpu_alert") as send, \
+                    mock.patch("sys.stderr"):
+                log_file.write(b"waiting for the next shard\n")
+                _send_idle_gpu_alert(
+                    ResearchFlowConfig(slack_destination="channel", include_gpu=False),
+                    "train.py",
+                    1234,
+                    datetime.now(),
+                    log_path,
+                    5,
+                    600,
+                    [_reading(0)],
+                    log_file,
+                )
+
+        self.assertIn("waiting for the next shard", send.call_args.kwargs["log_tail_str"])
+
+
+class SparklineTests(unittest.TestCase):
+    def test_scales_and_buckets_values(self):
+        self.assertEqual(format_sparkline([0, 50, 100]), "▁▅█")
+        self.assertEqual(len(format_sparkline(list(range(100)), width=10)), 10)
+        self.assertEqual(format_sparkline([]), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
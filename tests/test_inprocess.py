@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from researchflow.alarm.handler import execute_script_with_alarm
+from researchflow.alarm.inprocess import InProcessScript
+from researchflow.core.config import ResearchFlowConfig
+
+_FAILING_SCRIPT = """
+import os
+import sys
+from researchflow.core.utils import report_arguments, report_metrics
+
+print("argv", sys.argv[1:], flush=True)
+report_arguments({"lr": 0.1})
+os.system("echo from-a-subprocess")
+report_metrics({"acc": 0.9})
+
+def evaluate():
+    raise ValueError("bad checkpoint")
+
+evaluate()
+"""
+
+
+class InProcessRunTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.config = ResearchFlowConfig(slack_destination="off", include_gpu=False, log_dir=self.temp_dir.name)
+
+    def _run(self, source, script_args=()):
+        script_path = os.path.join(self.temp_dir.name, "evaluate.py")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        results = []
+        return_code = execute_script_with_alarm(
+            script_path,
+            list(script_args),
+            [script_path] + list(script_args),
+            enable_logging=True,
+            detach_logging=False,
+            notification_config=self.config,
+            on_run_finished=results.append,
+            inprocess=True,
+        )
+        with open(results[0].log_file_path, "r", encoding="utf-8") as f:
+            return return_code, results[0], f.read()
+
+    def test_reports_output_markers_and_traceback_like_a_subprocess(self):
+        saved_argv = sys.argv[:]
+
+        return_code, result, log_text = self._run(_FAILING_SCRIPT, ["--split", "val"])
+
+        self.assertEqual(return_code, 1)
+        self.assertEqual(result.status, "Failure")
+        self.assertEqual(result.parsed_args, {"lr": 0.1})
+        self.assertEqual(result.metrics, {"acc": 0.9})
+        self.assertIn("argv ['--split', 'val']", log_text)
+        self.assertIn("from-a-subprocess", log_text)
+        self.assertIn('evaluate.py", line 14, in <module>', log_text)
+        self.assertIn("ValueError: bad checkpoint", log_text)
+        self.assertNotIn("runpy", log_text)
+        self.assertEqual(sys.argv, saved_argv)
+
+    def test_system_exit_code_is_the_exit_code(self):
+        return_code, result, _ = self._run("import sys\nsys.exit(3)\n")
+
+        self.assertEqual(return_code, 3)
+        self.assertEqual(result.exit_code, 3)
+
+
+    def test_environment_is_restored_after_the_run(self):
+        script_path = os.path.join(self.temp_dir.name, "show_env.py")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(
+                "import os, sys\n"
+                "os.environ['RESEARCHFLOW_TEST_SET_BY_SCRIPT'] = '1'\n"
+                "sys.exit(0 if os.environ.get('RESEARCHFLOW_TEST_LEASED') == '0' else 5)\n"
+            )
+        env = dict(os.environ, RESEARCHFLOW_TEST_LEASED="0")
+
+        return_code = InProcessScript(script_path, [], env=env)._run_script()
+
+        self.assertEqual(return_code, 0)
+        self.assertNotIn("RESEARCHFLOW_TEST_LEASED", os.environ)
+        self.assertNotIn("RESEARCHFLOW_TEST_SET_BY_SCRIPT", os.environ)
+
+
+if __name__ == "__main__":
+    unittest.main()
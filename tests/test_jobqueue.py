@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchflow.alarm.jobqueue import QueuedJob, load_job_queue, run_job_queue
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.slack_sender import AlarmSlackSender
+
+
+class LoadJobQueueTests(unittest.TestCase):
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reads_command_lines_and_skips_comments(self):
+        path = self._write("jobs.txt", "# sweep\ntrain.py --lr 0.1\n\npython train.py --name 'run two'\n")
+
+        self.assertEqual(
+            load_job_queue(path),
+            [
+                QueuedJob("train.py", ("--lr", "0.1")),
+                QueuedJob("train.py", ("--name", "run two")),
+            ],
+        )
+
+    def test_reads_json_entries(self):
+        path = self._write("jobs.json", '["train.py --lr 0.1", {"script": "eval.py", "args": ["--split", "test"]}]')
+
+        self.assertEqual(
+            load_job_queue(path),
+            [QueuedJob("train.py", ("--lr", "0.1")), QueuedJob("eval.py", ("--split", "test"))],
+        )
+
+
+class RunJobQueueTests(unittest.TestCase):
+    def test_runs_jobs_in_parallel_with_one_log_each(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script_path = os.path.join(tmpdir, "job.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write("import sys\nprint('job', sys.argv[1])\nsys.exit(int(sys.argv[2]))\n")
+            jobs = [QueuedJob(script_path, (str(index), "1" if index == 2 else "0")) for index in range(4)]
+            config = ResearchFlowConfig(slack_destination="off", include_gpu=False, log_dir=os.path.join(tmpdir, "logs"))
+
+            return_code = run_job_queue(jobs, max_parallel=2, notification_config=config)
+
+            log_texts = sorted(path.read_text(encoding="utf-8") for path in Path(tmpdir, "logs").glob("*_job.log"))
+            self.assertEqual(return_code, 1)
+            self.assertEqual(log_texts, [f"job {index}\n" for index in range(4)])
+
+
+class QueueSummaryPayloadTests(unittest.TestCase):
+    def test_summary_lists_every_job(self):
+        sender = AlarmSlackSender(config=ResearchFlowConfig(slack_destination="off"))
+        payload = sender._build_queue_summary_payload(
+            queue_name="jobs.txt",
+            job_results=[
+                {"command": "train.py --lr 0.1", "exit_code": 0, "duration_str": "1m"},
+                {"command": "train.py --lr 1.0", "exit_code": 1, "duration_str": "5s"},
+            ],
+            duration_str="1m 5s",
+            hostname="host",
+            start_time_str="start",
+            end_time_str="end",
+        )
+
+        self.assertIn("1/2 jobs succeeded", payload["text"])
+        payload_text = str(payload)
+        self.assertIn("train.py --lr 0.1", payload_text)
+        self.assertIn("train.py --lr 1.0", payload_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
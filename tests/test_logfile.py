@@ -0,0 +1,60 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from researchflow.alarm.logfile import RotatingLogWriter
+from researchflow.core.logtail import read_last_lines_from_segments
+
+
+class RotatingLogWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.temp_dir.name, "run.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_lines(self, writer, count):
+        for index in range(count):
+            writer.write(f"line {index}\n".encode("utf-8"))
+
+    def test_rotates_on_line_boundaries_and_compresses_segments(self):
+        writer = RotatingLogWriter(self.log_path, max_bytes=100, keep=10, compression="gzip")
+        self._write_lines(writer, 50)
+        writer.close()
+
+        self.assertTrue(writer.segment_paths)
+        self.assertTrue(all(path.endswith(".gz") for path in writer.segment_paths))
+        contents = b""
+        for path in writer.segment_paths:
+            self.assertTrue(os.path.exists(path))
+            self.assertFalse(os.path.exists(path[:-len(".gz")]))
+            with gzip.open(path, "rb") as f:
+                segment = f.read()
+            self.assertTrue(segment.endswith(b"\n"))
+            contents += segment
+        with open(self.log_path, "rb") as f:
+            contents += f.read()
+        self.assertEqual(contents, b"".join(f"line {i}\n".encode("utf-8") for i in range(50)))
+
+    def test_prunes_old_segments(self):
+        writer = RotatingLogWriter(self.log_path, max_bytes=50, keep=2, compression="none")
+        self._write_lines(writer, 100)
+        writer.close()
+
+        self.assertEqual(len(writer.segment_paths), 2)
+        rotated = sorted(name for name in os.listdir(self.temp_dir.name) if name != "run.log")
+        self.assertEqual(sorted(os.path.basename(path) for path in writer.segment_paths), rotated)
+
+    def test_tail_spans_segments(self):
+        writer = RotatingLogWriter(self.log_path, max_bytes=40, keep=5, compression="gzip")
+        self._write_lines(writer, 30)
+        writer.close()
+
+        tail = read_last_lines_from_segments(writer.all_paths, n_lines=8)
+        self.assertEqual(tail, "".join(f"line {i}\n" for i in range(22, 30)))
+
+
+if __name__ == "__main__":
+    unittest.main()
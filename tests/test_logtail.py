@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchflow.core.logtail import read_last_lines
+
+
+class ReadLastLinesTests(unittest.TestCase):
+    def _write(self, tmpdir, data: bytes) -> str:
+        path = Path(tmpdir) / "run.log"
+        path.write_bytes(data)
+        return str(path)
+
+    def test_matches_readlines_for_seek_and_mmap(self):
+        data = "".join(f"line {index}\n" for index in range(5000)).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self._write(tmpdir, data)
+            expected = "".join(data.decode("utf-8").splitlines(keepends=True)[-50:])
+            for use_mmap in (False, True):
+                with self.subTest(use_mmap=use_mmap):
+                    self.assertEqual(read_last_lines(path, 50, block_size=128, use_mmap=use_mmap), expected)
+
+    def test_short_file_without_trailing_newline(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self._write(tmpdir, b"first\nsecond")
+            self.assertEqual(read_last_lines(path, 50), "first\nsecond")
+            self.assertEqual(read_last_lines(path, 1, use_mmap=True), "second")
+
+    def test_collapses_carriage_return_progress_updates(self):
+        progress = "".join(f"\r{percent}%" for percent in range(101))
+        data = f"start\n{progress}\r\ndone\r\n".encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self._write(tmpdir, data)
+            self.assertEqual(read_last_lines(path, 2), "100%\ndone\n")
+
+    def test_does_not_split_multibyte_characters_at_block_boundary(self):
+        data = ("가나다라마바사아자차카타파하\n" * 200).encode("utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self._write(tmpdir, data)
+            tail = read_last_lines(path, 3, block_size=7, max_bytes=100)
+
+        self.assertNotIn("�", tail)
+        self.assertTrue(tail.endswith("가나다라마바사아자차카타파하\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchflow.alarm.constants import METRICS_MARKER, PARSED_ARGS_END_MARKER, PARSED_ARGS_START_MARKER
+from researchflow.alarm.markers import LogFileMarkerWatcher, ParsedArgsMarkerParser, find_last_metrics
+
+
+def _marker_block(args):
+    return f"\n{PARSED_ARGS_START_MARKER}\n{json.dumps(args, indent=2)}\n{PARSED_ARGS_END_MARKER}\n\n".encode("utf-8")
+
+
+class ParsedArgsMarkerParserTests(unittest.TestCase):
+    def test_finds_block_split_across_single_byte_chunks(self):
+        data = b"epoch 1\n" + _marker_block({"lr": 0.001, "seed": 3}) + b"epoch 2\n"
+        parser = ParsedArgsMarkerParser()
+        for index in range(len(data)):
+            parser.feed(data[index:index + 1])
+
+        self.assertTrue(parser.done)
+        self.assertEqual(json.loads(parser.json_text), {"lr": 0.001, "seed": 3})
+
+    def test_keeps_first_block_and_ignores_later_output(self):
+        parser = ParsedArgsMarkerParser()
+        parser.feed(_marker_block({"run": 1}))
+        parser.feed(_marker_block({"run": 2}))
+
+        self.assertEqual(json.loads(parser.json_text), {"run": 1})
+
+    def test_unterminated_block_is_bounded(self):
+        parser = ParsedArgsMarkerParser(max_block_bytes=16)
+        parser.feed(PARSED_ARGS_START_MARKER.encode("utf-8") + b"x" * 64)
+
+        self.assertTrue(parser.overflowed)
+        self.assertIsNone(parser.json_text)
+
+
+class LogFileMarkerWatcherTests(unittest.TestCase):
+    def test_follows_growing_log_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "run.log"
+            log_path.write_bytes(b"starting\n")
+            parser = ParsedArgsMarkerParser()
+            watcher = LogFileMarkerWatcher(str(log_path), parser, poll_interval=0.01)
+            watcher.start()
+            with log_path.open("ab") as f:
+                f.write(_marker_block({"batch_size": 64}))
+            watcher.stop()
+
+        self.assertEqual(json.loads(parser.json_text), {"batch_size": 64})
+
+
+class FindLastMetricsTests(unittest.TestCase):
+    def test_uses_last_valid_metrics_line(self):
+        text = (
+            f"{METRICS_MARKER}{{\"loss\": 1.0}}\n"
+            "epoch 2\n"
+            f"{METRICS_MARKER}{{\"loss\": 0.5}}\n"
+            f"{METRICS_MARKER}{{broken\n"
+        )
+
+        self.assertEqual(find_last_metrics(text), {"loss": 0.5})
+        self.assertIsNone(find_last_metrics("no metrics here\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
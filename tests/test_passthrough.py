@@ -0,0 +1,107 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from researchflow.alarm.capture import BoundedOutputCapture
+from researchflow.alarm.handler import execute_script_with_alarm
+from researchflow.alarm.markers import ParsedArgsMarkerParser
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.alarm.passthrough import SplicePassthrough, is_raw_passthrough_supported
+
+_CHILD_SCRIPT = """
+from researchflow.core.utils import report_arguments
+import sys
+report_arguments({"seed": 7})
+for index in range(50000):
+    sys.stdout.write(f"out {index}\\n")
+"""
+
+
+@unittest.skipUnless(is_raw_passthrough_supported(), "splice/sendfile passthrough is Linux-only")
+class SplicePassthroughTests(unittest.TestCase):
+    def _spawn(self):
+        return subprocess.Popen(
+            [sys.executable, "-c", _CHILD_SCRIPT],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+
+    def test_forwards_bytes_and_samples_head_tail_across_spool_recycling(self):
+        process = self._spawn()
+        capture = BoundedOutputCapture(head_bytes=256, tail_bytes=256)
+        parser = ParsedArgsMarkerParser()
+
+        with tempfile.TemporaryFile() as sink:
+            passthrough = SplicePassthrough(process, spool_bytes=4096)
+            passthrough.add_raw_stream(process.stdout, sink, capture=capture, marker_parser=parser)
+            passthrough.run()
+            process.wait()
+            sink.seek(0)
+            forwarded = sink.read().decode("utf-8")
+        process.stdout.close()
+        process.stderr.close()
+
+        self.assertIn("out 0\n", forwarded)
+        self.assertTrue(forwarded.endswith("out 49999\n"))
+        self.assertEqual(capture.total_bytes, len(forwarded.encode("utf-8")))
+        self.assertTrue(capture.render_excerpt().endswith("out 49999\n"))
+        self.assertEqual(parser.json_text.replace(" ", "").replace("\n", ""), '{"seed":7}')
+
+    def test_writes_to_terminal_and_log_file(self):
+        process = self._spawn()
+
+        with tempfile.TemporaryFile() as sink, tempfile.TemporaryFile() as log_file:
+            passthrough = SplicePassthrough(process)
+            passthrough.add_raw_stream(process.stdout, sink, log_fd=log_file.fileno())
+            passthrough.run()
+            process.wait()
+            sink.seek(0)
+            log_file.seek(0)
+            forwarded = sink.read()
+            logged = log_file.read()
+        process.stdout.close()
+        process.stderr.close()
+
+        self.assertEqual(forwarded, logged)
+        self.assertTrue(logged.endswith(b"out 49999\n"))
+
+    def test_capture_spill_keeps_every_byte_in_raw_mode(self):
+        num_lines = 80000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script_path = os.path.join(tmpdir, "noisy.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(
+                    "import sys\n"
+                    f"for index in range({num_lines}):\n"
+                    "    sys.stderr.write(f'err {index:010d} ' + 'x' * 32 + '\\n')\n"
+                    "sys.exit(1)\n"
+                )
+            expected_size = num_lines * len(f"err {0:010d} " + "x" * 32 + "\n")
+            config = ResearchFlowConfig(slack_destination="channel", include_gpu=False, history_db=None)
+
+            with mock.patch("researchflow.alarm.handler.AlarmSlackSender.send_alarm_notification") as send, \
+                    open(os.devnull, "w") as devnull, \
+                    mock.patch("sys.stdout", devnull), mock.patch("sys.stderr", devnull):
+                execute_script_with_alarm(
+                    script_path, [], [script_path],
+                    notification_config=config,
+                    raw_passthrough=True,
+                    spill_capture=True,
+                )
+
+        error_output = send.call_args.kwargs["error_output_str"]
+        spill_path = re.search(r"\[Full output saved to: (.+)\]", error_output).group(1)
+        self.addCleanup(os.remove, spill_path)
+        self.assertGreater(expected_size, 3 * 1024 * 1024)
+        self.assertEqual(os.path.getsize(spill_path), expected_size)
+        with open(spill_path, "rb") as f:
+            self.assertEqual(f.read().count(b"\n"), num_lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
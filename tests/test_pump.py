@@ -0,0 +1,105 @@
+import io
+import subprocess
+import sys
+import time
+import unittest
+
+from researchflow.alarm.capture import BoundedOutputCapture
+from researchflow.alarm.pump import OutputPump, ThrottledSink
+
+_CHILD_SCRIPT = """
+import sys
+for index in range(20000):
+    sys.stdout.write(f"out {index}\\n")
+sys.stderr.write("err line\\n")
+"""
+
+
+class OutputPumpTests(unittest.TestCase):
+    def _spawn(self, script):
+        return subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+
+    def test_streams_both_pipes_to_sinks_and_consumers(self):
+        process = self._spawn(_CHILD_SCRIPT)
+        stdout_sink = io.StringIO()
+        stderr_sink = io.StringIO()
+        chunks = []
+
+        pump = OutputPump(process)
+        pump.add_stream(process.stdout, stdout_sink, [chunks.append])
+        pump.add_stream(process.stderr, stderr_sink)
+        pump.run()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+        expected_stdout = "".join(f"out {index}\n" for index in range(20000))
+        self.assertEqual(stdout_sink.getvalue(), expected_stdout)
+        self.assertEqual(b"".join(chunks).decode("utf-8"), expected_stdout)
+        self.assertEqual(stderr_sink.getvalue(), "err line\n")
+
+    def test_returns_after_grace_period_when_grandchild_keeps_pipe_open(self):
+        script = (
+            "import subprocess, sys\n"
+            "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(5)'])\n"
+            "print('parent done', flush=True)\n"
+        )
+        process = self._spawn(script)
+        capture = BoundedOutputCapture()
+
+        pump = OutputPump(process, exit_grace_seconds=0.2)
+        pump.add_stream(process.stdout, consumers=[capture.write])
+        started = time.monotonic()
+        pump.run()
+        elapsed = time.monotonic() - started
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+        self.assertLess(elapsed, 10)
+        self.assertIn("parent done", capture.get_text())
+
+    def test_slow_throttled_sink_drops_output_but_consumers_get_everything(self):
+        class SlowSink(io.BytesIO):
+            def write(self, data):
+                time.sleep(0.05)
+                return super().write(data)
+
+        process = self._spawn(_CHILD_SCRIPT)
+        slow_sink = SlowSink()
+        chunks = []
+
+        pump = OutputPump(process, batch_bytes=1024)
+        pump.add_stream(process.stdout, slow_sink, [chunks.append], max_sink_backlog_bytes=4096)
+        pump.add_stream(process.stderr)
+        pump.run()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+        expected_stdout = "".join(f"out {index}\n" for index in range(20000)).encode("utf-8")
+        self.assertEqual(b"".join(chunks), expected_stdout)
+        self.assertGreater(pump.dropped_sink_bytes, 0)
+        self.assertIn(b"Terminal too slow, skipped", slow_sink.getvalue())
+        self.assertTrue(slow_sink.getvalue().startswith(b"out 0\n"))
+
+
+class ThrottledSinkTests(unittest.TestCase):
+    def test_close_drains_accepted_output(self):
+        sink = io.BytesIO()
+        throttled = ThrottledSink(sink, max_backlog_bytes=1024)
+        throttled.write(b"first\n")
+        throttled.write(b"second\n")
+        throttled.close()
+
+        self.assertEqual(sink.getvalue(), b"first\nsecond\n")
+        self.assertEqual(throttled.dropped_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from researchflow.alarm.handler import execute_script_with_alarm
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.registry import RunRecord, RunRegistry
+
+_REPORTING_SCRIPT = """
+import sys
+from researchflow.core.utils import report_arguments, report_metrics
+report_arguments({"lr": 3e-4, "seed": 1})
+report_metrics({"loss": 0.5})
+sys.exit(2)
+"""
+
+
+def _record(script_path, start_time, exit_code=0, host="gpu-1", script_args=(), parsed_args=None):
+    return RunRecord(
+        script_path=script_path,
+        command=f"alarm {script_path}",
+        start_time=start_time,
+        end_time=start_time + timedelta(seconds=30),
+        exit_code=exit_code,
+        status="Success" if exit_code == 0 else "Failure",
+        host=host,
+        script_args=tuple(script_args),
+        parsed_args=parsed_args,
+    )
+
+
+class RunRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = RunRegistry(os.path.join(self.temp_dir.name, "history", "runs.db"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_filters_by_script_time_status_host_and_arguments(self):
+        now = datetime.now()
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(days=10), exit_code=1, parsed_args={"lr": 3e-4}))
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(hours=3), exit_code=1, parsed_args={"lr": 3e-4}))
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(hours=2), exit_code=1, parsed_args={"lr": 1e-3}))
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(hours=1), exit_code=1, script_args=["--lr", "3e-4"]))
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(minutes=30), exit_code=0, parsed_args={"lr": 3e-4}))
+        self.registry.record_run(_record("/exp/eval.py", now - timedelta(minutes=20), exit_code=1, parsed_args={"lr": 3e-4}))
+        self.registry.record_run(_record("/exp/train.py", now - timedelta(minutes=10), exit_code=1, host="gpu-2", script_args=["--lr=3e-4"]))
+
+        failed = self.registry.query_runs(
+            script="train.py",
+            since=now - timedelta(days=7),
+            status="Failure",
+            arg_filters=[("lr", "3e-4")],
+        )
+
+        self.assertEqual([run.host for run in failed], ["gpu-2", "gpu-1", "gpu-1"])
+        self.assertEqual([run.script_args for run in failed], [("--lr=3e-4",), ("--lr", "3e-4"), ()])
+        self.assertEqual(len(self.registry.query_runs(script="/exp/train.py", host="gpu-2")), 1)
+        self.assertEqual(len(self.registry.query_runs(limit=0)), 7)
+
+    def test_uses_wal_mode(self):
+        self.registry.record_run(_record("/exp/train.py", datetime.now()))
+
+        connection = sqlite3.connect(self.registry.db_path)
+        try:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        finally:
+            connection.close()
+
+    def test_alarm_run_is_recorded(self):
+        script_path = os.path.join(self.temp_dir.name, "train.py")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(_REPORTING_SCRIPT)
+        config = ResearchFlowConfig(slack_destination="off", include_gpu=False, history_db=self.registry.db_path)
+
+        return_code = execute_script_with_alarm(script_path, ["--fast"], [script_path, "--fast"], notification_config=config)
+
+        runs = self.registry.query_runs()
+        self.assertEqual(return_code, 2)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0].script_path, os.path.abspath(script_path))
+        self.assertEqual(runs[0].script_args, ("--fast",))
+        self.assertEqual((runs[0].exit_code, runs[0].status), (2, "Failure"))
+        self.assertEqual(runs[0].parsed_args, {"lr": 3e-4, "seed": 1})
+        self.assertEqual(runs[0].metrics, {"loss": 0.5})
+        self.assertIn("cpu_user_seconds", runs[0].resources)
+
+    def test_upgrades_version_1_database(self):
+        os.makedirs(os.path.dirname(self.registry.db_path))
+        connection = sqlite3.connect(self.registry.db_path)
+        connection.executescript(
+            "CREATE TABLE runs (id INTEGER PRIMARY KEY, script_path TEXT NOT NULL, script_name TEXT NOT NULL, "
+            "command TEXT NOT NULL, script_args TEXT NOT NULL, parsed_args TEXT, metrics TEXT, "
+            "start_time REAL NOT NULL, end_time REAL NOT NULL, exit_code INTEGER NOT NULL, status TEXT NOT NULL, "
+            "host TEXT NOT NULL, log_path TEXT, gpu_snapshot TEXT);"
+            "INSERT INTO runs VALUES (1, '/exp/old.py', 'old.py', 'alarm /exp/old.py', '[]', NULL, NULL, 0, 1, 0, 'Success', 'h', NULL, NULL);"
+            "PRAGMA user_version = 1;"
+        )
+        connection.close()
+
+        self.registry.record_run(_record("/exp/new.py", datetime.now()))
+
+        self.assertEqual([run.script_name for run in self.registry.query_runs()], ["new.py", "old.py"])
+        self.assertIsNone(self.registry.query_runs(script="old.py")[0].resources)
+
+
+if __name__ == "__main__":
+    unittest.main()
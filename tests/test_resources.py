@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+import unittest
+
+from researchflow.core.process_utils import has_exited, wait_with_rusage
+from researchflow.core.resources import ProcessTreeSampler, format_resource_usage, is_resource_sampling_supported
+
+_WORKER_TREE_SCRIPT = """
+import subprocess
+import sys
+import time
+
+worker = "data = bytearray(64 * 1024 * 1024); import time; end = time.time() + 1.0\\nwhile time.time() < end: pass"
+workers = [subprocess.Popen([sys.executable, "-c", worker]) for _ in range(2)]
+for process in workers:
+    process.wait()
+"""
+
+
+class WaitWithRusageTests(unittest.TestCase):
+    @unittest.skipUnless(hasattr(subprocess.os, "wait4"), "needs os.wait4")
+    def test_exit_check_leaves_child_for_wait4(self):
+        process = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(3)"])
+        deadline = time.monotonic() + 30
+        while not has_exited(process) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        exit_code, rusage = wait_with_rusage(process)
+
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(process.returncode, 3)
+        self.assertIsNotNone(rusage)
+        self.assertGreater(rusage.ru_utime + rusage.ru_stime, 0)
+
+    @unittest.skipUnless(hasattr(subprocess.os, "wait4"), "needs os.wait4")
+    def test_signal_is_reported_like_popen(self):
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        process.kill()
+
+        exit_code, _ = wait_with_rusage(process)
+
+        self.assertLess(exit_code, 0)
+
+
+@unittest.skipUnless(is_resource_sampling_supported(), "needs /proc")
+class ProcessTreeSamplerTests(unittest.TestCase):
+    def test_samples_descendants(self):
+        process = subprocess.Popen([sys.executable, "-c", _WORKER_TREE_SCRIPT])
+        sampler = ProcessTreeSampler(process.pid, min_interval=0.05, max_interval=0.2).start()
+        _, rusage = wait_with_rusage(process)
+        usage = sampler.stop(rusage)
+
+        self.assertGreaterEqual(usage.peak_process_count, 3)
+        self.assertGreaterEqual(usage.max_process_rss_bytes, 64 * 1024 * 1024)
+        self.assertGreaterEqual(usage.peak_rss_bytes, 2 * 64 * 1024 * 1024)
+        self.assertGreater(usage.cpu_user_seconds, 1.0)
+        self.assertGreater(usage.peak_cpu_cores, 0)
+        self.assertGreater(usage.sample_count, 0)
+        self.assertIs(sampler.stop(), usage)
+        self.assertIn("3 processes", format_resource_usage(usage))
+
+
+if __name__ == "__main__":
+    unittest.main()
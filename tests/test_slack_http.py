@@ -0,0 +1,117 @@
+import json
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from researchflow.core import slack_http
+from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.slack_http import request_with_retry
+from researchflow.core.slack_sender import SlackNotifier
+
+
+class _StubSlackServer(ThreadingHTTPServer):
+    """Answers each request with the next scripted (status, headers) and records who asked."""
+
+    daemon_threads = True
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        body_length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(body_length).decode("utf-8")
+        self.server.requests.append((self.command, self.path, self.client_address[1], body))
+        status, headers = self.server.responses.pop(0) if self.server.responses else (200, {})
+        payload = b'{"ok": true}' if status == 200 else b"error"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RequestWithRetryTests(unittest.TestCase):
+    def setUp(self):
+        self.delays = []
+        patcher = mock.patch.object(slack_http, "_sleep", self.delays.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _serve(self, responses):
+        server = _StubSlackServer(responses)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_post_is_resent_after_rate_limit_and_unavailable_on_one_connection(self):
+        server = self._serve([(429, {"Retry-After": "3"}), (503, {"Retry-After": "1"})])
+
+        response = request_with_retry("POST", server.url + "/api/chat.postMessage", False, data='{"text": "done"}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual({request[3] for request in server.requests}, {'{"text": "done"}'})
+        self.assertEqual(len({request[2] for request in server.requests}), 1, "requests should share one keep-alive connection")
+        self.assertTrue(3 <= self.delays[0] <= 4 and 1 <= self.delays[1] <= 2, self.delays)
+
+    def test_post_is_not_resent_after_an_ambiguous_server_error(self):
+        server = self._serve([(500, {}), (200, {})])
+
+        response = request_with_retry("POST", server.url + "/hooks", False, data="{}")
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_idempotent_get_retries_server_errors_with_growing_backoff(self):
+        server = self._serve([(502, {}), (500, {}), (504, {})])
+
+        response = request_with_retry("GET", server.url + "/api/auth.test", True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(server.requests), 4)
+        for attempt, delay in enumerate(self.delays, start=1):
+            self.assertLessEqual(delay, 2 ** (attempt - 1))
+
+    def test_post_is_resent_when_the_connection_was_never_made(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            closed_port_url = f"http://127.0.0.1:{unused.getsockname()[1]}/hooks"
+
+        import requests
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            request_with_retry("POST", closed_port_url, False, max_attempts=3, data="{}")
+        self.assertEqual(len(self.delays), 2)
+
+    def test_webhook_notification_survives_a_rate_limit(self):
+        server = self._serve([(429, {"Retry-After": "0"})])
+        config = ResearchFlowConfig(slack_destination="webhook", slack_webhook_url=server.url + "/services/T/B/secret")
+
+        sent = SlackNotifier(config).send_payload({"text": "done"})
+
+        self.assertTrue(sent)
+        self.assertEqual([json.loads(request[3]) for request in server.requests], [{"text": "done"}] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
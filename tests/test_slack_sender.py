@@ -1,7 +1,11 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest import mock
 
 from researchflow.core.config import ResearchFlowConfig
+from researchflow.core.dm_cache import DmChannelCache
 from researchflow.core.slack_sender import AlarmSlackSender, SlackNotifier
 
 
@@ -19,6 +23,11 @@ class _FakeResponse:
 
 
 class SlackNotifierTests(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dm_cache_path = os.path.join(temp_dir.name, "dm_channels.json")
+
     def test_sends_channel_message_with_bot_token(self):
         config = ResearchFlowConfig(
             slack_destination="channel",
@@ -26,13 +35,13 @@ class SlackNotifierTests(unittest.TestCase):
             slack_channel="C123",
         )
 
-        with mock.patch("researchflow.core.slack_sender.requests.post") as post:
+        with mock.patch("requests.Session.request") as post:
             post.return_value = _FakeResponse({"ok": True, "channel": "C123"})
             sent = SlackNotifier(config).send_payload({"text": "done"})
 
         self.assertTrue(sent)
         self.assertEqual(post.call_count, 1)
-        self.assertEqual(post.call_args.args[0], "https://slack.com/api/chat.postMessage")
+        self.assertEqual(post.call_args.args, ("POST", "https://slack.com/api/chat.postMessage"))
         self.assertIn('"channel": "C123"', post.call_args.kwargs["data"])
         self.assertEqual(post.call_args.kwargs["headers"]["Authorization"], "Bearer xoxb-test")
 
@@ -43,19 +52,47 @@ class SlackNotifierTests(unittest.TestCase):
             slack_user_id="U123",
         )
 
-        with mock.patch("researchflow.core.slack_sender.requests.post") as post:
+        with mock.patch("requests.Session.request") as post:
             post.side_effect = [
                 _FakeResponse({"ok": True, "channel": {"id": "D123"}}),
                 _FakeResponse({"ok": True, "channel": "D123"}),
             ]
-            sent = SlackNotifier(config).send_payload({"text": "done"})
+            sent = SlackNotifier(config, DmChannelCache(self.dm_cache_path)).send_payload({"text": "done"})
 
         self.assertTrue(sent)
         self.assertEqual(post.call_count, 2)
-        self.assertEqual(post.call_args_list[0].args[0], "https://slack.com/api/conversations.open")
-        self.assertEqual(post.call_args_list[1].args[0], "https://slack.com/api/chat.postMessage")
+        self.assertEqual(post.call_args_list[0].args[1], "https://slack.com/api/conversations.open")
+        self.assertEqual(post.call_args_list[1].args[1], "https://slack.com/api/chat.postMessage")
         self.assertIn('"channel": "D123"', post.call_args_list[1].kwargs["data"])
 
+    def test_reuses_cached_dm_channel_until_slack_reports_it_missing(self):
+        config = ResearchFlowConfig(slack_destination="dm", slack_bot_token="xoxb-test", slack_user_id="U123")
+
+        with mock.patch("requests.Session.request") as post:
+            post.side_effect = [
+                _FakeResponse({"ok": True, "channel": {"id": "D123"}}),
+                _FakeResponse({"ok": True}),
+                _FakeResponse({"ok": True}),
+                _FakeResponse({"ok": False, "error": "channel_not_found"}),
+                _FakeResponse({"ok": True, "channel": {"id": "D456"}}),
+                _FakeResponse({"ok": True}),
+            ]
+            SlackNotifier(config, DmChannelCache(self.dm_cache_path)).send_payload({"text": "first"})
+            # A new notifier, as in the next alarm run: the channel comes from the cache.
+            SlackNotifier(config, DmChannelCache(self.dm_cache_path)).send_payload({"text": "second"})
+            sent = SlackNotifier(config, DmChannelCache(self.dm_cache_path)).send_payload({"text": "third"})
+
+        methods = [call.args[1].rsplit("/", 1)[1] for call in post.call_args_list]
+        self.assertTrue(sent)
+        self.assertEqual(
+            methods,
+            ["conversations.open", "chat.postMessage", "chat.postMessage",
+             "chat.postMessage", "conversations.open", "chat.postMessage"],
+        )
+        self.assertIn('"channel": "D456"', post.call_args_list[5].kwargs["data"])
+        with open(self.dm_cache_path, "r", encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f).values()), ["D456"])
+
     def test_alarm_payload_includes_gpu_snapshot(self):
         config = ResearchFlowConfig(slack_destination="off")
         sender = AlarmSlackSender(config=config)
@@ -76,6 +113,46 @@ class SlackNotifierTests(unittest.TestCase):
         self.assertIn("GPU Snapshot", payload_text)
         self.assertIn("Test GPU", payload_text)
 
+    def test_idle_gpu_alert_payload_includes_gpus_and_log_tail(self):
+        config = ResearchFlowConfig(slack_destination="off")
+        payload = AlarmSlackSender(config=config)._build_idle_gpu_alert_payload(
+            script_name="train.py",
+            hostname="gpu-1",
+            pid=4321,
+            idle_duration_str="15m",
+            running_for_str="2h 3m",
+            threshold_percent=5,
+            gpu_lines=["GPU 0: util 0%, VRAM 71.2/80 GiB"],
+            log_file_path_str="/logs/train.log",
+            log_tail_str="epoch 3 step 1200",
+        )
+
+        payload_text = str(payload)
+        self.assertEqual(payload["text"], "⚠️ train.py GPUs idle for 15m on gpu-1")
+        self.assertIn("below *5%* utilization for *15m*", payload_text)
+        self.assertIn("GPU 0: util 0%, VRAM 71.2/80 GiB", payload_text)
+        self.assertIn("epoch 3 step 1200", payload_text)
+
+    def test_stall_alert_payload_includes_stack_dump(self):
+        config = ResearchFlowConfig(slack_destination="off")
+        payload = AlarmSlackSender(config=config)._build_stall_alert_payload(
+            script_name="train.py",
+            hostname="gpu-1",
+            pid=4321,
+            silent_duration_str="30m",
+            running_for_str="5h 1m",
+            killing=True,
+            log_tail_str="epoch 3 step 1200",
+            stack_dump_str="Thread 4321 (idle): \"MainThread\"\n    all_reduce (dist.py:42)",
+        )
+
+        payload_text = str(payload)
+        self.assertEqual(payload["text"], "⚠️ train.py silent for 30m on gpu-1")
+        self.assertIn("no output for *30m*", payload_text)
+        self.assertIn("being stopped", payload_text)
+        self.assertIn("*Stack dump:*", payload_text)
+        self.assertIn("all_reduce (dist.py:42)", payload_text)
+
 
 if __name__ == "__main__":
     unittest.main()
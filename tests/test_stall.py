@@ -0,0 +1,124 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from researchflow.alarm import handler, stall
+from researchflow.alarm.handler import execute_script_with_alarm
+from researchflow.alarm.stall import LogFileActivity, OutputStallWatch, kill_stalled_process
+from researchflow.core.config import ResearchFlowConfig
+
+_HANGING_SCRIPT = """
+import time
+print("loading batch 17", flush=True)
+time.sleep(60)
+"""
+
+
+class OutputStallWatchTests(unittest.TestCase):
+    def test_fires_once_after_silence(self):
+        stalls = []
+        last_activity = [time.monotonic()]
+        watch = OutputStallWatch(0.3, stalls.append).start(lambda: last_activity[0])
+
+        time.sleep(0.2)
+        last_activity[0] = time.monotonic()
+        time.sleep(0.2)
+        self.assertEqual(stalls, [])
+        time.sleep(0.5)
+        watch.stop()
+
+        self.assertEqual(len(stalls), 1)
+        self.assertGreaterEqual(stalls[0], 0.3)
+        self.assertTrue(watch.fired)
+
+    def test_log_file_activity_follows_size_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, "run.log")
+            with open(log_path, "w", encoding="utf-8") as f:
+                f.write("a\n")
+            activity = LogFileActivity(log_path)
+            first = activity()
+            time.sleep(0.05)
+            self.assertEqual(activity(), first)
+
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write("b\n")
+            self.assertGreater(activity(), first)
+
+
+@unittest.skipUnless(os.name == "posix", "signals descendants by PID")
+class KillStalledProcessTests(unittest.TestCase):
+    def test_reused_descendant_pid_is_not_killed(self):
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        # 4242 exits during the grace period and its PID goes to another process; 4343 lives on.
+        start_times = {4242: iter([100, 200]), 4343: iter([300, 300])}
+        signals = []
+
+        with mock.patch.object(stall, "get_process_start_time", side_effect=lambda pid: next(start_times[pid])), \
+                mock.patch.object(stall, "_signal_pid", side_effect=lambda pid, signum: signals.append((pid, signum))):
+            kill_stalled_process(child, [4242, 4343], grace_seconds=0)
+
+        self.assertIn((4242, signal.SIGTERM), signals)
+        self.assertIn((4343, signal.SIGKILL), signals)
+        self.assertNotIn((4242, signal.SIGKILL), signals)
+
+
+@unittest.skipUnless(os.name == "posix", "SIGABRT stack dumps need POSIX")
+class StallKillTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.script_path = os.path.join(self.temp_dir.name, "hang.py")
+        with open(self.script_path, "w", encoding="utf-8") as f:
+            f.write(_HANGING_SCRIPT)
+        self.config = ResearchFlowConfig(slack_destination="off", include_gpu=False, log_dir=self.temp_dir.name)
+        patcher = mock.patch("researchflow.alarm.handler.dump_python_stacks", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, **kwargs):
+        results = []
+        started = time.monotonic()
+        return_code = execute_script_with_alarm(
+            self.script_path,
+            [],
+            [self.script_path],
+            notification_config=self.config,
+            stall_timeout_seconds=0.5,
+            stall_kill=True,
+            on_run_finished=results.append,
+            **kwargs,
+        )
+        self.assertLess(time.monotonic() - started, 15)
+        return return_code, results[0]
+
+    def test_silent_script_is_stopped_through_output_pump(self):
+        return_code, result = self._run()
+
+        self.assertEqual(return_code, -signal.SIGABRT)
+        self.assertEqual(result.status, "Failure")
+
+    def test_silent_script_writing_log_directly_dumps_stacks(self):
+        return_code, result = self._run(enable_logging=True, detach_logging=False)
+
+        self.assertEqual(return_code, -signal.SIGABRT)
+        with open(result.log_file_path, "r", encoding="utf-8") as f:
+            log_text = f.read()
+        self.assertIn("loading batch 17", log_text)
+        self.assertIn("Fatal Python error: Aborted", log_text)
+        self.assertIn('hang.py", line 4', log_text)
+
+    def test_stall_alert_shows_output_buffered_for_a_teed_log(self):
+        with mock.patch("researchflow.alarm.handler._handle_output_stall", wraps=handler._handle_output_stall) as on_stall:
+            return_code, _ = self._run(enable_logging=True, detach_logging=False, tee_output=True)
+
+        self.assertEqual(return_code, -signal.SIGABRT)
+        log_tail = on_stall.call_args.args[5]
+        self.assertIn("loading batch 17", log_tail)
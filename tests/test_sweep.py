@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from researchflow.alarm.sweep import build_sweep_args, expand_sweep, run_sweep
+from researchflow.core.config import ResearchFlowConfig
+
+_SWEEP_SCRIPT = """
+import argparse
+import sys
+from researchflow.core.utils import report_arguments, report_metrics
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--lr", type=float)
+parser.add_argument("--seed", type=int)
+parser.add_argument("--epochs", type=int)
+args = parser.parse_args()
+report_arguments(args)
+report_metrics({"loss": args.lr * 10 + args.seed})
+sys.exit(1 if args.seed == 1 and args.lr < 0.05 else 0)
+"""
+
+
+class SweepExpansionTests(unittest.TestCase):
+    def test_crosses_runs_with_grid(self):
+        spec = {"runs": [{"model": "small"}, {"model": "large"}], "grid": {"lr": [0.1, 0.01]}}
+
+        self.assertEqual(
+            expand_sweep(spec),
+            [
+                {"model": "small", "lr": 0.1},
+                {"model": "small", "lr": 0.01},
+                {"model": "large", "lr": 0.1},
+                {"model": "large", "lr": 0.01},
+            ],
+        )
+
+    def test_builds_flags_from_values(self):
+        self.assertEqual(
+            build_sweep_args({"lr": 0.1, "--fp16": True, "debug": False, "layers": [2, 4]}),
+            ["--lr", "0.1", "--fp16", "--layers", "2", "4"],
+        )
+
+
+class RunSweepTests(unittest.TestCase):
+    def test_collects_exit_codes_parsed_args_and_metrics(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script_path = os.path.join(tmpdir, "train.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(_SWEEP_SCRIPT)
+            config = ResearchFlowConfig(slack_destination="off", include_gpu=False, log_dir=os.path.join(tmpdir, "logs"))
+
+            return_code = run_sweep(
+                script_path,
+                {"grid": {"lr": [0.1, 0.01], "seed": [0, 1]}},
+                fixed_args=["--epochs", "1"],
+                max_parallel=2,
+                notification_config=config,
+            )
+
+            results_files = list(Path(tmpdir, "logs").glob("*_train_sweep.json"))
+            self.assertEqual(len(results_files), 1)
+            records = json.loads(results_files[0].read_text(encoding="utf-8"))
+
+        self.assertEqual(return_code, 1)
+        self.assertEqual([record["exit_code"] for record in records], [0, 0, 0, 1])
+        self.assertEqual(records[1]["parsed_args"], {"lr": 0.1, "seed": 1, "epochs": 1})
+        self.assertEqual(records[1]["metrics"], {"loss": 2.0})
+
+    def test_duplicate_points_keep_their_own_values(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script_path = os.path.join(tmpdir, "train.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(_SWEEP_SCRIPT)
+            config = ResearchFlowConfig(slack_destination="off", include_gpu=False, log_dir=os.path.join(tmpdir, "logs"))
+
+            # Both points build the same command line (false and null flags are left out).
+            run_sweep(
+                script_path,
+                {"runs": [{"lr": 0.1, "seed": 0, "note": False}, {"lr": 0.1, "seed": 0, "note": None}]},
+                fixed_args=["--epochs", "1"],
+                max_parallel=2,
+                notification_config=config,
+            )
+
+            results_file = next(Path(tmpdir, "logs").glob("*_train_sweep.json"))
+            records = json.loads(results_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(records[0]["args"], records[1]["args"])
+        self.assertEqual([record["values"]["note"] for record in records], [False, None])
+
+
+if __name__ == "__main__":
+    unittest.main()